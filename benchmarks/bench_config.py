@@ -0,0 +1,80 @@
+"""
+Benchmark for loading configuration files.
+Generates a config tree of entity, flow and scene files and loads it
+with the pure python SafeLineLoader, the libyaml loader, and through the config cache (cold and warm).
+
+run from the repository root: python benchmarks/bench_config.py [number of files]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "hub"))
+
+os.environ["CONFIG_CACHE"] = "0"  # the module level cache is replaced below
+from helper import yaml_utils  # noqa: E402
+
+ENTITY = """
+name: lamp_{i}
+type: lamp
+components:
+  switch:
+    type: switch
+    config:
+      service: hue.switch
+      target: "{i}"
+  brightness:
+    type: brightness
+    config:
+      service: hue.brightness
+      min: 0
+      max: 255
+settings:
+  room: room_{room}
+  tags: [light, ceiling, dimmable]
+"""
+
+
+def generate(path, count):
+    for directory in ("entities", "flows", "scenes"):
+        os.makedirs(os.path.join(path, directory), exist_ok=True)
+    for i in range(count):
+        directory = ("entities", "flows", "scenes")[i % 3]
+        with open(os.path.join(path, directory, f"file_{i}.yaml"), "w") as file:
+            file.write(ENTITY.format(i=i, room=i % 7))
+
+
+def load_all(path, **kwargs):
+    for directory in ("entities", "flows", "scenes"):
+        for file in os.listdir(os.path.join(path, directory)):
+            yaml_utils.load_yaml(os.path.join(path, directory, file), **kwargs)
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    print(f"{label:36s} {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with tempfile.TemporaryDirectory() as path:
+        generate(os.path.join(path, "config"), count)
+        config = os.path.join(path, "config")
+        print(f"{count} files")
+
+        timed("SafeLineLoader, no cache", load_all, config, track_lines=True)
+        timed("libyaml loader, no cache", load_all, config)
+
+        yaml_utils.CACHE = yaml_utils.ConfigCache(os.path.join(path, "cache"))
+        timed("cold start (parse and write cache)", load_all, config)
+        timed("warm start (cache hits)", load_all, config)
+
+        os.utime(os.path.join(config, "entities", "file_0.yaml"))
+        timed("warm start, one file changed", load_all, config)
+
+
+if __name__ == "__main__":
+    main()
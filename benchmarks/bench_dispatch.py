@@ -0,0 +1,58 @@
+"""
+Microbenchmark for the per handler overhead of EventBus.async_dispatch.
+Compares the old signature inspection on every dispatch with precomputed job descriptors.
+
+run from the repository root: python benchmarks/bench_dispatch.py
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "hub"))
+
+from decorators import is_blocking, is_protected  # noqa: E402
+from objects.job import JobDescriptor  # noqa: E402
+
+
+class Plugin:
+    async def on_event(self, event):
+        pass
+
+    async def on_event_context(self, event, context):
+        pass
+
+    def on_event_sync(self, event):
+        pass
+
+
+plugin = Plugin()
+handlers = [plugin.on_event, plugin.on_event_context, plugin.on_event_sync] * 100
+descriptors = [JobDescriptor.describe(handler) for handler in handlers]
+
+
+def reflective():
+    for handler in handlers:
+        pass_context = len(inspect.signature(handler).parameters) == 2
+        if is_blocking(handler):
+            pass
+        elif asyncio.iscoroutinefunction(handler) or asyncio.iscoroutine(handler):
+            pass
+        is_protected(handler)
+
+
+def described():
+    for listener in descriptors:
+        pass_context = listener.pass_context
+        if listener.is_coroutine and not listener.is_blocking:
+            pass
+        listener.is_protected
+
+
+if __name__ == "__main__":
+    runs = 200
+    for name, func in (("inspect.signature", reflective), ("descriptor", described)):
+        total = timeit.timeit(func, number=runs)
+        print(f"{name:>18}: {total / (runs * len(handlers)) * 1e9:8.1f} ns/handler")
@@ -0,0 +1,69 @@
+"""
+Memory and throughput benchmark for Event objects.
+Compares the previous plain Event class (new admin context per event, path split on every call)
+with the slotted Event using shared contexts and cached path decomposition.
+
+run from the repository root: python benchmarks/bench_event.py
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "hub"))
+
+from objects.Context import Context  # noqa: E402
+from objects.Event import Event  # noqa: E402
+from objects.User import User  # noqa: E402
+
+EVENT_TYPES = ["registry.state_change", "spotify.track.change", "cec.set_volume"]
+COUNT = 50_000
+
+
+class LegacyEvent:
+    def __init__(self, event_type, event_content=None, context=None):
+        self.event_type = event_type
+        self.event_content = event_content
+        self.context = context or Context(user=User.new_admin())
+
+    @property
+    def path(self):
+        return self.event_type.split(".")
+
+    def walk_path(self):
+        path = ""
+        for fragment in self.path:
+            path += f".{fragment}"
+            yield path[1:]
+
+
+def create(cls):
+    return [cls(EVENT_TYPES[i % 3], i) for i in range(COUNT)]
+
+
+def walk(events):
+    for event in events:
+        for _ in event.walk_path():
+            pass
+
+
+def memory(cls) -> int:
+    tracemalloc.start()
+    events = create(cls)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return size
+
+
+if __name__ == "__main__":
+    for name, cls in (("legacy", LegacyEvent), ("slotted", Event)):
+        events = create(cls)
+        create_time = timeit.timeit(lambda: create(cls), number=5) / 5
+        walk_time = timeit.timeit(lambda: walk(events), number=5) / 5
+        print(
+            f"{name:>8}: create {create_time / COUNT * 1e9:7.1f} ns/event, "
+            f"walk_path {walk_time / COUNT * 1e9:7.1f} ns/event, "
+            f"memory {memory(cls) / COUNT:6.1f} B/event"
+        )
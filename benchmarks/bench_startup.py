@@ -0,0 +1,76 @@
+"""
+Startup benchmark for plugin discovery.
+Compares importing every plugin package (the previous behaviour of load_plugins)
+with importing only the whitelisted ones via the plugin manifests.
+Every mode runs in a fresh interpreter, reporting import time and peak resident memory.
+
+run from the repository root: python benchmarks/bench_startup.py [plugin names to whitelist]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+HUB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hub")
+
+CHILD = """
+import json, logging, pkgutil, resource, sys, time
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {hub!r})
+# the loader and its imports are shared by both modes
+import plugins
+from helper import package_loader
+from loader.plugin_loader import plugin_modules
+start = time.perf_counter()
+failed = []
+if {mode!r} == "all":
+    for _, name, _ in pkgutil.iter_modules(plugins.__path__):
+        try:
+            list(package_loader.package("plugins." + name, recursive=True))
+        except Exception as err:
+            failed.append(name)
+else:
+    list(plugin_modules({white_list!r}))
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "maxrss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "failed": failed,
+}}))
+"""
+
+
+def run(mode, white_list):
+    code = CHILD.format(hub=HUB, mode=mode, white_list=white_list)
+    results = []
+    for _ in range(5):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=HUB,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+    return min(results, key=lambda r: r["elapsed"])
+
+
+def main():
+    white_list = [name.upper() for name in sys.argv[1:]] or ["WEATHER"]
+    for mode, label in (
+        ("all", "import every plugin"),
+        ("manifest", f"manifest {white_list}"),
+    ):
+        result = run(mode, white_list)
+        print(
+            f"{label:48s} {result['elapsed'] * 1000:8.1f}ms "
+            f"{result['maxrss'] / 1024:7.1f}MiB rss {result['modules']:5d} modules"
+        )
+        if result["failed"]:
+            print(f"    not importable here: {', '.join(result['failed'])}")
+
+
+if __name__ == "__main__":
+    main()
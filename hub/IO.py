@@ -1,6 +1,8 @@
 import logging
 from dataclasses import dataclass
+from functools import partial
 
+from decorators import get_executor
 from exceptions import ServiceNotFoundError, ConfigError, FormatterNotFound, Interrupt
 from helper import package_loader
 from helper.werkzeug import is_coro
@@ -163,35 +165,34 @@ class IO:
         except KeyError:
             raise ServiceNotFoundError
 
+    async def format(self, handler: Callable, value: Any, config: Dict) -> Any:
+        """runs a formatter, sync formatters marked with @executor run in their pool"""
+        if is_coro(handler):
+            return await handler(value, **config)
+        if get_executor(handler) is not None:
+            return await self.core.executors.run(
+                handler, value, target=partial(handler, **config)
+            )
+        return handler(value, **config)
+
     def build_pipe(self, pipe: Union[str, List[Union[str, Dict]]]) -> Callable:
         async def _pipe(_in):
             current_state = _in
             for formatter in pipe:
                 if type(formatter) is dict:
-                    if is_coro(self._formatter[list(formatter.keys())[0]].handler):
-                        current_state = await self._formatter[
-                            list(formatter.keys())[0]
-                        ].handler(current_state, **list(formatter.values())[0])
-                    else:
-                        current_state = self._formatter[
-                            list(formatter.keys())[0]
-                        ].handler(current_state, **list(formatter.values())[0])
+                    name, config = list(formatter.items())[0]
                 elif type(formatter) is str:
-                    if is_coro(self._formatter[formatter].handler):
-                        current_state = await self._formatter[formatter].handler(
-                            current_state
-                        )
-                    else:
-                        current_state = self._formatter[formatter].handler(
-                            current_state
-                        )
+                    name, config = formatter, {}
+                else:
+                    continue
+                current_state = await self.format(
+                    self._formatter[name].handler, current_state, config
+                )
 
             return current_state
 
         async def _formatter(_in):
-            if is_coro(self._formatter[pipe].handler):
-                return await self._formatter[pipe].handler(_in)
-            return self._formatter[pipe].handler(_in)
+            return await self.format(self._formatter[pipe].handler, _in, {})
 
         if type(pipe) is str:
             return _formatter
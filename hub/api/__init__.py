@@ -2,7 +2,7 @@ import logging
 
 import aiohttp_cors
 
-from typing import TYPE_CHECKING, Type, Callable, Dict, Coroutine
+from typing import TYPE_CHECKING, Type, Callable, Dict, Coroutine, List
 
 from aiohttp import web
 from aiohttp.web_middlewares import middleware
@@ -34,6 +34,7 @@ class API:
         self.gql = GraphAPI(core)
 
         self._ws_command_handler: Dict[str, Callable] = {}
+        self._metrics_providers: List[Callable[[], str]] = []
 
         self.app = web.Application(middlewares=[self.auth_factory()])
 
@@ -52,6 +53,7 @@ class API:
 
         self.register_endpoint(WebsocketEndpoint)
         self.register_websocket_command_handler("get_entities", get_entities)
+        self.register_rest_handler("/api/metrics", "GET", self.metrics_handler)
 
     def register_endpoint(self, endpoint: Type[RESTEndpoint]):
         endpoint().register(self.app.router)
@@ -60,6 +62,16 @@ class API:
         handler = handler_factory(handler)
         self.app.router.add_route(method, path, handler)
 
+    def add_metrics_provider(self, provider: Callable[[], str]):
+        """adds a callable returning metrics in the prometheus text format to /api/metrics"""
+        self._metrics_providers.append(provider)
+
+    async def metrics_handler(self, _: web.Request):
+        return web.Response(
+            text="".join(provider() for provider in self._metrics_providers),
+            content_type="text/plain",
+        )
+
     def get_ws_handler(self, command: str) -> Callable:
         return self._ws_command_handler[command]
 
@@ -10,6 +10,7 @@ from ariadne import load_schema_from_path
 from ariadne.asgi import GraphQL
 from starlette.middleware.cors import CORSMiddleware
 
+from constants.entity_types import EntityType
 from helper.json_encoder import default_encoder
 from objects.Context import Context
 from objects.Event import Event
@@ -93,6 +94,27 @@ class GraphAPI:
 
         self.type_defs += f"\n{mutations}"
 
+    def add_subscription(
+        self,
+        subscription_def: str,
+        source: Callable,
+        resolver: Callable = lambda value, *_, **__: value,
+    ):
+        subscriptions: str = re.findall(
+            r"(?=type Subscription)([\s\S]*?)(?<=})", self.type_defs
+        )[0]
+        self.type_defs = self.type_defs.replace(subscriptions, "")
+
+        lines = subscriptions.split("\n")
+        lines.insert(1, subscription_def)
+        subscriptions = "\n".join(lines)
+
+        name = subscription_def.split("(")[0].split(":")[0].strip()
+        self.subscription.set_field(name, resolver)
+        self.subscription.set_source(name, source)
+
+        self.type_defs += f"\n{subscriptions}"
+
     async def setup(self):
         schema = make_executable_schema(
             self.type_defs, self.query, self.subscription, self.mutations
@@ -118,9 +140,15 @@ class GraphAPI:
         entity = self.core.registry.get_entities()[name]
         return entity.gql()
 
-    def get_entities(self, *_):
-        entities = self.core.registry.get_entities()
-        return map(lambda e: e.gql(), entities.values())
+    def get_entities(self, *_, type=None, component=None, setting=None):
+        if type is not None and not EntityType.contains(type):
+            return []
+        entities = self.core.registry.find_entities(
+            entity_type=EntityType(type) if type is not None else None,
+            component=component,
+            setting=setting,
+        )
+        return map(lambda e: e.gql(), entities)
 
     def get_value(self, *_, key=""):
         v = self.core.storage.get_value(key)
@@ -48,9 +48,13 @@ class Connection:
             )
         )
 
-        self.core.add_job(self.reader)
+        self.core.add_job(self.reader, daemon=True)
         await self.writer()
 
+    @property
+    def task_owner(self) -> str:
+        return f"api:{self.id}"
+
     def send(self, msg) -> None:
         self.outgoing.put_nowait(msg)
 
@@ -64,7 +68,7 @@ class Connection:
                     pass  # TODO: Pong
                 elif message.type == web.WSMsgType.TEXT:
                     handler = self.core.api.get_ws_handler(str(message.data))
-                    self.core.add_job(handler, message, self)
+                    self.core.add_job(handler, message, self, owner=self.task_owner)
                     pass  # TODO: handling
             except:
                 pass
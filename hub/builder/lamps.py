@@ -50,15 +50,6 @@ def dimmable_lamp_builder(registry, name: str, config: Dict, settings: Dict) ->
         BRIGHTNESS, registry.components[BRIGHTNESS]({}, brightness_handler, entity)
     )
 
-    registry.core.add_job(
-        entity.call_method, BRIGHTNESS, "increase", 10, Context.admin()
-    )
-    registry.core.add_job(
-        entity.call_method, BRIGHTNESS, "increase", 10, Context.admin()
-    )
-
-    registry.core.add_job(entity.call_method, SWITCH, "turn_off", None, Context.admin())
-
     entity.settings = settings
 
     return entity
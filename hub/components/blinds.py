@@ -6,6 +6,7 @@ class Blinds(Component[int]):
 
     type = "blinds"
     gql_type = "Blinds"
+    coalescible = ("set", "open", "close")
 
     def __init__(self, configuration, handler, entity, name=""):
         super().__init__(configuration, handler, entity, name)
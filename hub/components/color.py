@@ -10,6 +10,7 @@ class Color(Component[ColorObj]):
 
     type = "color"
     gql_type = "Color"
+    coalescible = ("set", "r", "g", "b", "hsv", "rgb", "hex")
 
     def __init__(self, configuration: dict, handler: Callable, entity, name=""):
         super().__init__(configuration, handler, entity, name)
@@ -66,6 +67,12 @@ class Color(Component[ColorObj]):
         await self.handler(self.state, context)
         return self.state
 
+    def dump_state(self):
+        return list(self.state.rgb)
+
+    def load_state(self, value):
+        self.state = ColorObj(list(value))
+
     def gql(self):
         return {
             "name": self.name,
@@ -9,6 +9,7 @@ class Switch(Component[bool]):
 
     type = "switch"
     gql_type = "Switch"
+    coalescible = ("set", "turn_on", "turn_off")
 
     def __init__(self, configuration: Dict, handler: Callable, entity, name=""):
         super().__init__(configuration, handler, entity, name)
@@ -1 +1,3 @@
 PROTECTED = "CORE_JOB_PROTECTED"
+BLOCKING = "is_blocking"
+EXECUTOR = "executor_pool"
@@ -2,3 +2,7 @@ MATCH_ALL = "hub.match_all"
 NEW_WEBSOCKET_CONNECTION = "new_ws_connection"
 ENTITY_CREATED = "registry.new_entity"
 ENTITY_STATE_CHANGED = "registry.state_change"
+# scenes and bulk calls publish their changes as one SCENE_CHANGED or ENTITY_STATES_CHANGED
+# event, STATE_CHANGE_EVENTS=1 also dispatches an ENTITY_STATE_CHANGED per change
+SCENE_CHANGED = "registry.scene_change"
+ENTITY_STATES_CHANGED = "registry.state_change_batch"
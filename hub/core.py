@@ -3,42 +3,70 @@ import asyncio
 import datetime
 import logging
 import os
+import threading
 from dataclasses import dataclass
+from functools import partial
 from signal import SIGHUP, SIGINT, SIGTERM, Signals
 from contextlib import suppress
-from typing import Any, Dict, List, Callable
+from typing import Any, Dict, List, Callable, Optional
 
 from aioconsole import ainput
 
 from api import API
 from data_provider import Storage
-from decorators import protected, is_protected
+from decorators import protected, is_protected, is_blocking
 from entity_registry import EntityRegistry
 from event_bus import EventBus
 from IO import IO
+from executors import Executors
+from journal import EventJournal
 from exceptions import EntityNotFound
 from flow_engine import FlowEngine
 from loader import Loader
 from objects.Context import Context
 from objects.Event import Event
 from objects.core_state import CoreState
+from objects.job import JobDescriptor
+from helper import service_docs, yaml_utils
+from helper.metrics import HandlerStats, timed_coroutine, timed_future
 from loader.plugin_loader import load_plugins
+from loop_monitor import LoopMonitor
+from tasks import TaskRegistry, job_name, owner_of
 from timer import Timer
 
 
 LOGGER = logging.getLogger("Core")
 
 
-def is_blocking(job):
-    return getattr(job, "is_blocking", False)
-
-
 @dataclass
 class CoreConfig:
     api_port: int = os.getenv("API_PORT", 8081)
     shutdown_delay: int = os.getenv("SHUTDOWN_DELAY", 2)
     instance_name: str = "HUB"
     allow_protected_tasks: bool = os.getenv("ALLOW_PROTECTED", True)
+    event_journal: bool = os.getenv("EVENT_JOURNAL") == "1"
+    journal_path: str = os.getenv("JOURNAL_PATH", "")
+    event_log: str = os.getenv("EVENT_LOG", "")
+    bus_metrics: bool = os.getenv("BUS_METRICS", "1") == "1"
+    loop_monitor: bool = os.getenv("LOOP_MONITOR", "1") == "1"
+    slow_callback_threshold: float = float(os.getenv("SLOW_CALLBACK_THRESHOLD", 0.1))
+    plugin_init_timeout: float = float(os.getenv("PLUGIN_INIT_TIMEOUT", 30))
+    state_store: bool = os.getenv("STATE_STORE", "1") == "1"
+    state_store_path: str = os.getenv("STATE_STORE_PATH", "")
+    scene_concurrency: int = int(os.getenv("SCENE_CONCURRENCY", 8))
+    # also dispatch ENTITY_STATE_CHANGED per change of bulk calls and scenes
+    state_change_events: bool = os.getenv("STATE_CHANGE_EVENTS") == "1"
+    executor_workers: Optional[int] = (
+        int(os.getenv("EXECUTOR_WORKERS")) if os.getenv("EXECUTOR_WORKERS") else None
+    )
+
+
+@dataclass
+class JobStats:
+    """counts how jobs were handed to the event loop"""
+
+    in_loop: int = 0
+    threadsafe: int = 0
 
 
 class Core:
@@ -52,6 +80,9 @@ class Core:
         self.config = CoreConfig()
 
         self.event_loop = event_loop if event_loop else asyncio.get_event_loop()
+        self.job_stats = JobStats()
+        self._loop_thread: Optional[int] = None
+        self.event_loop.call_soon(self._bind_loop_thread)
 
         self.location = os.path.dirname(__file__)
         self._state = CoreState.RUNNING
@@ -68,13 +99,38 @@ class Core:
 
         self.loader = Loader(self.location, self)
         self.api = API(self, api_tokens)
+        self.tasks = TaskRegistry(self)
+        self.executors = Executors(self, self.config.executor_workers)
         self.storage = Storage(self)
+        self.loop_monitor: Optional[LoopMonitor] = None
+        if self.config.loop_monitor:
+            self.loop_monitor = LoopMonitor(
+                self, threshold=self.config.slow_callback_threshold
+            )
+            self.event_loop.call_soon(self.loop_monitor.start)
         self.timer = Timer(self)
         self.io: IO = IO(self)
         self.bus: EventBus = EventBus(self)
+        self.journal: Optional[EventJournal] = None
+        if self.config.event_journal:
+            self.journal = EventJournal(
+                self, self.config.journal_path or f"{self.location}/journal"
+            )
+            self.bus.journal = self.journal
         self.plugins = load_plugins(self)
         self.registry: EntityRegistry = EntityRegistry(self)
         self.engine = FlowEngine(self)
+        # docs built while running are stored once, the hook runs in an executor
+        self.add_lifecycle_hook(CoreState.STOPPING, service_docs.CACHE.save)
+
+        startup = (datetime.datetime.now() - self.startup_time).total_seconds()
+        if yaml_utils.CACHE is not None:
+            LOGGER.info(
+                f"core created in {startup:.3f}s, config: {yaml_utils.CACHE.hits} files "
+                f"from cache, {yaml_utils.CACHE.misses} parsed"
+            )
+        else:
+            LOGGER.info(f"core created in {startup:.3f}s")
 
         self.core_state = CoreState.RUNNING
 
@@ -88,7 +144,7 @@ class Core:
 
         self.add_job(t)
 
-        self.add_job(self.api.start, int(self.config.api_port))
+        self.add_job(self.api.start, int(self.config.api_port), daemon=True)
 
         signals = (SIGHUP, SIGTERM, SIGINT)
         for s in signals:
@@ -96,7 +152,7 @@ class Core:
                 s, lambda s=s: self.shutdown(s))
 
         if os.getenv("CIF") == "1":
-            self.add_job(self.cio)
+            self.add_job(self.cio, daemon=True)
 
     async def cio(self):
         while True:
@@ -121,24 +177,66 @@ class Core:
     def add_plugin(self, name: str, plugin: Any):
         self.plugins[name] = plugin
 
-    def add_job(self, job, *args: Any):
-        return self.event_loop.call_soon_threadsafe(self.async_add_job, job, *args)
+    def _bind_loop_thread(self):
+        self._loop_thread = threading.get_ident()
 
-    def async_add_job(self, job, *args):
+    def add_job(
+        self, job, *args: Any, owner: Optional[str] = None, daemon: bool = False
+    ):
+        """schedules a job on the event loop. safe to call from any thread.
+        Callers on the loop thread skip the wakeup of the threadsafe path.
+        :param owner: owner of the task, derived from the job if not given
+        :param daemon: long living job, which isn't waited for on shutdown
+        """
+        callback = self.async_add_job
+        if owner is not None or daemon:
+            callback = partial(self.async_add_job, owner=owner, daemon=daemon)
+
+        if threading.get_ident() == self._loop_thread:
+            self.job_stats.in_loop += 1
+            return self.event_loop.call_soon(callback, job, *args)
+        self.job_stats.threadsafe += 1
+        return self.event_loop.call_soon_threadsafe(callback, job, *args)
+
+    def async_add_job(
+        self, job, *args, owner: Optional[str] = None, daemon: bool = False
+    ):
         """adds a job to the event loop. must be run in the event loop.
         Use add_job to safely schedule a job from outside the event loop.
         """
+        name = job_name(job)
         if is_blocking(job):
-            task = self.event_loop.run_in_executor(None, job, *args)
+            task = self.executors.run(job, *args)
         elif asyncio.iscoroutinefunction(job) or asyncio.iscoroutine(job):
-            task = self.event_loop.create_task(job(*args))
+            task = self.event_loop.create_task(job(*args), name=name)
         else:
-            task = self.event_loop.run_in_executor(None, job, *args)
+            task = self.executors.run(job, *args)
 
         if is_protected(job):
             protected(task)
 
-        return task
+        return self.tasks.track(task, name, owner or owner_of(job), daemon)
+
+    def async_add_described_job(
+        self, job: JobDescriptor, *args, stats: Optional[HandlerStats] = None
+    ):
+        """adds a job with a precomputed descriptor to the event loop. must be run in the event loop.
+        :param stats: records queueing delay and execution time of the job
+        """
+        if job.is_coroutine and not job.is_blocking:
+            coroutine = job.target(*args)
+            if stats:
+                coroutine = timed_coroutine(stats, coroutine)
+            task = self.event_loop.create_task(coroutine, name=job.name)
+        else:
+            task = self.executors.run(job.target, *args)
+            if stats:
+                timed_future(stats, task)
+
+        if job.is_protected:
+            protected(task)
+
+        return self.tasks.track(task, job.name, job.owner)
 
     def shutdown(self, signal: Signals):
         self.add_job(self.__shutdown, signal)
@@ -152,7 +250,13 @@ class Core:
         logging.info(f"Received exit signal {signal.name}... shutdown delay is: {self.config.shutdown_delay}")
 
         self.core_state = CoreState.STOPPING
-        await asyncio.sleep(self.config.shutdown_delay)
+        # returns as soon as every running job has finished, the delay is the deadline
+        remaining = await self.tasks.drain(float(self.config.shutdown_delay))
+        if remaining:
+            logging.info(
+                f"{len(remaining)} tasks still running after the shutdown deadline: "
+                + ", ".join(f"{info.name} ({info.owner})" for info in remaining)
+            )
 
         tasks = [t for t in asyncio.all_tasks() if t is not
                  asyncio.current_task()]
@@ -168,8 +272,12 @@ class Core:
 
         logging.info(f"Cancelling {len(tasks)} outstanding tasks")
         await asyncio.gather(*tasks, return_exceptions=True)
+        self.executors.shutdown()
         logging.info(f"Flushing metrics:")
         logging.info(f"\tuptime: {datetime.datetime.now() - self.startup_time}")
+        logging.info(
+            f"\tjobs: {self.job_stats.in_loop} in loop, {self.job_stats.threadsafe} threadsafe"
+        )
         self.event_loop.stop()
 
     def add_lifecycle_hook(self, state: CoreState, callback: Callable):
@@ -1,7 +1,7 @@
 from collections import defaultdict
 from typing import TYPE_CHECKING, Callable, Any, TypeVar, Generic, Dict
 
-from asyncio_multisubscriber_queue import MultisubscriberQueue
+from helper.broadcast import BroadcastChannel, Policy
 
 if TYPE_CHECKING:
     from core import Core
@@ -14,7 +14,7 @@ class DataEntry(Generic[T]):
         self.type = T
         self.value: T = init_value
         self.subscriber = []
-        self.queue = MultisubscriberQueue()
+        self.queue: BroadcastChannel[T] = BroadcastChannel(capacity=1)
 
 
 X = TypeVar("X")
@@ -80,7 +80,7 @@ class Storage:
             raise EntryNotFound
 
     async def subscribe(self, key: str):
-        async for value in self.storage[key].queue.subscribe():
+        async for value in self.storage[key].queue.subscribe(Policy.CONFLATE):
             yield value
 
     def register_callback(self, key, callback, call_on_init=True) -> Callable:
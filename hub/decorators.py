@@ -10,3 +10,26 @@ def protected(func):
 
 def is_protected(func: Callable):
     return getattr(func, PROTECTED, False)
+
+
+def blocking(func):
+    setattr(func, BLOCKING, True)
+    return func
+
+
+def is_blocking(func: Callable):
+    return getattr(func, BLOCKING, False)
+
+
+def executor(pool: str):
+    """runs the blocking job in the named executor pool"""
+
+    def wrapper(func):
+        setattr(func, EXECUTOR, pool)
+        return func
+
+    return wrapper
+
+
+def get_executor(func: Callable):
+    return getattr(func, EXECUTOR, None)
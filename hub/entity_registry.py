@@ -1,7 +1,9 @@
 import logging
+from functools import partial
+from types import MappingProxyType
+from typing import Mapping
 
-from asyncio_multisubscriber_queue import MultisubscriberQueue
-
+from aiohttp import web
 from builder.blinds import blinds_builder
 from builder.lamps import *
 from builder.switch import *
@@ -11,17 +13,26 @@ from components.color import Color
 from components.switch import Switch
 from constants.entity_types import EntityType
 from constants.entity_builder import *
-from constants.events import ENTITY_CREATED, ENTITY_STATE_CHANGED
+from constants.events import (
+    ENTITY_CREATED,
+    ENTITY_STATE_CHANGED,
+    ENTITY_STATES_CHANGED,
+    SCENE_CHANGED,
+)
 from exceptions import ConfigError, EntityNotFound, ComponentNotFound
 from helper import yaml_utils
+from helper.broadcast import BroadcastChannel
+from helper.mailbox import COALESCED, CommandMailbox
 from objects.Context import Context
 from objects.Event import Event
 from objects.OutputService import OutputService
-from objects.Scene import Scene
+from objects.Scene import Scene, SceneResult
+from objects.command import CommandResult, ComponentCommand, run_commands
 from objects.User import User
 from objects.component import Component
 from objects.entity import Entity
-from loader.plugin_loader import build_doc
+from helper.service_docs import lazy_doc
+from state_store import StateStore
 
 if TYPE_CHECKING:
     from core import Core
@@ -44,6 +55,10 @@ class EntityRegistry:
     def __init__(self, core: "Core"):
         self.core = core
         self._entities: Dict[str, Entity] = {}
+        # secondary indexes, entity name -> entity, maintained by add_entity/remove_entity
+        self._by_type: Dict[EntityType, Dict[str, Entity]] = {}
+        self._by_component: Dict[str, Dict[str, Entity]] = {}
+        self._by_setting: Dict[str, Dict[str, Entity]] = {}
         self._scenes: Dict[str, Scene] = {}
         self._template_builder: Dict[Union[EntityType, str], Builder] = {
             EntityType.LAMP: lamp_builder,
@@ -60,9 +75,36 @@ class EntityRegistry:
             BLINDS: Blinds
         }
         self.load_entities_from_config(f"{core.location}/config/entities")
+
+        # restored before the plugins are initialized, without calling any handler
+        self.state_store: Optional[StateStore] = None
+        if core.config.state_store:
+            self.state_store = StateStore(
+                core, core.config.state_store_path or f"{core.location}/state/entities.db"
+            )
+            self.state_store.restore(self._entities)
+
         self.load_and_build_scenes(f"{core.location}/config/scenes")
 
-        self.state_queue = MultisubscriberQueue()
+        self.state_queue: BroadcastChannel[Entity] = BroadcastChannel()
+
+        # commands of component calls, bulk calls and scenes, coalesced per component
+        self.mailbox = CommandMailbox(core.event_loop)
+        self.load_command_intervals(
+            f"{core.location}/config/settings/command_intervals.yaml"
+        )
+        core.api.gql.add_query(
+            "commandMailbox: [CommandMailboxStats]!", self.gql_mailbox_stats
+        )
+        core.api.add_metrics_provider(self.mailbox.render)
+
+        core.api.gql.add_mutation(
+            "callComponentMethods(commands: [ComponentCommand!]!): CommandResult!",
+            self.gql_call_methods,
+        )
+        core.api.register_rest_handler(
+            "/api/registry/commands", "POST", self.rest_call_methods
+        )
 
         core.io.add_output_service(
             "registry.activate_scene",
@@ -70,7 +112,7 @@ class EntityRegistry:
                 "registry.activate_scene",
                 self.activate_scene_handler,
                 None,
-                doc=build_doc(self.activate_scene_handler),
+                doc=lazy_doc(self.activate_scene_handler),
             ),
         )
 
@@ -80,7 +122,7 @@ class EntityRegistry:
                 "registry.deactivate_scene",
                 self.deactivate_scene_handler,
                 None,
-                doc=build_doc(self.deactivate_scene_handler),
+                doc=lazy_doc(self.deactivate_scene_handler),
             ),
         )
 
@@ -90,7 +132,7 @@ class EntityRegistry:
                 "registry.set_state",
                 self.set_state,
                 None,
-                doc=build_doc(self.set_state),
+                doc=lazy_doc(self.set_state),
             ),
         )
 
@@ -112,7 +154,7 @@ class EntityRegistry:
         :param context:
         :return:
         """
-        self.activate_scene(scene)
+        await self.async_activate_scene(scene, context)
 
     async def deactivate_scene_handler(self, _: Any, context: Context, scene: str = ""):
         """
@@ -122,7 +164,7 @@ class EntityRegistry:
         :param context:
         :return:
         """
-        self.deactivate_scene(scene)
+        await self.async_deactivate_scene(scene, context)
 
     def get_entities(self):
         return self._entities
@@ -167,10 +209,18 @@ class EntityRegistry:
             if not context:
                 context = Context.admin()
             entity = self.get_entity(entity)
-            new_state: Any = await entity.call_method(
-                component, method, target, context
+            if component not in entity.components:
+                raise ComponentNotFound
+            new_state: Any = await self.mailbox.submit(
+                entity.components[component],
+                method,
+                partial(entity.call_method, component, method, target, context),
             )
-            await self.state_queue.put(entity)
+            if new_state is COALESCED:
+                return
+            self.state_queue.put_nowait(entity)
+            if self.state_store is not None:
+                self.state_store.mark(entity)
             self.dispatch_state_change_event(
                 entity, component, new_state, context, context=context
             )
@@ -183,6 +233,18 @@ class EntityRegistry:
                 f"couldn't call method {method}, as there is not '{component}' component attached to '{entity}'"
             )
 
+    def load_command_intervals(self, path: str):
+        """loads the min interval in seconds between commands per component type, {component type: interval}"""
+        intervals = yaml_utils.load_yaml(path)
+        if type(intervals) is not dict:
+            return
+
+        for component_type, interval in intervals.items():
+            self.mailbox.set_min_interval(component_type, float(interval))
+
+    async def gql_mailbox_stats(self, *_):
+        return [stats.gql() for stats in self.mailbox.stats.values()]
+
     def dispatch_state_change_event(
         self,
         entity: Entity,
@@ -211,11 +273,209 @@ class EntityRegistry:
     def deactivate_scene(self, scene: str):
         self._scenes[scene].deactivate()
 
+    async def async_activate_scene(
+        self, scene: str, context: Context = None
+    ) -> SceneResult:
+        return await self._scenes[scene].async_activate(context)
+
+    async def async_deactivate_scene(
+        self, scene: str, context: Context = None
+    ) -> SceneResult:
+        return await self._scenes[scene].async_deactivate(context)
+
+    def scene_changed(self, result: SceneResult, context: Context):
+        """publishes the changes of a scene as one event, instead of one per component"""
+        self._publish_changes(SCENE_CHANGED, result, context)
+
+    def _publish_changes(self, event_type: str, result: CommandResult, context: Context):
+        """
+        publishes the changes of a bulk call or scene as one event.
+        With the state_change_events option, listeners of ENTITY_STATE_CHANGED like flows
+        also get one event per change, as for single method calls.
+        """
+        for entity in result.entities:
+            self.state_queue.put_nowait(entity)
+            if self.state_store is not None:
+                self.state_store.mark(entity)
+        self.core.bus.dispatch(
+            Event(
+                event_type=event_type,
+                event_content=result.to_json(),
+                context=context,
+            )
+        )
+        if self.core.config.state_change_events:
+            for change in result.changes:
+                self.dispatch_state_change_event(
+                    change["entity"],
+                    change["component"],
+                    change["new_state"],
+                    context,
+                    context=context,
+                )
+
+    def resolve_command(
+        self, entity: str, component: str, method: str, target: Any
+    ) -> ComponentCommand:
+        """
+        :raises EntityNotFound: if there is no such entity
+        :raises ComponentNotFound: if the entity has no such component or the component no such method
+        """
+        _entity = self.get_entity(entity)
+        try:
+            _component = _entity.components[component]
+            return ComponentCommand(
+                _entity, _component, _component.methods[method], target, method
+            )
+        except KeyError:
+            raise ComponentNotFound
+
+    async def call_methods_bulk(
+        self, commands: List[Dict[str, Any]], context: Context = None
+    ) -> CommandResult:
+        """
+        calls many component methods at once, the changes are published as one batched event,
+        nothing is published if no command changed anything.
+        Commands for different entities run concurrently, commands for the same entity in order.
+        Every command is queued in the mailbox of its component, like single method calls.
+        :param commands: dicts with entity, component, method (defaults to 'set') and target
+        :param context: executing context
+        """
+        context = context or Context.admin()
+        result = CommandResult()
+        resolved = []
+        for command in commands:
+            address = f"{command.get('entity')}.{command.get('component')}"
+            try:
+                resolved.append(
+                    self.resolve_command(
+                        command.get("entity"),
+                        command.get("component"),
+                        command.get("method") or "set",
+                        command.get("target"),
+                    )
+                )
+            except EntityNotFound:
+                result.failed[address] = "entity not found"
+            except ComponentNotFound:
+                result.failed[address] = "component or method not found"
+
+        await run_commands(
+            resolved, context, self.core.config.scene_concurrency, result, self.mailbox
+        )
+        if result.changes:
+            self._publish_changes(ENTITY_STATES_CHANGED, result, context)
+        return result
+
+    async def gql_call_methods(self, *_, commands=None):
+        result = await self.call_methods_bulk(
+            commands or [], Context.admin(external=True)
+        )
+        return result.gql()
+
+    async def rest_call_methods(self, request: web.Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "invalid json"}, status=400)
+        commands = body.get("commands") if type(body) is dict else body
+        if type(commands) is not list or not all(type(c) is dict for c in commands):
+            return web.json_response({"error": "expected a list of commands"}, status=400)
+        result = await self.call_methods_bulk(commands, Context.admin(external=True))
+        return web.json_response(result.gql())
+
     def get_scenes(self) -> List[str]:
         return list(self._scenes.keys())
 
     def add_entity(self, name, entity: Entity):
+        if name in self._entities:
+            self._unindex(name, self._entities[name])
         self._entities[name] = entity
+        self._index(name, entity)
+
+    def remove_entity(self, name: str) -> Entity:
+        try:
+            entity = self._entities.pop(name)
+        except KeyError:
+            raise EntityNotFound
+        self._unindex(name, entity)
+        return entity
+
+    def reindex(self, name: str):
+        """updates the indexes after components or settings of a registered entity changed"""
+        entity = self.get_entity(name)
+        self._unindex(name, entity)
+        self._index(name, entity)
+
+    @staticmethod
+    def _index_keys(entity: Entity):
+        """(index, key) pairs of an entity, settings set to false are opted out and not indexed"""
+        yield "type", entity.type
+        for component in entity.components.values():
+            yield "component", component.type
+        for key, value in entity.settings.items():
+            if value is not False:
+                yield "setting", key
+
+    def _indexes(self) -> Dict[str, Dict[Any, Dict[str, Entity]]]:
+        return {
+            "type": self._by_type,
+            "component": self._by_component,
+            "setting": self._by_setting,
+        }
+
+    def _index(self, name: str, entity: Entity):
+        indexes = self._indexes()
+        for index, key in self._index_keys(entity):
+            indexes[index].setdefault(key, {})[name] = entity
+
+    def _unindex(self, name: str, entity: Entity):
+        indexes = self._indexes()
+        for index, key in self._index_keys(entity):
+            indexes[index].get(key, {}).pop(name, None)
+
+    # ----------- QUERIES -----------
+    # the returned views are read only and stay up to date, building one is O(1).
+    # index entries are kept once created, so views of currently empty keys stay valid
+
+    def entities_of_type(self, entity_type: EntityType) -> Mapping[str, Entity]:
+        return MappingProxyType(self._by_type.setdefault(entity_type, {}))
+
+    def entities_with_component(self, component_type: str) -> Mapping[str, Entity]:
+        return MappingProxyType(self._by_component.setdefault(component_type, {}))
+
+    def entities_with_setting(self, key: str) -> Mapping[str, Entity]:
+        return MappingProxyType(self._by_setting.setdefault(key, {}))
+
+    def find_entities(
+        self,
+        entity_type: Optional[EntityType] = None,
+        component: Optional[str] = None,
+        setting: Optional[str] = None,
+    ) -> List[Entity]:
+        """
+        entities matching all given filters, by iterating the smallest matching index.
+        :param entity_type: type of the entity
+        :param component: type of one of its components
+        :param setting: top level settings key
+        """
+        views: List[Dict[str, Entity]] = []
+        if entity_type is not None:
+            views.append(self._by_type.get(entity_type, {}))
+        if component is not None:
+            views.append(self._by_component.get(component, {}))
+        if setting is not None:
+            views.append(self._by_setting.get(setting, {}))
+        if not views:
+            return list(self._entities.values())
+
+        views.sort(key=len)
+        smallest, rest = views[0], views[1:]
+        return [
+            entity
+            for name, entity in smallest.items()
+            if all(name in view for view in rest)
+        ]
 
     def add_template_builder(
         self, entity_type: str, builder: Callable[["EntityRegistry", str, Dict], Entity]
@@ -255,8 +515,7 @@ class EntityRegistry:
     def load_and_build_scenes(self, path: str):
         for config, file in yaml_utils.for_yaml_in(path):
             name = config.get("name", None) or file[:-5]
-            scene = Scene(self.core)
-            print(config)
+            scene = Scene(self.core, name, self.core.config.scene_concurrency)
             if True in config:
                 scene.states = config[True]
             if False in config:
@@ -265,6 +524,7 @@ class EntityRegistry:
             if True not in config and False not in config:
                 scene.states = config
 
+            scene.compile(self)
             self._scenes[name] = scene
 
     @property
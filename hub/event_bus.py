@@ -1,31 +1,43 @@
 import asyncio
-import inspect
 import logging
-from typing import Dict, List, Callable, TYPE_CHECKING, Any
-
-from asyncio_multisubscriber_queue import MultisubscriberQueue
+from typing import Dict, List, Callable, TYPE_CHECKING, Any, Optional, Tuple
 
 from constants import events, scopes
 from constants.scopes import BUS, DISPATCH_EVENT
 from exceptions import EventCallbackNotFound, NotAuthorizedError
+from helper import yaml_utils
+from helper.broadcast import BroadcastChannel
+from helper.coalescer import Coalescer, CoalescingRule, KeyExtractor, content_key
+from helper.event_logging import SamplingPolicy, start_event_sink
+from helper.lanes import PriorityLanes
+from helper.metrics import BusMetrics
+from helper.subscription_index import SubscriptionIndex
 from objects.Context import Context
-from objects.Event import Event
+from objects.Event import Event, Priority
+from objects.core_state import CoreState
 from objects.InputService import InputService
+from objects.job import JobDescriptor
 from objects.OutputService import OutputService
-from loader.plugin_loader import build_doc
+from helper.service_docs import lazy_doc
 
 if TYPE_CHECKING:
     from core import Core
+    from journal import EventJournal
 
 LOGGER = logging.getLogger("EventBus")
+EVENT_LOGGER = logging.getLogger("EventBus.events")
 
 silent_events = [events.MATCH_ALL]
 
+Waiter = Tuple[asyncio.Future, Optional[Callable[[Event], bool]]]
+
 
 class EventBus:
     def __init__(self, core: "Core"):
-        self._listeners: Dict[str, List] = {}
+        self._listeners = SubscriptionIndex(match_all=events.MATCH_ALL)
         self.core = core
+        self.journal: Optional["EventJournal"] = None
+        self._waiters: Dict[str, List[Waiter]] = {}
 
         # IO setup
         core.io.add_output_service(
@@ -34,7 +46,7 @@ class EventBus:
                 "bus.dispatch",
                 self.dispatch_event_service,
                 None,
-                doc=build_doc(self.dispatch_event_service),
+                doc=lazy_doc(self.dispatch_event_service),
             ),
         )
 
@@ -45,11 +57,52 @@ class EventBus:
 
         core.api.gql.add_mutation("dispatchEvent(eventType: String, eventContent: Any): Boolean", self.gql_dispatch_event)
 
-        self._event_stream = MultisubscriberQueue()
+        self._event_stream: BroadcastChannel[Event] = BroadcastChannel()
+
+        self._priorities = SubscriptionIndex()
+        self._lanes = PriorityLanes(Priority, self._deliver)
+        self.load_priorities(f"{core.location}/config/settings/priorities.yaml")
+        core.add_job(self._lanes.run, daemon=True)
+
+        core.api.gql.add_query("eventLanes: [EventLane]!", self.gql_event_lanes)
+
+        self._coalescer = Coalescer(core.event_loop, self._enqueue)
+        self.load_coalescing_rules(f"{core.location}/config/settings/coalescing.yaml")
+
+        self.log_policy = SamplingPolicy()
+        for event_type in silent_events:
+            self.log_policy.set_rate(event_type, 0)
+        self.load_log_rates(f"{core.location}/config/settings/event_logging.yaml")
+
+        self.metrics: Optional[BusMetrics] = None
+        if core.config.bus_metrics:
+            self.metrics = BusMetrics()
+            core.api.gql.add_query("busMetrics: BusMetrics!", self.gql_metrics)
+            core.api.add_metrics_provider(self.metrics.render)
+
+        self._event_sink = None
+        if core.config.event_log:
+            self._event_sink = start_event_sink(EVENT_LOGGER, core.config.event_log)
+            core.add_lifecycle_hook(CoreState.STOPPING, self._event_sink.stop)
 
     async def gql_dispatch_event(self, *_, eventType="", eventContent=None):
         self.core.bus.dispatch(Event(event_type=eventType, event_content=eventContent))
 
+    async def gql_event_lanes(self, *_):
+        depth = self._lanes.depth
+        return [
+            {
+                "name": priority.name.lower(),
+                "depth": depth[priority.name.lower()],
+                "maxDepth": self._lanes.max_depth[priority],
+                "processed": self._lanes.processed[priority],
+            }
+            for priority in Priority
+        ]
+
+    async def gql_metrics(self, *_):
+        return self.metrics.gql()
+
     def dispatch(self, event: Event):
         """Dispatches an event on the bus"""
         self.core.add_job(self.async_dispatch, event)
@@ -60,35 +113,131 @@ class EventBus:
         if not event.context.authorize(scopes.BUS, scopes.WRITE):
             return
 
-        listeners = []
+        if not self._coalescer.submit(event):
+            self._enqueue(event)
 
-        for fragment in event.walk_path():
-            listeners += self._listeners.get(fragment, [])
-            # getting top level matches
-            listeners += self._listeners.get(f"{fragment}.*", [])
+    def _enqueue(self, event: Event):
+        priority = event.priority
+        if priority is None:
+            priorities = self._priorities.resolve(event.event_type)
+            priority = priorities[-1] if priorities else Priority.NORMAL
+        self._lanes.put(event, priority)
 
-        listeners += self._listeners.get(events.MATCH_ALL, [])
+    def _deliver(self, event: Event):
+        listeners = self._listeners.resolve(event.event_type)
 
-        if event.event_type not in silent_events:
-            LOGGER.info(event)
-
-        for handler in listeners:
-            if len(inspect.signature(handler).parameters) == 2:
-                self.core.add_job(handler, event, event.context)
+        if self.log_policy.sample(event.event_type):
+            if self._event_sink:
+                EVENT_LOGGER.info(event.event_type, extra={"event": event})
             else:
-                self.core.add_job(handler, event)
+                LOGGER.info("%r", event)
+
+        if self.journal:
+            self.journal.append(event)
+
+        if event.event_type in self._waiters:
+            self._resolve_waiters(event)
+
+        metrics = self.metrics
+        if metrics:
+            metrics.record_dispatch(event.event_type, len(listeners))
+
+        for listener in listeners:  # type: JobDescriptor
+            stats = metrics.handler(listener.owner, listener.name) if metrics else None
+            try:
+                if listener.pass_context:
+                    self.core.async_add_described_job(
+                        listener, event, event.context, stats=stats
+                    )
+                else:
+                    self.core.async_add_described_job(listener, event, stats=stats)
+            except Exception:
+                LOGGER.exception(f"calling {listener.name} for {event.event_type} failed")
+
+        self._event_stream.put_nowait(event)
+
+    def coalesce(
+        self,
+        event_type: str,
+        window: float,
+        key: Optional[KeyExtractor] = None,
+        leading: bool = False,
+        trailing: bool = True,
+        max_latency: Optional[float] = None,
+    ) -> Callable:
+        """coalesce bursts of events, listeners and the event stream receive at most one event per window
+        :param event_type: event type pattern, ending with '.*' matches everything downwards
+        :param window: debounce window in seconds
+        :param key: key extractor, events with different keys are coalesced independently
+        :param leading: deliver the first event of a burst immediately
+        :param trailing: deliver the latest event of a burst when the window closes
+        :param max_latency: maximum time in seconds an event is held back
+        :return: method to remove the rule
+        """
+        rule = CoalescingRule(window, key, leading, trailing, max_latency)
+        self._coalescer.add_rule(event_type, rule)
 
-        await self._event_stream.put(event)
+        def remove():
+            self._coalescer.remove_rule(event_type, rule)
+
+        return remove
+
+    def set_priority(self, event_type: str, priority: Priority) -> Callable:
+        """sets the dispatch priority for an event type pattern, the most specific pattern wins
+        :param event_type: event type pattern, ending with '.*' matches everything downwards
+        :param priority: priority lane
+        :return: method to remove the priority
+        """
+        self._priorities.add(event_type, priority)
+
+        def remove():
+            self._priorities.remove(event_type, priority)
+
+        return remove
+
+    def load_priorities(self, path: str):
+        """loads event type priorities from a yaml mapping of {event type pattern: high|normal|low}"""
+        priorities = yaml_utils.load_yaml(path)
+        if type(priorities) is not dict:
+            return
+
+        for event_type, priority in priorities.items():
+            self.set_priority(event_type, Priority[priority.upper()])
+
+    def load_log_rates(self, path: str):
+        """loads event logging sample rates from a yaml mapping of {event type pattern: rate}"""
+        rates = yaml_utils.load_yaml(path)
+        if type(rates) is not dict:
+            return
+
+        for event_type, rate in rates.items():
+            self.log_policy.set_rate(event_type, float(rate))
+
+    def load_coalescing_rules(self, path: str):
+        """loads coalescing rules from a yaml list of {event, window, key, leading, trailing, max_latency}"""
+        rules = yaml_utils.load_yaml(path)
+        if type(rules) is not list:
+            return
+
+        for rule in rules:
+            key = rule.get("key")
+            if isinstance(key, str):
+                key = [key]
+            self.coalesce(
+                rule["event"],
+                rule["window"],
+                key=content_key(*key) if key else None,
+                leading=rule.get("leading", False),
+                trailing=rule.get("trailing", True),
+                max_latency=rule.get("max_latency"),
+            )
 
     def listen(self, event_type: str, callback: Callable) -> Callable:
         """listen for events on the bus
         :param callback: callback to be called
         :param event_type: ending the event_type with '.*' will result in a match with every from this point downwards.
         """
-        if event_type in self._listeners:
-            self._listeners[event_type].append(callback)
-        else:
-            self._listeners[event_type] = [callback]
+        self._listeners.add(event_type, JobDescriptor.describe(callback))
 
         def remove():
             self.remove_listener(event_type, callback)
@@ -105,42 +254,67 @@ class EventBus:
         :param raise_on_failure: raise an 'EventCallbackNotFound' exception on failure
         :return:
         """
-        try:
-            self._listeners[event_type.upper()].remove(callback)
-        except ValueError:
-            if raise_on_failure:
-                raise EventCallbackNotFound
-        except KeyError:
-            if raise_on_failure:
-                raise EventCallbackNotFound
-
-    def listen_once(self, event_type: str, callback: Callable):
-        """listens for an event and removes the callback after the first invocation"""
+        listener = JobDescriptor.describe(callback)
+        if not self._listeners.remove(event_type, listener) and raise_on_failure:
+            raise EventCallbackNotFound
 
-        def _callback(event: Event):
+    def listen_once(self, event_type: str, callback: Callable) -> Callable:
+        """listens for an event and removes the callback after the first invocation"""
+        fired = False
+
+        async def _callback(event: Event):
+            nonlocal fired
+            if fired:
+                return
+            fired = True
+            remove()
             self.core.add_job(callback, event)
-            self.remove_listener(event_type, callback)
 
-        self.listen(event_type, _callback)
+        remove = self.listen(event_type, _callback)
+        return remove
 
-    async def wait_for(self, event_type: str) -> Event:
+    async def wait_for(
+        self,
+        event_type: str,
+        predicate: Optional[Callable[[Event], bool]] = None,
+        timeout: Optional[float] = None,
+    ) -> Event:
         """asynchronously wait for an event on the event bus
-        :param event_type: event type
+        :param event_type: exact event type (no patterns)
+        :param predicate: only resolve on events for which the predicate returns True
+        :param timeout: seconds until asyncio.TimeoutError is raised
         :return: Event
         """
-        # using a dict as a mutable data structure
-        event = {}
-        lock = asyncio.locks.Event(loop=self.core.event_loop)
-        lock.clear()
-
-        async def callback(_event: Event):
-            event["event"] = _event
-            lock.set()
-
-        self.listen_once(event_type, callback)
+        future = self.core.event_loop.create_future()
+        waiter: Waiter = (future, predicate)
+        self._waiters.setdefault(event_type, []).append(waiter)
 
-        await lock.wait()
-        return event["event"]
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # resolved waiters are already gone, this only runs on timeout or cancellation
+            waiters = self._waiters.get(event_type)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[event_type]
+
+    def _resolve_waiters(self, event: Event):
+        remaining = []
+        for future, predicate in self._waiters.pop(event.event_type):
+            if future.done():
+                continue
+            try:
+                matches = predicate is None or predicate(event)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            if matches:
+                future.set_result(event)
+            else:
+                remaining.append((future, predicate))
+        if remaining:
+            self._waiters[event.event_type] = remaining
 
     async def dispatch_event_service(
         self, content: Any, context: Context, event_type: str = ""
@@ -161,5 +335,5 @@ class EventBus:
             )
 
     @property
-    def event_stream(self) -> MultisubscriberQueue:
+    def event_stream(self) -> BroadcastChannel[Event]:
         return self._event_stream
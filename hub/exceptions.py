@@ -40,5 +40,9 @@ class NotAuthorizedError(Exception):
         self.scope = scope
 
 
+class PluginUnavailable(Exception):
+    pass
+
+
 class Interrupt(Exception):
     pass
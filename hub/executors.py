@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from constants.plugin_api import PLUGIN_NAME_ATTR
+from decorators import get_executor
+from helper import yaml_utils
+from objects.core_state import CoreState
+
+if TYPE_CHECKING:
+    from core import Core
+
+LOGGER = logging.getLogger("Executors")
+
+DEFAULT = "default"
+THREAD = "thread"
+PROCESS = "process"
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class ExecutorPool:
+    """
+    Named executor with a bounded queue.
+    Jobs run in a process pool have to be picklable, use module level functions instead of plugin methods.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = THREAD,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.max_queue = max_queue
+
+        if kind == PROCESS:
+            self.workers = workers or os.cpu_count() or 1
+            self.executor: Executor = ProcessPoolExecutor(self.workers)
+        elif kind == THREAD:
+            self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+            self.executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix=f"pool-{name}"
+            )
+        else:
+            raise ValueError(f"unknown executor kind '{kind}'")
+
+        self.pending = 0
+        self.peak = 0
+        self.saturated = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def run(
+        self, loop: asyncio.AbstractEventLoop, func: Callable, *args
+    ) -> asyncio.Future:
+        """
+        runs func in the pool. must be run in the event loop.
+        :return: a future, failed with PoolSaturated if the queue of the pool is full
+        """
+        if self.max_queue is not None and self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            LOGGER.warning(f"pool '{self.name}' is saturated, rejecting {func}")
+            future = loop.create_future()
+            future.set_exception(
+                PoolSaturated(f"{self.pending} jobs pending in pool '{self.name}'")
+            )
+            return future
+
+        self.pending += 1
+        if self.pending > self.workers:
+            self.saturated += 1
+        self.peak = max(self.peak, self.pending)
+
+        future = loop.run_in_executor(self.executor, func, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _):
+        self.pending -= 1
+        self.completed += 1
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    def gql(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "pending": self.pending,
+            "queued": self.queued,
+            "peak": self.peak,
+            "saturated": self.saturated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+        }
+
+
+class Executors:
+    """
+    Routes blocking jobs to named pools.
+    A pool is chosen by the @executor decorator, then by the plugin owning the job, falling back to the default pool.
+    """
+
+    def __init__(self, core: "Core", default_workers: Optional[int] = None):
+        self.core = core
+        self.pools: Dict[str, ExecutorPool] = {
+            DEFAULT: ExecutorPool(DEFAULT, workers=default_workers)
+        }
+        self._plugins: Dict[str, str] = {}
+
+        # run_in_executor(None, ...) outside of the core ends up in the default pool as well
+        core.event_loop.set_default_executor(self.pools[DEFAULT].executor)
+
+        self.load(f"{core.location}/config/settings/executors.yaml")
+
+        core.api.gql.add_query("executorPools: [ExecutorPool]!", self.gql_pools)
+        core.api.add_metrics_provider(self.render)
+        core.add_lifecycle_hook(CoreState.STOPPING, self.report)
+
+    def add_pool(
+        self,
+        name: str,
+        kind: str = THREAD,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ):
+        if name in self.pools:
+            raise ValueError(f"pool '{name}' already exists")
+        self.pools[name] = ExecutorPool(name, kind, workers, max_queue)
+
+    def assign_plugin(self, plugin: str, pool: str):
+        """runs all blocking jobs of a plugin in the given pool"""
+        self._plugins[plugin.upper()] = pool
+
+    def load(self, path: str):
+        """
+        loads pools from a yaml mapping of
+        {pools: {name: {kind, workers, max_queue}}, plugins: {plugin name: pool name}}
+        """
+        config = yaml_utils.load_yaml(path)
+        if type(config) is not dict:
+            return
+
+        for name, pool in (config.get("pools") or {}).items():
+            pool = pool or {}
+            self.add_pool(
+                name,
+                pool.get("kind", THREAD),
+                pool.get("workers"),
+                pool.get("max_queue"),
+            )
+        for plugin, pool in (config.get("plugins") or {}).items():
+            self.assign_plugin(plugin, pool)
+
+    def get(self, job: Callable) -> ExecutorPool:
+        name = get_executor(job)
+        if name is None and self._plugins:
+            owner = getattr(job, "__self__", None)
+            plugin = getattr(type(owner), PLUGIN_NAME_ATTR, None)
+            name = self._plugins.get(plugin.upper()) if plugin else None
+        if name is None:
+            return self.pools[DEFAULT]
+
+        try:
+            return self.pools[name]
+        except KeyError:
+            LOGGER.warning(f"unknown executor pool '{name}', using the default pool")
+            return self.pools[DEFAULT]
+
+    def run(
+        self, job: Callable, *args, target: Optional[Callable] = None
+    ) -> asyncio.Future:
+        """
+        runs a blocking job in its pool. must be run in the event loop.
+        :param target: callable to run instead of the job, e.g. a wrapper of it. the pool is still chosen by the job
+        """
+        return self.get(job).run(self.core.event_loop, target or job, *args)
+
+    async def gql_pools(self, *_):
+        return [pool.gql() for pool in self.pools.values()]
+
+    def render(self) -> str:
+        lines = []
+        for metric, kind, attr in (
+            ("hub_executor_workers", "gauge", "workers"),
+            ("hub_executor_pending", "gauge", "pending"),
+            ("hub_executor_peak", "gauge", "peak"),
+            ("hub_executor_saturated_total", "counter", "saturated"),
+            ("hub_executor_rejected_total", "counter", "rejected"),
+            ("hub_executor_completed_total", "counter", "completed"),
+        ):
+            lines.append(f"# TYPE {metric} {kind}")
+            for pool in self.pools.values():
+                lines.append(f'{metric}{{pool="{pool.name}"}} {getattr(pool, attr)}')
+        return "\n".join(lines) + "\n"
+
+    async def report(self):
+        for pool in self.pools.values():
+            LOGGER.info(
+                f"pool '{pool.name}': {pool.completed} completed, peak of {pool.peak} pending, "
+                f"{pool.saturated} queued, {pool.rejected} rejected"
+            )
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.executor.shutdown(wait=False)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from contextlib import suppress
+from enum import Enum
+from typing import AsyncIterator, Generic, List, Optional, TypeVar
+
+LOGGER = logging.getLogger("Broadcast")
+
+T = TypeVar("T")
+
+
+class Policy(Enum):
+    """What happens to a subscriber which falls behind by more than the channel capacity."""
+
+    DROP_OLDEST = "drop_oldest"  # skip the overwritten items and continue with the oldest retained one
+    CONFLATE = "conflate"  # always skip to the latest item
+    DISCONNECT = "disconnect"  # end the subscription
+
+
+class BroadcastChannel(Generic[T]):
+    """
+    Bounded fan-out channel backed by a single ring buffer.
+    Every item is stored once, subscribers only keep a read cursor.
+    Publishing never blocks, slow subscribers are handled according to their policy.
+    """
+
+    def __init__(self, capacity: int = 256):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._capacity = capacity
+        self._buffer: List[Optional[T]] = [None] * capacity
+        self._head = 0  # sequence number of the next item
+        self._waiters: List[asyncio.Future] = []
+
+        self.subscribers = 0
+        self.dropped = 0
+
+    def put_nowait(self, item: T):
+        """publishes an item to all subscribers. must be run in the event loop."""
+        self._buffer[self._head % self._capacity] = item
+        self._head += 1
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def put(self, item: T):
+        """publishes an item to all subscribers. Never waits for slow subscribers."""
+        self.put_nowait(item)
+
+    async def _wait(self):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with suppress(ValueError):
+                self._waiters.remove(waiter)
+            raise
+
+    async def subscribe(self, policy: Policy = Policy.DROP_OLDEST) -> AsyncIterator[T]:
+        """
+        yields every item published after subscribing
+        :param policy: behaviour when the subscriber falls behind
+        """
+        cursor = self._head
+        self.subscribers += 1
+        try:
+            while True:
+                if cursor == self._head:
+                    await self._wait()
+                    continue
+
+                if policy is Policy.CONFLATE:
+                    self.dropped += self._head - cursor - 1
+                    cursor = self._head - 1
+                elif (lag := self._head - cursor) > self._capacity:
+                    if policy is Policy.DISCONNECT:
+                        LOGGER.warning(
+                            f"disconnecting subscriber, {lag} items behind (capacity {self._capacity})"
+                        )
+                        return
+                    self.dropped += lag - self._capacity
+                    cursor = self._head - self._capacity
+
+                item = self._buffer[cursor % self._capacity]
+                cursor += 1
+                yield item
+        finally:
+            self.subscribers -= 1
+
+    def __len__(self) -> int:
+        return min(self._head, self._capacity)
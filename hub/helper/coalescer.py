@@ -0,0 +1,117 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TYPE_CHECKING
+
+from helper.subscription_index import SubscriptionIndex
+
+if TYPE_CHECKING:
+    from objects.Event import Event
+
+KeyExtractor = Callable[["Event"], Hashable]
+
+
+def content_key(*fields: str) -> KeyExtractor:
+    """
+    builds a key extractor from top level keys of a dict event content, e.g. content_key('entity').
+    Events with any other content share the None key.
+    """
+
+    def extractor(event: "Event") -> Hashable:
+        content = event.event_content
+        if not isinstance(content, dict):
+            return None
+        return tuple(content.get(field) for field in fields)
+
+    return extractor
+
+
+@dataclass(frozen=True, eq=False)
+class CoalescingRule:
+    """
+    Rules compare by identity, so removing one never removes an equal rule.
+    :param window: debounce window in seconds, restarted by every new event
+    :param key: splits an event type into independent windows (e.g. per entity)
+    :param leading: deliver the first event of a burst immediately
+    :param trailing: deliver the latest event when the window closes
+    :param max_latency: upper bound in seconds between a held back event and its delivery
+    """
+
+    window: float
+    key: Optional[KeyExtractor] = None
+    leading: bool = False
+    trailing: bool = True
+    max_latency: Optional[float] = None
+
+
+class _Window:
+    __slots__ = ("pending", "held_since", "handle")
+
+    def __init__(self):
+        self.pending: Optional["Event"] = None
+        self.held_since: Optional[float] = None
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class Coalescer:
+    """Collapses bursts of events into at most one delivery per window."""
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, deliver: Callable[["Event"], Any]
+    ):
+        self._loop = loop
+        self._deliver = deliver
+        self._rules = SubscriptionIndex()
+        self._windows: Dict[Tuple, _Window] = {}
+
+        self.coalesced = 0
+
+    def add_rule(self, pattern: str, rule: CoalescingRule):
+        if not (rule.leading or rule.trailing):
+            raise ValueError("a coalescing rule needs a leading or a trailing edge")
+        self._rules.add(pattern, rule)
+
+    def remove_rule(self, pattern: str, rule: CoalescingRule) -> bool:
+        return self._rules.remove(pattern, rule)
+
+    def submit(self, event: "Event") -> bool:
+        """
+        :return: False if no rule applies and the event has to be delivered by the caller
+        """
+        rules = self._rules.resolve(event.event_type)
+        if not rules:
+            return False
+        rule: CoalescingRule = rules[-1]  # most specific pattern wins
+
+        key = (id(rule), event.event_type, rule.key(event) if rule.key else None)
+        now = self._loop.time()
+        window = self._windows.get(key)
+
+        if window is None:
+            window = self._windows[key] = _Window()
+            if rule.leading:
+                self._deliver(event)
+            else:
+                window.pending = event
+                window.held_since = now
+        else:
+            if window.pending is not None:
+                self.coalesced += 1
+            elif window.held_since is None:
+                window.held_since = now
+            window.pending = event
+            window.handle.cancel()
+
+        delay = rule.window
+        if rule.max_latency is not None and window.held_since is not None:
+            delay = max(0.0, min(delay, window.held_since + rule.max_latency - now))
+        window.handle = self._loop.call_later(delay, self._close, key, rule)
+        return True
+
+    def _close(self, key: Tuple, rule: CoalescingRule):
+        window = self._windows.pop(key)
+        if window.pending is None:
+            return
+        if rule.trailing:
+            self._deliver(window.pending)
+        else:
+            self.coalesced += 1
@@ -0,0 +1,99 @@
+import json
+import logging
+import queue
+import reprlib
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict
+
+from helper.subscription_index import SubscriptionIndex
+
+CONTENT_LIMIT = 200
+
+# bounds the repr while it is built, a large content never gets rendered as a whole
+_CONTENT_REPR = reprlib.Repr()
+_CONTENT_REPR.maxstring = CONTENT_LIMIT
+_CONTENT_REPR.maxother = CONTENT_LIMIT
+
+
+class SamplingPolicy:
+    """Per event type sampling rates (0 - 1), the most specific pattern wins."""
+
+    def __init__(self, default_rate: float = 1.0):
+        self.default_rate = default_rate
+        self._rates = SubscriptionIndex()
+        self._counters: Dict[str, float] = {}
+
+    def set_rate(self, event_type: str, rate: float):
+        if not 0 <= rate <= 1:
+            raise ValueError("sampling rate must be between 0 and 1")
+        self._rates.add(event_type, rate)
+
+    def sample(self, event_type: str) -> bool:
+        """deterministic sampling, a rate of 0.25 logs every fourth event of a type"""
+        rates = self._rates.resolve(event_type)
+        rate = rates[-1] if rates else self.default_rate
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        credit = self._counters.get(event_type, 1.0) + rate
+        if credit >= 1:
+            self._counters[event_type] = credit - 1
+            return True
+        self._counters[event_type] = credit
+        return False
+
+
+class EventQueueHandler(QueueHandler):
+    """
+    Formats records on the emitting thread and queues the formatted line.
+    The listener thread only writes it, it never reads the content of a live event.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.__dict__.pop("event", None)
+        return record
+
+
+class CompactEventFormatter(logging.Formatter):
+    """Formats records carrying an 'event' attribute as single line JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = getattr(record, "event", None)
+        if event is None:
+            return super().format(record)
+
+        content = _CONTENT_REPR.repr(event.event_content)
+        if len(content) > CONTENT_LIMIT:
+            content = content[:CONTENT_LIMIT] + "..."
+        return json.dumps(
+            {
+                "ts": round(record.created, 3),
+                "type": event.event_type,
+                "user": getattr(event.context.user, "name", None),
+                "remote": event.context.remote,
+                "content": content,
+            },
+            separators=(",", ":"),
+        )
+
+
+def start_event_sink(
+    logger: logging.Logger, path: str, max_bytes: int = 8 * 1024**2, backups: int = 3
+) -> QueueListener:
+    """
+    attaches a structured sink to the logger, records are written by a background thread.
+    :return: the listener, call stop() to flush and detach it
+    """
+    records = queue.SimpleQueue()
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+
+    handler = EventQueueHandler(records)
+    handler.setFormatter(CompactEventFormatter())
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    listener = QueueListener(records, file_handler)
+    listener.start()
+    return listener
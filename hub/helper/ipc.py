@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+import socket
+import struct
+from enum import IntEnum
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+
+from objects.Context import Context
+from objects.User import User
+
+LOGGER = logging.getLogger("IPC")
+
+# frame header: payload length, message kind, message id
+HEADER = struct.Struct("<IBI")
+# bytes waiting for the other side, after which frames are refused
+MAX_BUFFER = 4 * 1024 * 1024
+CONTEXT = "__context__"
+
+
+class Kind(IntEnum):
+    # worker -> core
+    REGISTER = 1  # services and formatters of the plugin
+    LISTEN = 2  # id: listener index, payload: event type
+    BIND = 3  # id: binding index, payload: storage key
+    DISPATCH = 4  # payload: (event type, content, context)
+    STORE = 5  # payload: (key, value)
+    TRIGGER = 6  # id: input callback, payload: args
+    RESULT = 7  # id: call, payload: return value
+    ERROR = 8  # id: call, payload: error message
+    # core -> worker
+    CALL = 9  # id: call, payload: (kind, name, args)
+    EVENT = 10  # id: listener index, payload: (event type, content, context)
+    VALUE = 11  # id: binding index, payload: value
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, Context):
+        user = obj.user
+        return {CONTEXT: [user.name, user.admin, user.scopes, obj.remote]}
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    raise TypeError(f"{type(obj).__name__} isn't json serializable")
+
+
+def _decode(obj: Dict) -> Any:
+    if CONTEXT in obj and len(obj) == 1:
+        name, admin, scopes, remote = obj[CONTEXT]
+        return Context(User(name, admin, scopes), remote)
+    return obj
+
+
+def _replace_context(context: Context, obj: Dict) -> Any:
+    if CONTEXT in obj and len(obj) == 1:
+        return context
+    return obj
+
+
+def peer_pid(writer: asyncio.StreamWriter) -> Optional[int]:
+    """pid of the process on the other side of a unix socket, None where the os doesn't tell"""
+    sock = writer.get_extra_info("socket")
+    if sock is None or not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = sock.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    return struct.unpack("3i", credentials)[0]
+
+
+class Connection:
+    """
+    Length prefixed json frames over a stream.
+    Tuples arrive as lists, contexts are sent as their user and restored on the other side.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        max_buffer: int = MAX_BUFFER,
+        context: Optional[Context] = None,
+    ):
+        """
+        :param context: replaces every received context, the peer's claims aren't trusted
+        """
+        self.reader = reader
+        self.writer = writer
+        self.max_buffer = max_buffer
+        self._object_hook = (
+            _decode if context is None else partial(_replace_context, context)
+        )
+
+    @property
+    def buffered(self) -> int:
+        """bytes written but not yet taken by the other side"""
+        return self.writer.transport.get_write_buffer_size()
+
+    def send(self, kind: Kind, message_id: int = 0, payload: Any = None) -> bool:
+        """
+        queues a frame, never blocks. Await drain to wait until the other side caught up.
+        :return: False if the payload couldn't be encoded or max_buffer bytes are still waiting
+        """
+        if self.buffered > self.max_buffer:
+            LOGGER.warning(
+                f"can't send {kind.name}, {self.buffered} bytes are waiting for the other side"
+            )
+            return False
+        try:
+            data = json.dumps(payload, default=_encode, separators=(",", ":")).encode()
+        except (TypeError, ValueError) as err:
+            LOGGER.warning(f"can't send {kind.name}, payload not encodable: {err}")
+            return False
+        self.writer.write(HEADER.pack(len(data), kind, message_id) + data)
+        return True
+
+    async def receive(self) -> Tuple[Kind, int, Any]:
+        """
+        reads the next frame, frames which can't be decoded are skipped.
+        :raises asyncio.IncompleteReadError: once the other side closed the connection
+        """
+        while True:
+            length, kind, message_id = HEADER.unpack(
+                await self.reader.readexactly(HEADER.size)
+            )
+            data = await self.reader.readexactly(length)
+            try:
+                return (
+                    Kind(kind),
+                    message_id,
+                    json.loads(data, object_hook=self._object_hook),
+                )
+            except (TypeError, ValueError) as err:
+                if kind == Kind.RESULT:  # the caller is waiting for it
+                    return Kind.ERROR, message_id, f"undecodable result: {err}"
+                LOGGER.warning(f"skipping undecodable frame of kind {kind}: {err}")
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def close(self):
+        self.writer.close()
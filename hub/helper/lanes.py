@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from collections import deque
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, List, Optional, Type
+
+LOGGER = logging.getLogger("PriorityLanes")
+
+
+class PriorityLanes:
+    """
+    One FIFO lane per priority (lower value = more urgent), drained by a single dispatcher task.
+    Higher lanes are always served first, unless a waiting lower lane has been passed over
+    'starvation_limit' times in a row.
+    """
+
+    def __init__(
+        self,
+        priorities: Type[IntEnum],
+        deliver: Callable[[Any], Any],
+        starvation_limit: int = 16,
+    ):
+        self._priorities: List[IntEnum] = sorted(priorities)
+        self._deliver = deliver
+        self._starvation_limit = starvation_limit
+
+        self._lanes: Dict[IntEnum, Deque] = {p: deque() for p in self._priorities}
+        self._skipped: Dict[IntEnum, int] = {p: 0 for p in self._priorities}
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.max_depth: Dict[IntEnum, int] = {p: 0 for p in self._priorities}
+        self.processed: Dict[IntEnum, int] = {p: 0 for p in self._priorities}
+
+    def put(self, item: Any, priority: IntEnum):
+        """enqueues an item. must be run in the event loop."""
+        lane = self._lanes[priority]
+        lane.append(item)
+        if len(lane) > self.max_depth[priority]:
+            self.max_depth[priority] = len(lane)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_lane(self) -> Optional[IntEnum]:
+        waiting = [p for p in self._priorities if self._lanes[p]]
+        if not waiting:
+            return None
+
+        chosen = waiting[0]
+        for priority in waiting[1:]:
+            if self._skipped[priority] >= self._starvation_limit:
+                chosen = priority
+                break
+
+        for priority in waiting:
+            if priority == chosen:
+                self._skipped[priority] = 0
+            elif priority > chosen:
+                self._skipped[priority] += 1
+        return chosen
+
+    async def run(self):
+        """
+        dispatcher loop, yields to the event loop after every item.
+        A failing delivery is logged and doesn't end the loop.
+        """
+        self._wakeup = asyncio.Event()
+        while True:
+            priority = self._next_lane()
+            if priority is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            item = self._lanes[priority].popleft()
+            try:
+                self._deliver(item)
+            except Exception:
+                LOGGER.exception(f"delivering {item!r} failed")
+            self.processed[priority] += 1
+            await asyncio.sleep(0)
+
+    @property
+    def depth(self) -> Dict[str, int]:
+        """current queue depth per lane"""
+        return {p.name.lower(): len(self._lanes[p]) for p in self._priorities}
@@ -0,0 +1,152 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from objects.component import Component
+
+
+class _Coalesced:
+    def __repr__(self):
+        return "COALESCED"
+
+
+# result of a command which was replaced by a newer one before it ran
+COALESCED = _Coalesced()
+
+
+@dataclass
+class MailboxStats:
+    component_type: str
+    submitted: int = 0
+    executed: int = 0
+    coalesced: int = 0
+    failed: int = 0
+
+    def gql(self):
+        return {
+            "componentType": self.component_type,
+            "submitted": self.submitted,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+        }
+
+
+class _Command:
+    __slots__ = ("method", "job", "future")
+
+    def __init__(
+        self, method: str, job: Callable[[], Awaitable], future: asyncio.Future
+    ):
+        self.method = method
+        self.job = job
+        self.future = future
+
+
+class _Mailbox:
+    __slots__ = ("queue", "task", "last_start")
+
+    def __init__(self):
+        self.queue: Deque[_Command] = deque()
+        self.task: Optional[asyncio.Task] = None
+        self.last_start = float("-inf")
+
+
+class CommandMailbox:
+    """
+    Runs the commands of every component one at a time.
+    While a command is in flight, a new command replaces the queued one if both call
+    the same method and the component lists the method as coalescible,
+    so only the latest target reaches the device.
+    Consecutive commands of a component type start at least its min interval apart.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._mailboxes: Dict[str, _Mailbox] = {}
+        self.min_intervals: Dict[str, float] = {}
+        self.stats: Dict[str, MailboxStats] = {}
+
+    def set_min_interval(self, component_type: str, interval: float):
+        self.min_intervals[component_type] = interval
+
+    def _stats(self, component: Component) -> MailboxStats:
+        if (stats := self.stats.get(component.type)) is None:
+            stats = self.stats[component.type] = MailboxStats(component.type)
+        return stats
+
+    def submit(
+        self, component: Component, method: str, job: Callable[[], Awaitable]
+    ) -> asyncio.Future:
+        """
+        queues a command for a component. must be run in the event loop.
+        :param job: coroutine function executing the command
+        :return: future with the result of the job,
+                 or COALESCED if a newer command replaced it
+        """
+        stats = self._stats(component)
+        stats.submitted += 1
+        if (mailbox := self._mailboxes.get(component.dotted)) is None:
+            mailbox = self._mailboxes[component.dotted] = _Mailbox()
+
+        queue = mailbox.queue
+        if queue and queue[-1].method == method and method in component.coalescible:
+            replaced = queue.pop()
+            if not replaced.future.done():
+                replaced.future.set_result(COALESCED)
+            stats.coalesced += 1
+
+        future = self._loop.create_future()
+        queue.append(_Command(method, job, future))
+        if mailbox.task is None:
+            mailbox.task = self._loop.create_task(self._drain(component, mailbox))
+        return future
+
+    async def _drain(self, component: Component, mailbox: _Mailbox):
+        stats = self._stats(component)
+        command: Optional[_Command] = None
+        try:
+            while mailbox.queue:
+                # commands arriving during the interval still replace the queued one
+                wait = (
+                    mailbox.last_start
+                    + self.min_intervals.get(component.type, 0)
+                    - self._loop.time()
+                )
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                command = mailbox.queue.popleft()
+                mailbox.last_start = self._loop.time()
+                try:
+                    result = await command.job()
+                except Exception as err:
+                    stats.failed += 1
+                    if not command.future.done():
+                        command.future.set_exception(err)
+                else:
+                    stats.executed += 1
+                    if not command.future.done():
+                        command.future.set_result(result)
+                command = None
+        finally:
+            mailbox.task = None
+            if command is not None and not command.future.done():
+                command.future.cancel()
+            while mailbox.queue:
+                mailbox.queue.popleft().future.cancel()
+
+    def render(self) -> str:
+        lines = []
+        for metric, attr in (
+            ("hub_component_commands_submitted_total", "submitted"),
+            ("hub_component_commands_executed_total", "executed"),
+            ("hub_component_commands_coalesced_total", "coalesced"),
+            ("hub_component_commands_failed_total", "failed"),
+        ):
+            lines.append(f"# TYPE {metric} counter")
+            for stats in self.stats.values():
+                labels = f'component_type="{stats.component_type}"'
+                lines.append(f"{metric}{{{labels}}} {getattr(stats, attr)}")
+        return "\n".join(lines) + "\n"
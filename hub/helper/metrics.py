@@ -0,0 +1,178 @@
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Dict, List, Tuple
+
+# upper bounds in seconds, the last bucket catches everything above
+BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+class Histogram:
+    """Fixed bucket histogram, observing a value is a bisect and two additions."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def gql(self) -> Dict[str, Any]:
+        return {
+            "buckets": list(BUCKETS),
+            "counts": list(self.counts),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+    def render(self, name: str, labels: str) -> List[str]:
+        """prometheus text format, cumulative buckets"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def label_value(value: str) -> str:
+    """escapes a label value for the prometheus text format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class HandlerStats:
+    __slots__ = ("queue_delay", "execution", "errors")
+
+    def __init__(self):
+        self.queue_delay = Histogram()
+        self.execution = Histogram()
+        self.errors = 0
+
+
+class EventTypeStats:
+    __slots__ = ("dispatched", "fanout")
+
+    def __init__(self):
+        self.dispatched = 0
+        self.fanout = 0
+
+
+def timed_coroutine(stats: HandlerStats, coroutine: Awaitable) -> Awaitable:
+    """wraps the coroutine, recording the time it waited to be started and its execution time"""
+    return _timed(stats, coroutine, time.perf_counter())
+
+
+async def _timed(stats: HandlerStats, coroutine: Awaitable, scheduled: float):
+    start = time.perf_counter()
+    stats.queue_delay.observe(start - scheduled)
+    try:
+        return await coroutine
+    except Exception:
+        stats.errors += 1
+        raise
+    finally:
+        stats.execution.observe(time.perf_counter() - start)
+
+
+def timed_future(stats: HandlerStats, future: asyncio.Future):
+    """
+    records the execution time of a job run in an executor, measured in the event loop.
+    It includes the time the job was queued in its pool, the job itself isn't wrapped,
+    so it stays picklable for process pools.
+    """
+    scheduled = time.perf_counter()
+
+    def done(_):
+        stats.execution.observe(time.perf_counter() - scheduled)
+        if not future.cancelled() and future.exception() is not None:
+            stats.errors += 1
+
+    future.add_done_callback(done)
+
+
+class BusMetrics:
+    """Dispatch counters per event type and latency histograms per handler and owner."""
+
+    def __init__(self):
+        self.event_types: Dict[str, EventTypeStats] = {}
+        self.handlers: Dict[Tuple[str, str], HandlerStats] = {}
+
+    def record_dispatch(self, event_type: str, fanout: int):
+        try:
+            stats = self.event_types[event_type]
+        except KeyError:
+            stats = self.event_types[event_type] = EventTypeStats()
+        stats.dispatched += 1
+        stats.fanout += fanout
+
+    def handler(self, owner: str, name: str) -> HandlerStats:
+        try:
+            return self.handlers[owner, name]
+        except KeyError:
+            stats = self.handlers[owner, name] = HandlerStats()
+            return stats
+
+    def gql(self) -> Dict[str, Any]:
+        return {
+            "eventTypes": [
+                {
+                    "eventType": event_type,
+                    "dispatched": stats.dispatched,
+                    "fanout": stats.fanout,
+                }
+                for event_type, stats in self.event_types.items()
+            ],
+            "handlers": [
+                {
+                    "handler": name,
+                    "owner": owner,
+                    "errors": stats.errors,
+                    "queueDelay": stats.queue_delay.gql(),
+                    "execution": stats.execution.gql(),
+                }
+                for (owner, name), stats in self.handlers.items()
+            ],
+        }
+
+    def render(self) -> str:
+        lines = [
+            "# TYPE hub_bus_events_total counter",
+            "# TYPE hub_bus_fanout_total counter",
+        ]
+        for event_type, stats in self.event_types.items():
+            labels = f'event_type="{label_value(event_type)}"'
+            lines.append(f"hub_bus_events_total{{{labels}}} {stats.dispatched}")
+            lines.append(f"hub_bus_fanout_total{{{labels}}} {stats.fanout}")
+
+        lines += [
+            "# TYPE hub_bus_handler_errors_total counter",
+            "# TYPE hub_bus_handler_queue_delay_seconds histogram",
+            "# TYPE hub_bus_handler_execution_seconds histogram",
+        ]
+        for (owner, name), stats in self.handlers.items():
+            labels = f'handler="{label_value(name)}",owner="{label_value(owner)}"'
+            lines.append(f"hub_bus_handler_errors_total{{{labels}}} {stats.errors}")
+            lines += stats.queue_delay.render(
+                "hub_bus_handler_queue_delay_seconds", labels
+            )
+            lines += stats.execution.render("hub_bus_handler_execution_seconds", labels)
+        return "\n".join(lines) + "\n"
@@ -36,3 +36,11 @@ def submodules(package, recursive=False, blacklist=None):
         yield name, os.path.dirname(module.__file__), module
         if recursive and is_pkg:
             yield from submodules(full_name)
+
+
+def package(name: str, recursive=False):
+    """imports a package and yields it followed by its submodules"""
+    module = importlib.import_module(name)
+    yield name.rsplit(".", 1)[-1], os.path.dirname(module.__file__), module
+    if hasattr(module, "__path__"):
+        yield from submodules(module, recursive)
@@ -0,0 +1,166 @@
+import inspect
+import json
+import logging
+import os
+from inspect import getdoc, getfullargspec
+from typing import Any, Callable, Dict, List, Optional
+
+from docstring_parser import parse
+
+from helper.yaml_utils import CACHE_DIR
+from objects.OutputService import Arg, ServiceDocs, type_name
+
+LOGGER = logging.getLogger("ServiceDocs")
+
+IGNORED_ARGS = ["self", "_", "context"]
+
+
+def build_doc(func: Callable) -> ServiceDocs:
+    doc_str = getdoc(func)
+    docs = parse(doc_str)
+    args = getfullargspec(func)
+
+    length = len(list(filter(lambda a: a not in IGNORED_ARGS, args.args)))
+    return ServiceDocs(
+        description=f'{docs.short_description} {docs.long_description if docs.long_description else ""}'.strip(),
+        args={
+            arg.arg_name: Arg(
+                name=arg.arg_name,
+                doc=arg.description,
+                type=args.annotations.get(arg.arg_name, None),
+                default=(
+                    None
+                    if not args.defaults
+                    else (
+                        None
+                        if index < length - len(args.defaults)
+                        else args.defaults[index - (length - len(args.defaults))]
+                    )
+                ),
+            )
+            for index, arg in enumerate(
+                filter(lambda a: a.arg_name not in IGNORED_ARGS, docs.params)
+            )
+        },
+    )
+
+
+class DocCache:
+    """
+    Service docs stored as json, keyed by the qualified name of the function.
+    An entry is valid while the mtime and size of the file defining the function are unchanged,
+    each file is only stat'ed once. New entries are kept in memory until save is called.
+    Argument types are stored by name, which is all the api exposes of them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writes = 0
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._stamps: Dict[str, Optional[List[int]]] = {}
+        self._dirty = False
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with open(self.path) as file:
+                    self._entries = json.load(file)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def stamp(self, func: Callable) -> Optional[List[int]]:
+        """mtime and size of the file defining the function"""
+        code = getattr(inspect.unwrap(func), "__code__", None)
+        if code is None:
+            return None
+        filename = code.co_filename
+        if filename not in self._stamps:
+            try:
+                stat = os.stat(filename)
+                self._stamps[filename] = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                self._stamps[filename] = None
+        return self._stamps[filename]
+
+    def get(self, func: Callable) -> ServiceDocs:
+        name = f"{func.__module__}.{func.__qualname__}"
+        stamp = self.stamp(func)
+        entry = self.entries.get(name)
+        if stamp is not None and entry is not None and entry.get("stamp") == stamp:
+            return ServiceDocs(
+                description=entry["description"],
+                args={arg["name"]: Arg(**arg) for arg in entry["args"]},
+            )
+
+        docs = build_doc(func)
+        if stamp is not None:
+            self._store(name, stamp, docs)
+        return docs
+
+    def _store(self, name: str, stamp: List[int], docs: ServiceDocs):
+        entry = {
+            "stamp": stamp,
+            "description": docs.description,
+            "args": [
+                {
+                    "name": arg.name,
+                    "doc": arg.doc,
+                    "type": type_name(arg.type),
+                    "default": arg.default,
+                }
+                for arg in docs.args.values()
+            ],
+        }
+        try:
+            encoded = json.dumps(entry)
+        except (TypeError, ValueError):  # default values which can't be stored
+            return
+        self.entries[name] = json.loads(encoded)
+        self._dirty = True
+
+    def save(self):
+        """writes the entries added since the last save, blocks. Safe to run in an executor."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        entries = dict(self.entries)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(f"{self.path}.tmp", "w") as file:
+                json.dump(entries, file)
+            os.replace(f"{self.path}.tmp", self.path)
+            self.writes += 1
+        except OSError as err:
+            LOGGER.debug(f"couldn't store service docs: {err}")
+
+
+CACHE = DocCache(os.path.join(CACHE_DIR, "service_docs.json"))
+
+
+class LazyServiceDocs:
+    """ServiceDocs of a function, built on first access"""
+
+    __slots__ = ("func", "_docs")
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self._docs: Optional[ServiceDocs] = None
+
+    def resolve(self) -> ServiceDocs:
+        if self._docs is None:
+            self._docs = CACHE.get(self.func)
+        return self._docs
+
+    @property
+    def description(self) -> str:
+        return self.resolve().description
+
+    @property
+    def args(self) -> Dict[str, Arg]:
+        return self.resolve().args
+
+
+def lazy_doc(func: Callable) -> LazyServiceDocs:
+    return LazyServiceDocs(func)
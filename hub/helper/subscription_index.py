@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+WILDCARD = "*"
+
+
+class _Node:
+    __slots__ = ("children", "exact", "wildcard")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.exact: List[Any] = []
+        self.wildcard: List[Any] = []
+
+
+class SubscriptionIndex:
+    """
+    Segment trie over listener patterns (dotted event types).
+    A pattern matches every event type it is a prefix of, 'pattern.*' does the same.
+    Resolved listener tuples are cached per event type until the index changes.
+    """
+
+    def __init__(self, match_all: Optional[str] = None, cache_size: int = 1024):
+        """
+        :param match_all: pattern whose listeners receive every event
+        :param cache_size: maximum number of cached event types
+        """
+        self._root = _Node()
+        self._match_all_pattern = match_all
+        self._match_all: List[Any] = []
+        self._cache: Dict[str, Tuple[Any, ...]] = {}
+        self._cache_size = cache_size
+
+    def add(self, pattern: str, listener: Any):
+        """adds a listener for the given pattern"""
+        self.listeners(pattern, create=True).append(listener)
+        self._cache.clear()
+
+    def remove(self, pattern: str, listener: Any) -> bool:
+        """
+        removes a listener from the given pattern
+        :return: False if the listener wasn't registered for the pattern
+        """
+        listeners = self.listeners(pattern)
+        if listeners is None or listener not in listeners:
+            return False
+        listeners.remove(listener)
+        self._cache.clear()
+        return True
+
+    def listeners(self, pattern: str, create=False) -> Optional[List[Any]]:
+        """returns the (mutable) listener list registered for exactly this pattern"""
+        if pattern == self._match_all_pattern:
+            return self._match_all
+
+        segments = pattern.split(".")
+        wildcard = segments[-1] == WILDCARD
+        if wildcard:
+            segments.pop()
+
+        node = self._root
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[segment] = _Node()
+            node = child
+
+        return node.wildcard if wildcard else node.exact
+
+    def resolve(self, event_type: str) -> Tuple[Any, ...]:
+        """returns all listeners matching the event type, ordered from the root downwards"""
+        try:
+            return self._cache[event_type]
+        except KeyError:
+            pass
+
+        matches = []
+        node = self._root
+        for segment in event_type.split("."):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            matches += node.exact
+            matches += node.wildcard
+        matches += self._match_all
+
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        resolved = self._cache[event_type] = tuple(matches)
+        return resolved
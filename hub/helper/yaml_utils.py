@@ -1,8 +1,11 @@
+import hashlib
 import os
+import pickle
 import yaml
 import logging
 
 from collections import defaultdict
+from typing import Any, Optional, Tuple
 
 from exceptions import YAMLError
 
@@ -20,13 +23,94 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
-def load_yaml(fname: str, ensure_path=False):
-    """Load a YAML file."""
+# libyaml based loader, used when no line numbers are needed
+FastLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class ConfigCache:
+    """
+    Parsed YAML files pickled to disk, keyed by path, mtime and size.
+    Only files which changed since the last start are parsed again.
+    The cache directory must only be writable by the hub, entries are unpickled.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, fname: str, track_lines: bool) -> str:
+        key = hashlib.sha1(
+            f"{os.path.abspath(fname)}:{track_lines}".encode()
+        ).hexdigest()
+        return os.path.join(self.path, f"{key}.pickle")
+
+    @staticmethod
+    def _stamp(stat: os.stat_result) -> Tuple[int, int]:
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(
+        self, fname: str, stat: os.stat_result, track_lines: bool
+    ) -> Tuple[bool, Any]:
+        try:
+            with open(self._entry(fname, track_lines), "rb") as entry:
+                version, path, stamp, data = pickle.load(entry)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return False, None
+        if version != self.VERSION or path != fname or stamp != self._stamp(stat):
+            return False, None
+        self.hits += 1
+        return True, data
+
+    def put(self, fname: str, stat: os.stat_result, track_lines: bool, data: Any):
+        self.misses += 1
+        entry = self._entry(fname, track_lines)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # written to a temporary file first, a crash never leaves a partial entry behind
+            with open(f"{entry}.tmp", "wb") as file:
+                pickle.dump(
+                    (self.VERSION, fname, self._stamp(stat), data),
+                    file,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(f"{entry}.tmp", entry)
+        except (OSError, pickle.PicklingError) as exc:
+            _LOGGER.debug("couldn't cache %s: %s", fname, exc)
+
+
+CACHE_DIR = os.getenv("CONFIG_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", ".cache"
+)
+
+CACHE: Optional[ConfigCache] = None
+if os.getenv("CONFIG_CACHE", "1") == "1":
+    CACHE = ConfigCache(CACHE_DIR)
+
+
+def load_yaml(fname: str, ensure_path=False, track_lines=False):
+    """Load a YAML file.
+    :param track_lines: parse with the pure python SafeLineLoader, which annotates nodes with line numbers
+    """
+    try:
+        stat = os.stat(fname)
+    except FileNotFoundError:
+        return None
+
+    if CACHE is not None:
+        found, data = CACHE.get(fname, stat, track_lines)
+        if found:
+            return data
+
     try:
         with open(fname, encoding="utf-8") as conf_file:
             # If configuration file is empty YAML returns None
             # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader)
+            data = yaml.load(
+                conf_file, Loader=SafeLineLoader if track_lines else FastLoader
+            )
     except FileNotFoundError:
         return None
     except yaml.YAMLError as exc:
@@ -35,6 +119,10 @@ def load_yaml(fname: str, ensure_path=False):
         _LOGGER.error("Unable to read file %s: %s", fname, exc)
         raise YAMLError(exc)
 
+    if CACHE is not None:
+        CACHE.put(fname, stat, track_lines, data)
+    return data
+
 
 def for_yaml_in(dir_path: str, def_dict=False, def_lambda=lambda: {}):
     if not dir_path.endswith("/"):
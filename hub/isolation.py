@@ -0,0 +1,311 @@
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from IO import Formatter
+from exceptions import PluginUnavailable
+from helper.ipc import Connection, Kind, peer_pid
+from constants.scopes import BUS, DISPATCH_EVENT, WRITE
+from objects.Context import Context
+from objects.Event import Event
+from objects.InputService import InputService
+from objects.OutputService import Arg, OutputService, ServiceDocs
+from objects.User import User
+from objects.core_state import CoreState
+
+if TYPE_CHECKING:
+    from core import Core
+
+LOGGER = logging.getLogger("Isolation")
+
+WORKER = "plugin_worker.py"
+MIN_BACKOFF = 1
+MAX_BACKOFF = 60
+# a worker running this long without crashing resets the backoff
+STABLE_AFTER = 300
+
+
+class _Forwarder:
+    """forwards events and storage updates to a listener or binding of the worker"""
+
+    def __init__(self, plugin: "IsolatedPlugin", index: int):
+        self.plugin = plugin
+        self.index = index
+        self.task_owner = plugin.task_owner
+        self.active = True
+
+    async def event(self, event: Event):
+        if self.active and self.plugin.send(
+            Kind.EVENT,
+            self.index,
+            (event.event_type, event.event_content, event.context),
+        ):
+            await self.plugin.drain()
+
+    async def value(self, value: Any):
+        if self.active and self.plugin.send(Kind.VALUE, self.index, value):
+            await self.plugin.drain()
+
+
+class IsolatedPlugin:
+    """
+    A plugin running in its own worker process (see plugin_worker.py).
+    Services and formatters of the plugin are proxied into core.io, a crashing worker is restarted with an
+    exponential backoff, calls made while it is down fail with PluginUnavailable.
+    """
+
+    def __init__(self, core: "Core", package: str, name: str):
+        self.core = core
+        self.package = package
+        self.name = name
+        self.task_owner = f"plugin:{name}"
+        # everything the worker does on the hub runs in this context, whatever it claims
+        self.context = Context(
+            User(self.task_owner, False, {BUS: [WRITE, DISPATCH_EVENT]})
+        )
+
+        self.connection: Optional[Connection] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.restarts = 0
+        self._stopping = False
+        self._registered = False
+
+        self._call_id = 0
+        self._calls: Dict[int, asyncio.Future] = {}
+        self._listeners: Dict[int, Tuple[_Forwarder, Callable]] = {}
+        self._bindings: Dict[int, Tuple[_Forwarder, Callable]] = {}
+        # input services installed by the hub, replayed after a restart
+        self._installs: Dict[int, Tuple[str, Callable, Dict]] = {}
+
+        core.add_lifecycle_hook(CoreState.STOPPING, self.stop)
+
+    @property
+    def running(self) -> bool:
+        return self.connection is not None
+
+    async def run(self):
+        """supervises the worker until the core stops"""
+        backoff = MIN_BACKOFF
+        while not self._stopping:
+            start = time.monotonic()
+            try:
+                await self._run_once()
+            except Exception as err:
+                LOGGER.error(f"worker of {self.name} failed: {err}")
+            if self._stopping:
+                return
+
+            if time.monotonic() - start > STABLE_AFTER:
+                backoff = MIN_BACKOFF
+            self.restarts += 1
+            LOGGER.warning(f"worker of {self.name} exited, restarting in {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    async def _run_once(self):
+        # only the hub user can reach a socket in a private (0700) directory
+        directory = tempfile.mkdtemp(prefix=f"hub-{self.package}-")
+        path = os.path.join(directory, "worker.sock")
+
+        connected: asyncio.Future = self.core.event_loop.create_future()
+        spawned: asyncio.Future = self.core.event_loop.create_future()
+
+        async def on_connect(reader, writer):
+            pid = peer_pid(writer)
+            if not connected.done() and pid in (None, await spawned):
+                connected.set_result(Connection(reader, writer, context=self.context))
+                return
+            LOGGER.warning(f"rejected a connection to {self.name} from pid {pid}")
+            writer.close()
+
+        server = await asyncio.start_unix_server(on_connect, path)
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                os.path.join(self.core.location, WORKER),
+                self.package,
+                path,
+                cwd=self.core.location,
+            )
+            spawned.set_result(self.process.pid)
+            exited = asyncio.ensure_future(self.process.wait())
+            await asyncio.wait([connected, exited], return_when=asyncio.FIRST_COMPLETED)
+            if not connected.done():
+                connected.cancel()
+                return
+            self.connection = connected.result()
+
+            while True:
+                try:
+                    kind, message_id, payload = await self.connection.receive()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                self._handle(kind, message_id, payload)
+        finally:
+            spawned.cancel()
+            self._crashed()
+            server.close()
+            if self.process is not None and self.process.returncode is None:
+                self.process.kill()
+                await self.process.wait()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def send(self, kind: Kind, message_id: int = 0, payload: Any = None) -> bool:
+        if self.connection is None:
+            return False
+        return self.connection.send(kind, message_id, payload)
+
+    async def drain(self):
+        """waits until the worker caught up with the frames sent to it"""
+        if self.connection is not None:
+            with suppress(ConnectionError):
+                await self.connection.drain()
+
+    def _handle(self, kind: Kind, message_id: int, payload: Any):
+        if kind == Kind.REGISTER:
+            self._register(payload)
+        elif kind == Kind.LISTEN:
+            self._unlisten(message_id)
+            if payload is not None:
+                forwarder = _Forwarder(self, message_id)
+                remove = self.core.bus.listen(payload, forwarder.event)
+                self._listeners[message_id] = (forwarder, remove)
+        elif kind == Kind.BIND:
+            self._unbind(message_id)
+            if payload is not None:
+                forwarder = _Forwarder(self, message_id)
+                remove = self.core.storage.register_callback(
+                    payload, forwarder.value, call_on_init=False
+                )
+                self._bindings[message_id] = (forwarder, remove)
+        elif kind == Kind.DISPATCH:
+            event_type, content, _ = payload
+            self.core.bus.dispatch(Event(event_type, content, self.context))
+        elif kind == Kind.STORE:
+            self.core.storage.update_value(*payload)
+        elif kind == Kind.TRIGGER:
+            if install := self._installs.get(message_id):
+                self.core.add_job(install[1], *payload)
+        elif kind in (Kind.RESULT, Kind.ERROR):
+            future = self._calls.pop(message_id, None)
+            if future is None or future.done():
+                return
+            if kind == Kind.RESULT:
+                future.set_result(payload)
+            else:
+                future.set_exception(PluginUnavailable(f"{self.name}: {payload}"))
+
+    def _register(self, payload: Dict):
+        LOGGER.info(f"worker of {self.name} connected (pid {self.process.pid})")
+        if not self._registered:
+            self._registered = True
+            for service, doc in payload["output_services"].items():
+                self.core.io.add_output_service(
+                    service,
+                    OutputService(
+                        name=service,
+                        handler=self._output_proxy(service),
+                        doc=ServiceDocs(
+                            description=doc["description"],
+                            args={arg["name"]: Arg(**arg) for arg in doc["args"]},
+                        ),
+                    ),
+                )
+            for service in payload["input_services"]:
+                self.core.io.add_input_service(
+                    service, InputService(installer=self._input_proxy(service))
+                )
+            for formatter, docs in payload["formatters"].items():
+                self.core.io.add_formatter(
+                    formatter,
+                    Formatter(handler=self._formatter_proxy(formatter), docs=docs),
+                )
+
+        for callback_id, (service, _, config) in self._installs.items():
+            self._call("install", service, (callback_id, config)).add_done_callback(
+                self._log_failure
+            )
+
+    def _call(self, kind: str, name: str, args) -> asyncio.Future:
+        """sends a call to the worker, the future fails with PluginUnavailable while it is down"""
+        future = self.core.event_loop.create_future()
+        self._call_id += 1
+        if not self.send(Kind.CALL, self._call_id, (kind, name, args)):
+            future.set_exception(
+                PluginUnavailable(f"{self.name} can't be reached for {name}")
+            )
+            return future
+        self._calls[self._call_id] = future
+        return future
+
+    def _output_proxy(self, service: str) -> Callable:
+        async def handler(out, context: Context, **config):
+            await self._call("output", service, (out, context, config))
+
+        return handler
+
+    def _formatter_proxy(self, formatter: str) -> Callable:
+        async def handler(value, **config):
+            return await self._call("formatter", formatter, (value, config))
+
+        return handler
+
+    def _input_proxy(self, service: str) -> Callable:
+        def installer(callback: Callable, **config):
+            self._call_id += 1
+            callback_id = self._call_id
+            self._installs[callback_id] = (service, callback, config)
+            if self.running:  # otherwise installed once the worker registers
+                self._call("install", service, (callback_id, config)).add_done_callback(
+                    self._log_failure
+                )
+
+            def uninstall():
+                self._installs.pop(callback_id, None)
+                if self.running:
+                    self._call("uninstall", service, callback_id).add_done_callback(
+                        self._log_failure
+                    )
+
+            return uninstall
+
+        return installer
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            LOGGER.error(str(future.exception()))
+
+    def _unlisten(self, index: int):
+        if entry := self._listeners.pop(index, None):
+            entry[0].active = False
+            entry[1]()
+
+    def _unbind(self, index: int):
+        if entry := self._bindings.pop(index, None):
+            entry[0].active = False
+            entry[1]()
+
+    def _crashed(self):
+        self.connection = None
+        for index in list(self._listeners):
+            self._unlisten(index)
+        for index in list(self._bindings):
+            self._unbind(index)
+
+        calls: List[asyncio.Future] = list(self._calls.values())
+        self._calls.clear()
+        for future in calls:
+            if not future.done():
+                future.set_exception(PluginUnavailable(f"worker of {self.name} exited"))
+
+    async def stop(self):
+        self._stopping = True
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
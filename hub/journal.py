@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from helper.broadcast import BroadcastChannel
+from helper.json_encoder import ObjectEncoder
+from loader.util import ensure_path
+from objects.core_state import CoreState
+from objects.Event import Event
+
+if TYPE_CHECKING:
+    from core import Core
+
+LOGGER = logging.getLogger("Journal")
+
+# record header: payload length, offset, monotonic timestamp, wall clock timestamp
+HEADER = struct.Struct("<IQdd")
+SEGMENT_SUFFIX = ".log"
+
+
+@dataclass
+class JournalRecord:
+    offset: int
+    monotonic: float
+    time: float
+    event_type: str
+    event_content: Any
+    user: Optional[str]
+
+    def gql(self):
+        return {
+            "offset": self.offset,
+            "monotonic": self.monotonic,
+            "time": self.time,
+            "eventType": self.event_type,
+            "eventContent": self.event_content,
+            "user": self.user,
+        }
+
+
+def encode_payload(event_type: str, content: Any, user: Optional[str]) -> bytes:
+    try:
+        encoded = json.dumps(
+            {"t": event_type, "c": content, "u": user},
+            cls=ObjectEncoder,
+            separators=(",", ":"),
+        )
+    except (TypeError, ValueError, RecursionError):
+        encoded = json.dumps({"t": event_type, "c": repr(content), "u": user})
+    return encoded.encode("utf-8")
+
+
+def decode_record(
+    offset: int, monotonic: float, wall_time: float, payload: bytes
+) -> JournalRecord:
+    decoded: Dict[str, Any] = json.loads(payload)
+    return JournalRecord(
+        offset=offset,
+        monotonic=monotonic,
+        time=wall_time,
+        event_type=decoded["t"],
+        event_content=decoded["c"],
+        user=decoded["u"],
+    )
+
+
+class EventJournal:
+    """
+    Append-only journal of dispatched events.
+    Events are encoded when they are appended, so later changes of their content aren't recorded,
+    then written in batches by an executor thread into rotating segment files,
+    which are memory-mapped for reads. Subscribers get the journal from an offset and then follow it live.
+    """
+
+    def __init__(
+        self,
+        core: "Core",
+        path: str,
+        segment_size: int = 16 * 1024**2,
+        max_segments: int = 16,
+        flush_interval: float = 0.5,
+        batch_size: int = 512,
+    ):
+        self.core = core
+        self.path = path
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        ensure_path(path)
+
+        self._pending: List[Tuple[int, bytes, float, float]] = []
+        self._flushing: Optional[asyncio.Future] = None
+        self._scheduled: Optional[asyncio.TimerHandle] = None
+        self._stream: BroadcastChannel[JournalRecord] = BroadcastChannel()
+
+        self._segment_file = None
+        self._next_offset = self._recover()
+
+        core.api.gql.add_query(
+            "journal(offset: Int, since: Float, limit: Int): [JournalEntry]!",
+            self.gql_journal,
+        )
+        core.api.gql.add_subscription(
+            "journal(offset: Int): JournalEntry!", self.gql_journal_source
+        )
+        core.add_lifecycle_hook(CoreState.STOPPING, self.flush)
+
+    # ----------- WRITING -----------
+
+    def append(self, event: Event):
+        """queues an event for the journal. must be run in the event loop, never touches the disk."""
+        offset, monotonic, wall_time = self._next_offset, time.monotonic(), time.time()
+        self._next_offset += 1
+        payload = encode_payload(
+            event.event_type,
+            event.event_content,
+            getattr(event.context.user, "name", None),
+        )
+        self._pending.append((offset, payload, monotonic, wall_time))
+        if self._stream.subscribers:
+            self._stream.put_nowait(
+                decode_record(offset, monotonic, wall_time, payload)
+            )
+
+        if len(self._pending) >= self.batch_size:
+            self.core.event_loop.call_soon(self._start_flush)
+        elif self._scheduled is None:
+            self._scheduled = self.core.event_loop.call_later(
+                self.flush_interval, self._start_flush
+            )
+
+    def _start_flush(self):
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        if not self._pending or self._flushing is not None:
+            return
+        batch, self._pending = self._pending, []
+        self._flushing = self.core.event_loop.run_in_executor(None, self._write, batch)
+        self._flushing.add_done_callback(self._flushed)
+
+    def _flushed(self, future: asyncio.Future):
+        self._flushing = None
+        if future.exception():
+            LOGGER.error(f"couldn't write to the event journal ({future.exception()})")
+        if self._pending:
+            self._start_flush()
+
+    async def flush(self):
+        """writes all pending events to disk"""
+        while self._pending or self._flushing is not None:
+            if self._flushing is not None:
+                await asyncio.wait([self._flushing])
+            else:
+                self._start_flush()
+
+    def _write(self, batch: List[Tuple[int, bytes, float, float]]):
+        """runs in an executor thread"""
+        for offset, payload, monotonic, wall_time in batch:
+            if self._segment_file is None or (
+                self._segment_file.tell() + HEADER.size + len(payload)
+                > self.segment_size
+            ):
+                self._rotate(offset)
+            self._segment_file.write(
+                HEADER.pack(len(payload), offset, monotonic, wall_time)
+            )
+            self._segment_file.write(payload)
+        self._segment_file.flush()
+
+    def _rotate(self, first_offset: int):
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment_file = open(self._segment_path(first_offset), "ab")
+
+        segments = self.segments()
+        for first_offset in segments[: max(0, len(segments) - self.max_segments)]:
+            os.remove(self._segment_path(first_offset))
+
+    def _recover(self) -> int:
+        """returns the next free offset by scanning the newest segment"""
+        segments = self.segments()
+        if not segments:
+            return 0
+        last = segments[-1]
+        next_offset = last
+        for offset, *_ in self._scan(last):
+            next_offset = offset + 1
+        return next_offset
+
+    # ----------- READING -----------
+
+    def _segment_path(self, first_offset: int) -> str:
+        return os.path.join(self.path, f"{first_offset:020d}{SEGMENT_SUFFIX}")
+
+    def segments(self) -> List[int]:
+        """first offsets of all segments, oldest first"""
+        return sorted(
+            int(file[: -len(SEGMENT_SUFFIX)])
+            for file in os.listdir(self.path)
+            if file.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _scan(
+        self, first_offset: int
+    ) -> Iterator[Tuple[int, float, float, int, int, mmap.mmap]]:
+        try:
+            with open(self._segment_path(first_offset), "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    position = 0
+                    while position + HEADER.size <= len(data):
+                        length, offset, monotonic, wall_time = HEADER.unpack_from(
+                            data, position
+                        )
+                        start = position + HEADER.size
+                        if start + length > len(data):  # partially written record
+                            return
+                        yield offset, monotonic, wall_time, start, length, data
+                        position = start + length
+        except FileNotFoundError:  # removed by a rotation
+            return
+
+    def read(
+        self,
+        offset: int = 0,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[JournalRecord]:
+        """
+        reads events from the journal. blocking, run it in an executor from the event loop.
+        :param offset: first offset to return
+        :param since: only return events dispatched after this unix timestamp
+        :param limit: maximum number of records
+        """
+        segments = self.segments()
+        # skip every segment which ends before the requested offset
+        start = 0
+        for index, first_offset in enumerate(segments):
+            if first_offset <= offset:
+                start = index
+
+        count = 0
+        for first_offset in segments[start:]:
+            for (
+                record_offset,
+                monotonic,
+                wall_time,
+                position,
+                length,
+                data,
+            ) in self._scan(first_offset):
+                if record_offset < offset or (since is not None and wall_time < since):
+                    continue
+                yield decode_record(
+                    record_offset,
+                    monotonic,
+                    wall_time,
+                    bytes(data[position : position + length]),
+                )
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    async def replay(
+        self,
+        offset: int = 0,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[JournalRecord]:
+        """reads events from the journal without blocking the event loop"""
+        return await self.core.event_loop.run_in_executor(
+            None, lambda: list(self.read(offset, since, limit))
+        )
+
+    async def gql_journal(self, *_, offset=0, since=None, limit=100):
+        return [record.gql() for record in await self.replay(offset or 0, since, limit)]
+
+    async def follow(
+        self, offset: Optional[int] = None
+    ) -> AsyncIterator[JournalRecord]:
+        """
+        yields the records from offset on, then every new one.
+        Records a slow subscriber missed in the live stream are read from disk again.
+        :param offset: first offset, only new records if not given
+        """
+        next_offset = self._next_offset if offset is None else offset
+        while next_offset < self._next_offset:
+            await self.flush()
+            records = await self.replay(next_offset, limit=self.batch_size)
+            if not records:  # rotated away or never written
+                break
+            for record in records:
+                yield record
+            next_offset = records[-1].offset + 1
+
+        async for record in self._stream.subscribe():
+            if record.offset < next_offset:
+                continue
+            if record.offset > next_offset:
+                await self.flush()
+                for missed in await self.replay(
+                    next_offset, limit=record.offset - next_offset
+                ):
+                    yield missed
+            yield record
+            next_offset = record.offset + 1
+
+    async def gql_journal_source(self, *_, offset=None):
+        async for record in self.follow(offset):
+            yield record.gql()
+
+    @property
+    def next_offset(self) -> int:
+        return self._next_offset
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from core import Core
+
+LOGGER = logging.getLogger("PluginLoader")
+
+
+def dependency_waves(
+    dependencies: Dict[str, Iterable[str]],
+) -> Tuple[List[List[str]], Set[str]]:
+    """
+    orders plugins into waves, every plugin only depends on plugins of earlier waves.
+    :param dependencies: plugin -> plugins it depends on
+    :return: the waves and the plugins which can't be loaded (missing or cyclic dependencies)
+    """
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    unresolvable: Set[str] = set()
+
+    # drop plugins with missing dependencies, and everything depending on them
+    changed = True
+    while changed:
+        changed = False
+        for name, deps in list(remaining.items()):
+            if missing := deps - remaining.keys():
+                LOGGER.error(
+                    f"can't load {name}, missing dependencies: {', '.join(missing)}"
+                )
+                unresolvable.add(name)
+                del remaining[name]
+                changed = True
+
+    waves = []
+    done: Set[str] = set()
+    while remaining:
+        wave = sorted(name for name, deps in remaining.items() if deps <= done)
+        if not wave:
+            LOGGER.error(f"cyclic plugin dependencies between: {', '.join(remaining)}")
+            unresolvable.update(remaining)
+            break
+        for name in wave:
+            del remaining[name]
+        done.update(wave)
+        waves.append(wave)
+    return waves, unresolvable
+
+
+class PluginInitializer:
+    """
+    Runs the run_after_init hooks of all plugins.
+    A plugin starts as soon as all of its own dependencies finished their hooks or ran into their timeout,
+    independent plugins run concurrently. Hooks exceeding the timeout keep running,
+    they are only no longer waited for.
+    """
+
+    def __init__(self, core: "Core"):
+        self.core = core
+        self.dependencies: Dict[str, List[str]] = {}
+        self.hooks: Dict[str, List[Callable]] = {}
+        self.timeouts: Dict[str, float] = {}
+        self.durations: Dict[str, float] = {}
+
+    def add_plugin(self, plugin: str, dependencies: Iterable[str]):
+        """registers a loaded plugin, dependencies which aren't registered are ignored"""
+        self.dependencies[plugin] = list(dependencies)
+
+    def add_hook(self, plugin: str, hook: Callable, timeout: float):
+        self.hooks.setdefault(plugin, []).append(hook)
+        self.timeouts[plugin] = timeout
+
+    async def run(self):
+        start = time.monotonic()
+        finished = {plugin: asyncio.Event() for plugin in self.dependencies}
+
+        async def start_plugin(plugin: str):
+            try:
+                for dependency in self.dependencies[plugin]:
+                    if dependency in finished:
+                        await finished[dependency].wait()
+                if plugin in self.hooks:
+                    await self._init(plugin)
+            finally:
+                finished[plugin].set()
+
+        await asyncio.gather(*(start_plugin(plugin) for plugin in self.dependencies))
+        LOGGER.info(f"initialized plugins in {time.monotonic() - start:.2f}s")
+
+    async def _init(self, plugin: str):
+        start = time.monotonic()
+        tasks = [self.core.async_add_job(hook) for hook in self.hooks[plugin]]
+        done, pending = await asyncio.wait(tasks, timeout=self.timeouts[plugin])
+        self.durations[plugin] = time.monotonic() - start
+
+        if pending:
+            LOGGER.warning(
+                f"{plugin} didn't finish its initialization within {self.timeouts[plugin]}s, "
+                f"starting its dependents anyway"
+            )
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                LOGGER.error(f"initialization of {plugin} failed: {task.exception()}")
@@ -1,5 +1,6 @@
 import logging
 import os
+import pkgutil
 import shutil
 from inspect import (
     getmembers,
@@ -7,27 +8,30 @@ from inspect import (
     isfunction,
     iscoroutinefunction,
     ismethod,
-    getdoc,
-    getfullargspec,
+    getfile,
 )
-from typing import Type, Callable
-
-from docstring_parser import parse
+from typing import Type, Callable, Collection, Dict, List, Optional, Tuple
 
 import plugin_api
 import plugins as plugins_root
 from IO import Formatter
 from api import RESTEndpoint
 from helper import package_loader, yaml_utils
+from helper.service_docs import build_doc, lazy_doc
+from isolation import IsolatedPlugin
+from loader.util import load_plugin_config
+from loader.plugin_graph import PluginInitializer, dependency_waves
 from constants.plugin_api import *
 from objects.InputService import InputService
-from objects.OutputService import OutputService, ServiceDocs, Arg
+from objects.OutputService import OutputService
 from objects.core_state import CoreState
 import mkdocs
 
 
 LOGGER = logging.getLogger("PluginLoader")
 
+MANIFEST = "manifest.yaml"
+
 
 def is_plugin(cls):
     return getattr(cls, IS_PLUGIN, False)
@@ -37,32 +41,135 @@ def is_hook(func):
     return getattr(func, HOOK, False)
 
 
-def build_doc(func: Callable):
-    doc_str = getdoc(func)
-    docs = parse(doc_str)
-    args = getfullargspec(func)
-
-    length = len(list(filter(lambda a: a not in ["self", "_", "context"], args.args)))
-    return ServiceDocs(
-        description=f'{docs.short_description} {docs.long_description if docs.long_description else ""}'.strip(),
-        args={
-            arg.arg_name: Arg(
-                name=arg.arg_name,
-                doc=arg.description,
-                type=args.annotations.get(arg.arg_name, None),
-                default=None
-                if not args.defaults
-                else None
-                if index < length - len(args.defaults)
-                else args.defaults[index - (length - len(args.defaults))],
+def read_manifest(package_path: str) -> Optional[Dict]:
+    """reads the manifest of a plugin package without importing it"""
+    path = os.path.join(package_path, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    manifest = yaml_utils.load_yaml(path)
+    return manifest if type(manifest) is dict else None
+
+
+def is_isolated(manifest: Optional[Dict]) -> bool:
+    return manifest is not None and manifest.get("isolated", False) is True
+
+
+def isolated_packages(white_list: List[str]):
+    """yields the whitelisted plugin packages which run in a worker process, with their manifest"""
+    for finder, pkg_name, _ in pkgutil.iter_modules(plugins_root.__path__):
+        manifest = read_manifest(os.path.join(finder.path, pkg_name))
+        if is_isolated(manifest) and str(manifest.get("name")).upper() in white_list:
+            yield pkg_name, manifest
+
+
+def plugin_modules(white_list: List[str]):
+    """
+    imports the whitelisted plugin packages, yielding them and their submodules.
+    Packages without a manifest are always imported, since their plugin name is only known afterwards.
+    Isolated packages are never imported by the hub, their worker process does that.
+    :param white_list: upper case plugin names
+    """
+    for finder, pkg_name, _ in pkgutil.iter_modules(plugins_root.__path__):
+        manifest = read_manifest(os.path.join(finder.path, pkg_name))
+        if manifest is not None and str(manifest.get("name")).upper() not in white_list:
+            LOGGER.debug(f"skipping {pkg_name}, not whitelisted")
+            continue
+        if is_isolated(manifest):
+            continue
+
+        try:
+            yield from package_loader.package(
+                f"{plugins_root.__name__}.{pkg_name}", recursive=True
+            )
+        except ImportError as err:
+            LOGGER.error(f"couldn't import the plugin package {pkg_name}: {err}")
+
+
+def setup_plugin(
+    core, name: str, obj: Type, initializer: PluginInitializer, init_timeout: float
+):
+    """creates a plugin instance and registers its hooks, services and listeners"""
+    config = load_plugin_config(core.location, name)
+
+    try:
+        instance = obj(core, config)
+    except plugin_api.InitializationError as err:
+        LOGGER.warning(f"The following error occurred while initializing the {name} plugin: {err.msg}")
+        return None
+
+    for _, callback in getmembers(instance, iscoroutinefunction):
+        if getattr(callback, "run_after_init", False):
+            initializer.add_hook(name.upper(), callback, init_timeout)
+        elif getattr(callback, OUTPUT_SERVICE, False):
+            # building output services
+            service_name = getattr(callback, SERVICE_NAME)
+            schema = getattr(callback, SERVICE_SCHEMA)
+            validator = getattr(callback, SERVICE_VALIDATOR)
+            core.io.add_output_service(
+                service_name,
+                OutputService(
+                    name=service_name,
+                    handler=callback,
+                    schema=schema,
+                    input_validator=validator,
+                    doc=lazy_doc(callback),
+                ),
+            )
+        elif getattr(callback, REST_HANDLER, False):
+            method = getattr(callback, REST_METHOD)
+            path = getattr(callback, REST_PATH)
+            core.api.register_rest_handler(path, method, callback)
+        elif getattr(callback, POLL_JOB, False):
+            core.timer.periodic_job(
+                getattr(callback, POLL_INTERVAL), callback
             )
-            for index, arg in enumerate(
-                filter(
-                    lambda a: a.arg_name not in ["self", "_", "context"], docs.params
-                )
+
+    for _, callback in getmembers(instance, ismethod):
+        if getattr(callback, INPUT_SERVICE, False):
+            service_name = getattr(callback, SERVICE_NAME)
+            schema = getattr(callback, SERVICE_SCHEMA)
+            core.io.add_input_service(
+                service_name,
+                InputService(installer=callback, schema=schema),
+            )
+        if getattr(callback, FORMATTER, False):
+            formatter_name = getattr(callback, FORMATTER_NAME)
+            formatter = Formatter(
+                handler=callback,
+                docs={
+                    "name": formatter_name,
+                    "in_type": getattr(callback, FORMATTER_IN_T),
+                    "out_type": getattr(callback, FORMATTER_OUT_T),
+                    "config": getattr(callback, FORMATTER_CONFIG),
+                },
             )
-        },
-    )
+            core.io.add_formatter(formatter_name, formatter)
+
+        if getattr(callback, ON_EVENT, False):
+            core.bus.listen(getattr(callback, EVENT), callback)
+
+        if getattr(callback, DATA_BOUND, False):
+            core.storage.register_callback(
+                getattr(callback, DATA_ENTRY), callback, call_on_init=False
+            )
+
+        if getattr(callback, REST_ENDPOINT, False):
+            endpoint: Type[RESTEndpoint] = callback()
+            core.api.register_endpoint(endpoint)
+
+    return instance
+
+
+def dependencies_of(manifest: Dict, available: Collection[str] = ()) -> List[str]:
+    """
+    upper case names of the plugins a plugin depends on.
+    :param available: plugins which are loaded, optional dependencies among them are included
+    """
+    return [dependency.upper() for dependency in manifest.get("dependencies") or []] + [
+        dependency.upper()
+        for dependency in manifest.get("optional_dependencies") or []
+        if dependency.upper() in available
+    ]
 
 
 def load_plugins(core):
@@ -74,12 +181,12 @@ def load_plugins(core):
     white_list = list(map(lambda x: x.upper(), white_list))
     plugins = {}
     loaded = []
+    # upper case plugin name -> (plugin name, class, manifest)
+    candidates: Dict[str, Tuple[str, Type, Dict]] = {}
 
     doc_pages = []
 
-    for pkg_name, pkg_path, module in package_loader.submodules(
-        plugins_root, recursive=True
-    ):
+    for pkg_name, pkg_path, module in plugin_modules(white_list):
         for obj_name, obj in getmembers(module, isclass):
             if not is_plugin(obj) or getattr(obj, PLUGIN_NAME_ATTR, None) in loaded:
                 continue
@@ -94,87 +201,9 @@ def load_plugins(core):
                         doc_pages.append({page_name: f"{page_name}.md"})
 
             loaded.append(name)
-            if os.path.exists(f"{core.location}/config/{name.lower()}"):
-                config = {}
-                for conf, file in yaml_utils.for_yaml_in(
-                    f"{core.location}/config/{name.lower()}"
-                ):
-                    config[file[:-5]] = conf
-            elif os.path.exists(f"{core.location}/config/settings/{name.lower()}.yaml"):
-                config = yaml_utils.load_yaml(
-                    f"{core.location}/config/settings/{name.lower()}.yaml"
-                )
-            else:
-                config = {}
-
             if name and name.upper() in white_list:
-                try:
-                    instance = obj(core, config)
-                except plugin_api.InitializationError as err:
-                    LOGGER.warning(f"The following error occurred while initializing the {name} plugin: {err.msg}")
-                    continue
-
-                for _, callback in getmembers(instance, iscoroutinefunction):
-                    if getattr(callback, "run_after_init", False):
-                        core.add_lifecycle_hook(CoreState.RUNNING, callback)
-                    elif getattr(callback, OUTPUT_SERVICE, False):
-                        # building output services
-                        service_name = getattr(callback, SERVICE_NAME)
-                        schema = getattr(callback, SERVICE_SCHEMA)
-                        validator = getattr(callback, SERVICE_VALIDATOR)
-                        core.io.add_output_service(
-                            service_name,
-                            OutputService(
-                                name=service_name,
-                                handler=callback,
-                                schema=schema,
-                                input_validator=validator,
-                                doc=build_doc(callback),
-                            ),
-                        )
-                    elif getattr(callback, REST_HANDLER, False):
-                        method = getattr(callback, REST_METHOD)
-                        path = getattr(callback, REST_PATH)
-                        core.api.register_rest_handler(path, method, callback)
-                    elif getattr(callback, POLL_JOB, False):
-                        core.timer.periodic_job(
-                            getattr(callback, POLL_INTERVAL), callback
-                        )
-
-                for _, callback in getmembers(instance, ismethod):
-                    if getattr(callback, INPUT_SERVICE, False):
-                        service_name = getattr(callback, SERVICE_NAME)
-                        schema = getattr(callback, SERVICE_SCHEMA)
-                        core.io.add_input_service(
-                            service_name,
-                            InputService(installer=callback, schema=schema),
-                        )
-                    if getattr(callback, FORMATTER, False):
-                        formatter_name = getattr(callback, FORMATTER_NAME)
-                        formatter = Formatter(
-                            handler=callback,
-                            docs={
-                                "name": formatter_name,
-                                "in_type": getattr(callback, FORMATTER_IN_T),
-                                "out_type": getattr(callback, FORMATTER_OUT_T),
-                                "config": getattr(callback, FORMATTER_CONFIG),
-                            },
-                        )
-                        core.io.add_formatter(formatter_name, formatter)
-
-                    if getattr(callback, ON_EVENT, False):
-                        core.bus.listen(getattr(callback, EVENT), callback)
-
-                    if getattr(callback, DATA_BOUND, False):
-                        core.storage.register_callback(
-                            getattr(callback, DATA_ENTRY), callback, call_on_init=False
-                        )
-
-                    if getattr(callback, REST_ENDPOINT, False):
-                        endpoint: Type[RESTEndpoint] = callback()
-                        core.api.register_endpoint(endpoint)
-
-                plugins[name] = instance
+                manifest = read_manifest(os.path.dirname(getfile(obj))) or {}
+                candidates[name.upper()] = (name, obj, manifest)
 
         for _, formatter in getmembers(module, isfunction):
             if getattr(formatter, FORMATTER, False):
@@ -191,6 +220,43 @@ def load_plugins(core):
                     )
                     core.io.add_formatter(formatter_name, formatter)
 
+    for pkg_name, manifest in isolated_packages(white_list):
+        name = manifest["name"]
+        if manifest.get("dependencies") or manifest.get("optional_dependencies"):
+            LOGGER.warning(f"dependencies of the isolated plugin {name} are ignored")
+        plugin = IsolatedPlugin(core, pkg_name, name)
+        core.add_job(plugin.run, owner=plugin.task_owner, daemon=True)
+        plugins[name] = plugin
+
+    # plugins are created in dependency order, each runs its run_after_init hooks once its dependencies did
+    dependencies = {
+        key: dependencies_of(manifest, candidates)
+        for key, (_, _, manifest) in candidates.items()
+    }
+    waves, failed = dependency_waves(dependencies)
+    initializer = PluginInitializer(core)
+    for wave in waves:
+        for key in wave:
+            name, obj, manifest = candidates[key]
+            if failed.intersection(dependencies_of(manifest)):
+                LOGGER.warning(f"not loading {name}, one of its dependencies failed")
+                failed.add(key)
+                continue
+
+            instance = setup_plugin(
+                core,
+                name,
+                obj,
+                initializer,
+                manifest.get("init_timeout", core.config.plugin_init_timeout),
+            )
+            if instance is None:
+                failed.add(key)
+            else:
+                plugins[name] = instance
+                initializer.add_plugin(key, dependencies[key])
+    core.add_lifecycle_hook(CoreState.RUNNING, initializer.run)
+
     LOGGER.info(f"loaded: {list(plugins.keys())}")
 
     if False:
@@ -1,5 +1,21 @@
+import os
 from pathlib import Path
+from typing import Dict
+
+from helper import yaml_utils
 
 
 def ensure_path(path):
     Path(path).mkdir(parents=True, exist_ok=True)
+
+
+def load_plugin_config(location: str, name: str) -> Dict:
+    """config of a plugin, either a folder of yaml files or a single settings file"""
+    if os.path.exists(f"{location}/config/{name.lower()}"):
+        config = {}
+        for conf, file in yaml_utils.for_yaml_in(f"{location}/config/{name.lower()}"):
+            config[file[:-5]] = conf
+        return config
+    if os.path.exists(f"{location}/config/settings/{name.lower()}.yaml"):
+        return yaml_utils.load_yaml(f"{location}/config/settings/{name.lower()}.yaml")
+    return {}
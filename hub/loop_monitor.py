@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, Dict, Optional
+
+from objects.core_state import CoreState
+
+if TYPE_CHECKING:
+    from core import Core
+
+LOGGER = logging.getLogger("LoopMonitor")
+
+STORAGE_KEY = "core.loop_lag"
+
+
+@dataclass
+class SlowCallback:
+    time: float
+    duration: float
+    job: str
+    location: str
+
+
+def percentile(ordered, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopMonitor:
+    """
+    Production replacement for the slow callback warnings of asyncio debug mode.
+    A probe scheduled every interval measures how late the loop runs it (the lag),
+    a watchdog thread samples the job and line the loop is stuck in once it blocks longer than threshold.
+    """
+
+    def __init__(
+        self,
+        core: "Core",
+        interval: float = 0.25,
+        threshold: float = 0.1,
+        window: int = 240,
+        publish_every: int = 20,
+        max_samples: int = 50,
+    ):
+        self.core = core
+        self.loop = core.event_loop
+        self.interval = interval
+        self.threshold = threshold
+        self.publish_every = publish_every
+
+        self.lags: Deque[float] = deque(maxlen=window)
+        self.slow_callbacks: Deque[SlowCallback] = deque(maxlen=max_samples)
+        self.blocked = 0
+
+        self._expected: Optional[float] = None
+        self._heartbeat = time.monotonic()
+        self._probes = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._loop_thread: Optional[int] = None
+        # written by the watchdog, completed by the next probe
+        self._blocked: Optional[SlowCallback] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        core.add_lifecycle_hook(CoreState.STOPPING, self.stop)
+
+    def start(self):
+        """must be run in the event loop"""
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._heartbeat = time.monotonic()
+        self._handle = self.loop.call_soon(self._probe)
+        self._thread = threading.Thread(
+            target=self._watchdog, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+
+    def _probe(self):
+        now = time.monotonic()
+        if self._expected is not None:
+            self.lags.append(max(0.0, now - self._expected))
+
+        blocked, self._blocked = self._blocked, None
+        if blocked is not None:
+            blocked.duration = now - self._heartbeat - self.interval
+            self.slow_callbacks.append(blocked)
+            self.blocked += 1
+            LOGGER.warning(
+                f"event loop blocked for {blocked.duration:.3f}s "
+                f"by {blocked.job} at {blocked.location}"
+            )
+
+        self._heartbeat = now
+        self._probes += 1
+        if self._probes % self.publish_every == 0:
+            self.publish()
+
+        self._expected = now + self.interval
+        self._handle = self.loop.call_later(self.interval, self._probe)
+
+    def _watchdog(self):
+        """runs in its own thread, takes at most one sample per blocking callback"""
+        # sleeps between checks, wakes up at once when stopped
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or self._blocked is not None:
+                continue
+            sample = self._sample()
+            # the probe could have run while sampling
+            if heartbeat == self._heartbeat:
+                self._blocked = sample
+
+    def _sample(self) -> SlowCallback:
+        task = asyncio.current_task(self.loop)
+        job = task.get_name() if task is not None else "<callback>"
+
+        location = "<unknown>"
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is not None:
+            innermost = traceback.extract_stack(frame, limit=1)[-1]
+            location = f"{innermost.filename}:{innermost.lineno} in {innermost.name}"
+        return SlowCallback(time.time(), 0.0, job, location)
+
+    def percentiles(self) -> Dict[str, float]:
+        ordered = sorted(self.lags)
+        return {
+            "p50": percentile(ordered, 0.5),
+            "p95": percentile(ordered, 0.95),
+            "p99": percentile(ordered, 0.99),
+            "max": ordered[-1] if ordered else 0.0,
+        }
+
+    def publish(self):
+        """publishes the lag percentiles to the storage under core.loop_lag.<p50|p95|p99|max|slow_callbacks>"""
+        values = self.percentiles()
+        values["slow_callbacks"] = self.blocked
+        self.core.storage.store_dict(STORAGE_KEY, values)
@@ -20,7 +20,8 @@ logging.basicConfig(
 logging.getLogger("asyncio").setLevel(logging.FATAL)
 
 l = asyncio.get_event_loop()
-l.set_debug(True)
+# debug mode slows down every callback, the core's loop monitor reports slow callbacks instead
+l.set_debug(os.getenv("ASYNCIO_DEBUG") == "1")
 uvloop.install()
 print("to stop run:\nkill -TERM {}".format(os.getpid()))
 
@@ -4,6 +4,8 @@ from objects.User import User
 class Context:
     """Represents the context in which actions like events happen."""
 
+    __slots__ = ("user", "remote")
+
     def __init__(self, user: User = None, remote: bool = False) -> None:
         self.user: User = user or User.new()
         self.remote = remote
@@ -17,8 +19,16 @@ class Context:
 
     @staticmethod
     def default() -> "Context":
-        return Context()
+        """shared default context, must not be modified"""
+        return _DEFAULT
 
     @staticmethod
     def admin(external=False) -> "Context":
-        return Context(user=User.new_admin(), remote=external)
+        """shared admin contexts, must not be modified"""
+        return _ADMIN_REMOTE if external else _ADMIN
+
+
+_ADMIN_USER = User.new_admin()
+_ADMIN = Context(user=_ADMIN_USER)
+_ADMIN_REMOTE = Context(user=_ADMIN_USER, remote=True)
+_DEFAULT = Context()
@@ -1,4 +1,7 @@
-from typing import List, Generic, TypeVar, Dict, Generator, Iterator
+import sys
+from enum import IntEnum
+from functools import lru_cache
+from typing import List, Generic, TypeVar, Dict, Generator, Iterator, Optional, Tuple
 
 from helper.json_encoder import default_encoder
 from objects.Context import Context
@@ -6,22 +9,48 @@ from objects.Context import Context
 T = TypeVar("T")
 
 
+class Priority(IntEnum):
+    """dispatch priority of an event, lower values are dispatched first"""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+@lru_cache(maxsize=2048)
+def decompose(event_type: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """splits an event type into its fragments and the chain of its prefixes, cached per type"""
+    fragments = tuple(event_type.split("."))
+    prefixes = tuple(
+        sys.intern(".".join(fragments[: index + 1])) for index in range(len(fragments))
+    )
+    return fragments, prefixes
+
+
 class Event(Generic[T]):
-    def __init__(self, event_type: str, event_content=None, context: Context = None):
-        self.event_type: str = event_type
+    __slots__ = ("event_type", "event_content", "context", "priority")
+
+    def __init__(
+        self,
+        event_type: str,
+        event_content=None,
+        context: Context = None,
+        priority: Optional[Priority] = None,
+    ):
+        self.event_type: str = (
+            sys.intern(event_type) if type(event_type) is str else event_type
+        )
         self.event_content: T = event_content
         self.context: Context = context or Context.admin()
+        self.priority: Optional[Priority] = priority
 
     @property
     def path(self) -> List[str]:
         """returns the event_type as a list representing the path (event_name separated by '.')"""
-        return self.event_type.split(".")
+        return list(decompose(self.event_type)[0])
 
     def walk_path(self) -> Iterator[str]:
-        path = ""
-        for fragment in self.path:
-            path += f".{fragment}"
-            yield path[1:]
+        return iter(decompose(self.event_type)[1])
 
     def to_json(self) -> Dict:
         return {"event_type": self.event_type, "event_content": self.event_content}
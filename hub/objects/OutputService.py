@@ -6,6 +6,15 @@ from voluptuous import Schema
 from exceptions import ConfigError
 
 
+def type_name(t: Any) -> str:
+    try:
+        if hasattr(t, "_name"):
+            return t._name
+        return t.__name__
+    except:
+        return str(t)
+
+
 @dataclass
 class Arg:
     doc: str
@@ -15,18 +24,9 @@ class Arg:
 
     @property
     def gql(self):
-        t_n = ""
-        try:
-            if hasattr(self.type, "_name"):
-                t_n = self.type._name
-            else:
-                t_n = self.type.__name__
-        except:
-            t_n = str(self.type)
-
         return {
             "doc": self.doc,
-            "type": t_n,
+            "type": type_name(self.type),
             "default": self.default,
             "name": self.name,
         }
@@ -1,20 +1,95 @@
-from typing import Dict, Any, TYPE_CHECKING
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, TYPE_CHECKING, List, Optional
+
+from exceptions import ComponentNotFound, EntityNotFound
+from objects.Context import Context
+from objects.command import CommandResult, ComponentCommand, run_commands
 
 if TYPE_CHECKING:
     from core import Core
+    from entity_registry import EntityRegistry
+
+LOGGER = logging.getLogger("Scene")
+
+
+@dataclass
+class SceneResult(CommandResult):
+    scene: str = ""
+    active: bool = True
+
+    def to_json(self):
+        return {"scene": self.scene, "active": self.active, **super().to_json()}
+
+
+def compile_states(
+    registry: "EntityRegistry", states: Dict[str, Any]
+) -> List[ComponentCommand]:
+    """resolves 'entity.component' addresses to the set method of the component"""
+    commands = []
+    for address, target in states.items():
+        entity_name, _, component_name = address.partition(".")
+        try:
+            commands.append(
+                registry.resolve_command(entity_name, component_name, "set", target)
+            )
+        except (EntityNotFound, ComponentNotFound):
+            LOGGER.error(f"can't resolve {address}, it won't be part of the scene")
+    return commands
 
 
 class Scene:
-    def __init__(self, core: "Core"):
+    def __init__(self, core: "Core", name: str = "", max_concurrency: int = 8):
         self.core = core
+        self.name = name
+        self.max_concurrency = max_concurrency
         self.states: Dict[str, Any] = {}
 
         self.deactivate_states: Dict[str, Any] = {}
 
+        self._commands: Optional[List[ComponentCommand]] = None
+        self._deactivate_commands: Optional[List[ComponentCommand]] = None
+        self.last_result: Optional[SceneResult] = None
+
+    def compile(self, registry: "EntityRegistry"):
+        self._commands = compile_states(registry, self.states)
+        self._deactivate_commands = compile_states(registry, self.deactivate_states)
+
     def activate(self):
-        for device, state in self.states.items():
-            self.core.registry.call_method_d(device + ".set", state)
+        self.core.add_job(self.async_activate)
 
     def deactivate(self):
-        for device, state in self.deactivate_states.items():
-            self.core.registry.call_method_d(device + ".set", state)
+        self.core.add_job(self.async_deactivate)
+
+    async def async_activate(self, context: Context = None) -> SceneResult:
+        if self._commands is None:
+            self.compile(self.core.registry)
+        return await self._run(self._commands, True, context)
+
+    async def async_deactivate(self, context: Context = None) -> SceneResult:
+        if self._deactivate_commands is None:
+            self.compile(self.core.registry)
+        return await self._run(self._deactivate_commands, False, context)
+
+    async def _run(
+        self, commands: List[ComponentCommand], active: bool, context: Optional[Context]
+    ) -> SceneResult:
+        context = context or Context.admin()
+        result = await run_commands(
+            commands,
+            context,
+            self.max_concurrency,
+            SceneResult(scene=self.name, active=active),
+            self.core.registry.mailbox,
+        )
+        self.last_result = result
+
+        if result.failed:
+            LOGGER.warning(
+                f"scene {self.name}: {len(result.failed)} of {len(commands)} changes failed"
+            )
+        LOGGER.debug(
+            f"{'activated' if active else 'deactivated'} {self.name} in {result.latency:.3f}s"
+        )
+        self.core.registry.scene_changed(result, context)
+        return result
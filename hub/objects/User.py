@@ -1,4 +1,54 @@
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+ALL = "*"
+
+
+class ScopeMatcher:
+    """Scopes of a user compiled into lookup tables, with an LRU of (scope, permission) results."""
+
+    def __init__(self, scopes: Dict[str, List[str]], cache_size: int = 256):
+        self._scopes: Dict[str, Tuple[str, ...]] = {
+            scope: tuple(permissions)
+            for scope, permissions in scopes.items()
+            if permissions
+        }
+        self._global: Tuple[str, ...] = self._scopes.get(ALL, ())
+        self._cache: "OrderedDict[Tuple[str, str], bool]" = OrderedDict()
+        self._cache_size = cache_size
+
+    def authorize(self, scope: str, permission: str) -> bool:
+        key = (scope, permission)
+        try:
+            result = self._cache[key]
+            self._cache.move_to_end(key)
+            return result
+        except KeyError:
+            pass
+        except TypeError:  # unhashable permission
+            return self._evaluate(scope, permission)
+
+        result = self._cache[key] = self._evaluate(scope, permission)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _evaluate(self, scope: str, permission: str) -> bool:
+        scopes = self._scopes
+        if permission in scopes.get(scope, ()):
+            return True
+
+        path = ""
+        for fragment in scope.split("."):
+            path = f"{path}.{fragment}" if path else fragment
+            if permissions := scopes.get(path):
+                if permission in permissions or ALL in permissions:
+                    return True
+            if permissions := scopes.get(f"{path}.{ALL}"):
+                if permission in permissions or ALL in scope:
+                    return True
+
+        return permission in self._global or ALL in self._global
 
 
 class User:
@@ -7,33 +57,30 @@ class User:
     ):
         self.name = name
         self.admin = is_admin
-        self.scopes: Dict[str, List[str]] = scopes
+        self.scopes = scopes
 
-    def authorize(self, scope: str, permission: str) -> bool:
-        if permissions := self.scopes.get(scope, False):
-            if permission in permissions:
-                return True
-        path = ""
-        for fragment in scope.split("."):
-            path += f".{fragment}"
-            if permissions := self.scopes.get(path[1:], False):
-                if permission in permissions or "*" in permissions:
-                    return True
-            if permissions := self.scopes.get(f"{path}.*"[1:], False):
-                if permission in permissions or "*" in scope:
-                    return True
-        if permissions := self.scopes.get("*", False):
-            if permission in permissions or "*" in permissions:
+    @property
+    def scopes(self) -> Dict[str, List[str]]:
+        """
+        permissions per scope. They are compiled on assignment,
+        assign a new dict instead of mutating the current one.
+        """
+        return self._scopes
 
-                return True
-        return False
+    @scopes.setter
+    def scopes(self, scopes: Dict[str, List[str]]):
+        self._scopes = scopes
+        self._matcher = ScopeMatcher(scopes)
+
+    def authorize(self, scope: str, permission: str) -> bool:
+        return self._matcher.authorize(scope, permission)
 
     def __repr__(self):
         return f'<{self.name}{f" (admin)" if self.admin else ""}>'
 
     @staticmethod
     def new_admin():
-        return User(is_admin=True, scopes={"*": ["*"]})
+        return User(is_admin=True, scopes={ALL: [ALL]})
 
     @staticmethod
     def new():
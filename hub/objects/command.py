@@ -0,0 +1,115 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from constants import BASE_TYPES
+from helper.json_encoder import default_encoder
+from helper.mailbox import COALESCED, CommandMailbox
+from objects.Context import Context
+from objects.component import Component, Method
+from objects.entity import Entity
+
+
+@dataclass(frozen=True)
+class ComponentCommand:
+    """a component method, resolved once, with its target"""
+
+    entity: Entity
+    component: Component
+    method: Method
+    target: Any
+    method_name: str = "set"
+
+
+@dataclass
+class CommandResult:
+    latency: float = 0
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def entities(self) -> List[Entity]:
+        """changed entities, each once"""
+        entities = {change["entity"].name: change["entity"] for change in self.changes}
+        return list(entities.values())
+
+    def to_json(self):
+        return {
+            "latency": self.latency,
+            "changes": self.changes,
+            "failed": self.failed,
+        }
+
+    def gql(self):
+        return {
+            "latency": self.latency,
+            "changes": [
+                {
+                    "address": f"{change['entity'].name}.{change['component']}",
+                    "state": (
+                        change["new_state"]
+                        if type(change["new_state"]) in BASE_TYPES
+                        else default_encoder(change["new_state"])
+                    ),
+                }
+                for change in self.changes
+            ],
+            "failed": [
+                {"address": address, "error": error}
+                for address, error in self.failed.items()
+            ],
+        }
+
+
+async def run_commands(
+    commands: List[ComponentCommand],
+    context: Context,
+    max_concurrency: int,
+    result: CommandResult = None,
+    mailbox: Optional[CommandMailbox] = None,
+) -> CommandResult:
+    """
+    runs commands concurrently, at most max_concurrency entities at a time.
+    Commands for the same entity run one after another in the given order,
+    since component handlers of an entity may change its other components.
+    :param mailbox: queues the commands behind other commands of the same component
+    """
+    result = result or CommandResult()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    start = time.monotonic()
+
+    by_entity: Dict[str, List[ComponentCommand]] = {}
+    for command in commands:
+        by_entity.setdefault(command.entity.name, []).append(command)
+
+    async def run(entity_commands: List[ComponentCommand]):
+        async with semaphore:
+            for command in entity_commands:
+                job = partial(command.method, command.target, context)
+                try:
+                    if mailbox is None:
+                        new_state = await job()
+                    else:
+                        new_state = await mailbox.submit(
+                            command.component, command.method_name, job
+                        )
+                except Exception as err:
+                    result.failed[command.component.dotted] = str(err)
+                    continue
+                if new_state is COALESCED:
+                    # replaced by a newer command of another caller
+                    continue
+                result.changes.append(
+                    {
+                        "entity": command.entity,
+                        "component": command.component.name,
+                        "new_state": new_state,
+                        "component_type": command.component.type,
+                    }
+                )
+
+    await asyncio.gather(*(run(group) for group in by_entity.values()))
+    result.latency = time.monotonic() - start
+    return result
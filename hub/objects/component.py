@@ -36,6 +36,8 @@ class Component(Generic[T]):
     state: T
     type: str
     gql_type = ""
+    # methods setting an absolute state, queued calls of them may be replaced by newer ones
+    coalescible = ("set",)
 
     def __init__(
         self, configuration: dict, handler: Callable, entity: "Entity", name: str = None
@@ -46,6 +48,14 @@ class Component(Generic[T]):
         self.name = name
         self.dotted = f"{entity.name}.{name}"
 
+    def dump_state(self) -> Any:
+        """the state in a json encodable form, as persisted by the state store"""
+        return self.state
+
+    def load_state(self, value: Any):
+        """restores a persisted state, without calling the handler"""
+        self.state = value
+
     async def execute(self, context=None) -> T:
         if context is None:
             context = Context.default()
@@ -43,6 +43,10 @@ class Flow:
         for node, payload in go_to.items():
             self.core.add_job(self._run, node, payload, context)
 
+    @property
+    def task_owner(self) -> str:
+        return f"flow:{self.name}"
+
     def store(self, key: str, value):
         self._storage[key] = value
 
@@ -0,0 +1,32 @@
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import Callable
+
+from decorators import is_blocking, is_protected
+from tasks import job_name, owner_of
+
+
+@dataclass(frozen=True)
+class JobDescriptor:
+    """Describes how a job has to be called, computed once instead of on every call."""
+
+    target: Callable
+    pass_context: bool
+    is_coroutine: bool
+    is_blocking: bool
+    is_protected: bool
+    name: str
+    owner: str
+
+    @classmethod
+    def describe(cls, target: Callable) -> "JobDescriptor":
+        return cls(
+            target=target,
+            pass_context=len(inspect.signature(target).parameters) == 2,
+            is_coroutine=asyncio.iscoroutinefunction(target),
+            is_blocking=is_blocking(target),
+            is_protected=is_protected(target),
+            name=job_name(target),
+            owner=owner_of(target),
+        )
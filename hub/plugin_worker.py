@@ -0,0 +1,343 @@
+"""
+Runs a single plugin in its own process, connected to the core over a unix socket.
+The plugin gets a reduced core: event loop, jobs, timer, bus and storage are proxied to the hub,
+services, formatters, listeners and bindings are registered with the hub over the connection.
+
+usage: python plugin_worker.py <plugin package> <socket path>
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from collections import defaultdict
+from inspect import getmembers, isclass, isfunction, iscoroutinefunction, ismethod
+from typing import Any, Callable, Dict, List, Optional
+
+import plugin_api
+import plugins as plugins_root
+from constants.plugin_api import *
+from data_provider import DataEntry, Setter
+from decorators import is_blocking
+from helper import package_loader
+from helper.ipc import Connection, Kind
+from helper.service_docs import build_doc
+from loader.util import load_plugin_config
+from objects.Event import Event
+from objects.OutputService import type_name
+from timer import Timer
+
+LOGGER = logging.getLogger("PluginWorker")
+
+
+class WorkerBus:
+    def __init__(self, core: "WorkerCore"):
+        self.core = core
+        self._listeners: List[Optional[Callable]] = []
+
+    def listen(self, event_type: str, callback: Callable) -> Callable:
+        index = len(self._listeners)
+        self._listeners.append(callback)
+        self.core.send(Kind.LISTEN, index, event_type)
+
+        def remove():
+            self._listeners[index] = None
+            self.core.send(Kind.LISTEN, index, None)
+
+        return remove
+
+    def dispatch(self, event: Event):
+        self.core.send(
+            Kind.DISPATCH, 0, (event.event_type, event.event_content, event.context)
+        )
+
+    def set_priority(self, event_type: str, *_) -> Callable:
+        LOGGER.debug(f"priorities can't be set by isolated plugins ({event_type})")
+        return lambda: None
+
+    async def wait_for(self, event_type: str, predicate=None, timeout=None) -> Event:
+        future = self.core.event_loop.create_future()
+
+        async def check(event: Event):
+            if not future.done() and (predicate is None or predicate(event)):
+                future.set_result(event)
+
+        remove = self.listen(event_type, check)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            remove()
+
+    def deliver(self, index: int, event: Event):
+        if index < len(self._listeners) and (callback := self._listeners[index]):
+            self.core.async_add_job(callback, event)
+
+
+class WorkerStorage:
+    """local copy of the entries the plugin touches, writes are forwarded to the hub"""
+
+    def __init__(self, core: "WorkerCore"):
+        self.core = core
+        self.storage: defaultdict[str, DataEntry] = defaultdict(lambda: DataEntry(), {})
+        self._bindings: List[Optional[Callable]] = []
+
+    def create_entry(self, key, initial_value=None):
+        self.storage[key] = DataEntry(init_value=initial_value)
+        self.core.send(Kind.STORE, 0, (key, initial_value))
+
+    def update_value(self, key, value):
+        self.storage[key].value = value
+        self.core.send(Kind.STORE, 0, (key, value))
+
+    def get_value(self, key):
+        return self.storage[key].value
+
+    def setter_factory(self, key: str) -> Setter:
+        return Setter(key, self)
+
+    def store_dict(self, top_level_key, value: Dict):
+        for key, value in value.items():
+            self.update_value(f"{top_level_key}.{key}", value)
+
+    def register_callback(self, key, callback, call_on_init=True) -> Callable:
+        index = len(self._bindings)
+        self._bindings.append(callback)
+        self.core.send(Kind.BIND, index, key)
+        if call_on_init:
+            self.core.add_job(callback, self.storage[key].value)
+
+        def unregister():
+            self._bindings[index] = None
+            self.core.send(Kind.BIND, index, None)
+
+        return unregister
+
+    def deliver(self, index: int, value: Any):
+        if index < len(self._bindings) and (callback := self._bindings[index]):
+            self.core.async_add_job(callback, value)
+
+
+class WorkerAPI:
+    """the api stays in the hub process, registrations of isolated plugins are dropped"""
+
+    def __init__(self):
+        self.gql = self
+
+    def _unavailable(self, definition, *_):
+        LOGGER.warning(
+            f"api handlers aren't available to isolated plugins: {definition}"
+        )
+
+    add_query = add_mutation = register_rest_handler = register_endpoint = _unavailable
+
+
+class WorkerCore:
+    def __init__(self, event_loop: asyncio.AbstractEventLoop, connection: Connection):
+        self.event_loop = event_loop
+        self.connection = connection
+        self.location = os.path.dirname(os.path.abspath(__file__))
+        self.instance_name = "HUB"
+        self.plugins: Dict[str, Any] = {}
+
+        self.api = WorkerAPI()
+        self.bus = WorkerBus(self)
+        self.storage = WorkerStorage(self)
+        self.timer = Timer(self)
+
+    def send(self, kind: Kind, message_id: int = 0, payload: Any = None) -> bool:
+        return self.connection.send(kind, message_id, payload)
+
+    def add_job(self, job, *args):
+        self.event_loop.call_soon_threadsafe(self.async_add_job, job, *args)
+
+    def async_add_job(self, job, *args):
+        if asyncio.iscoroutinefunction(job) and not is_blocking(job):
+            return self.event_loop.create_task(job(*args))
+        return self.event_loop.run_in_executor(None, job, *args)
+
+    def add_lifecycle_hook(self, state, callback: Callable):
+        pass
+
+
+class Worker:
+    def __init__(self, package: str, socket_path: str):
+        self.package = package
+        self.socket_path = socket_path
+        self.core: Optional[WorkerCore] = None
+
+        self.output_services: Dict[str, Any] = {}
+        self.input_services: Dict[str, Any] = {}
+        self.formatters: Dict[str, Callable] = {}
+        self.installed: Dict[int, Any] = {}
+
+    async def run(self):
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        connection = Connection(reader, writer)
+        self.core = WorkerCore(asyncio.get_running_loop(), connection)
+
+        name, instance, modules = self.load()
+        hooks = self.register(name, instance, modules)
+        self.core.send(
+            Kind.REGISTER,
+            0,
+            {
+                "name": name,
+                "output_services": {
+                    service: self.describe(handler)
+                    for service, (handler, _) in self.output_services.items()
+                },
+                "input_services": list(self.input_services),
+                "formatters": {
+                    formatter: {
+                        "name": formatter,
+                        "in_type": str(getattr(handler, FORMATTER_IN_T)),
+                        "out_type": str(getattr(handler, FORMATTER_OUT_T)),
+                        "config": getattr(handler, FORMATTER_CONFIG),
+                    }
+                    for formatter, handler in self.formatters.items()
+                },
+            },
+        )
+        for hook in hooks:
+            self.core.async_add_job(hook)
+
+        while True:
+            try:
+                kind, message_id, payload = await connection.receive()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                LOGGER.info("connection to the hub closed")
+                return
+            self.handle(kind, message_id, payload)
+
+    def load(self):
+        modules = list(
+            package_loader.package(
+                f"{plugins_root.__name__}.{self.package}", recursive=True
+            )
+        )
+        for _, _, module in modules:
+            for _, obj in getmembers(module, isclass):
+                if getattr(obj, IS_PLUGIN, False):
+                    name = getattr(obj, PLUGIN_NAME_ATTR)
+                    config = load_plugin_config(self.core.location, name)
+                    return name, obj(self.core, config), modules
+        raise plugin_api.InitializationError(f"no plugin found in {self.package}")
+
+    def register(self, name: str, instance, modules) -> List[Callable]:
+        """collects the services of the plugin, starts its poll jobs and returns its init hooks"""
+        hooks = []
+        for _, callback in getmembers(instance, iscoroutinefunction):
+            if getattr(callback, "run_after_init", False):
+                hooks.append(callback)
+            elif getattr(callback, OUTPUT_SERVICE, False):
+                self.output_services[getattr(callback, SERVICE_NAME)] = (
+                    callback,
+                    getattr(callback, SERVICE_SCHEMA),
+                )
+            elif getattr(callback, POLL_JOB, False):
+                self.core.timer.periodic_job(getattr(callback, POLL_INTERVAL), callback)
+            elif getattr(callback, REST_HANDLER, False):
+                self.core.api.register_rest_handler(getattr(callback, REST_PATH))
+
+        for _, callback in getmembers(instance, ismethod):
+            if getattr(callback, INPUT_SERVICE, False):
+                self.input_services[getattr(callback, SERVICE_NAME)] = (
+                    callback,
+                    getattr(callback, SERVICE_SCHEMA),
+                )
+            if getattr(callback, FORMATTER, False):
+                self.formatters[getattr(callback, FORMATTER_NAME)] = callback
+            if getattr(callback, ON_EVENT, False):
+                self.core.bus.listen(getattr(callback, EVENT), callback)
+            if getattr(callback, DATA_BOUND, False):
+                self.core.storage.register_callback(
+                    getattr(callback, DATA_ENTRY), callback, call_on_init=False
+                )
+            if getattr(callback, REST_ENDPOINT, False):
+                self.core.api.register_endpoint(callback)
+
+        for _, _, module in modules:
+            for _, formatter in getmembers(module, isfunction):
+                if getattr(formatter, FORMATTER, False):
+                    formatter_name = getattr(formatter, FORMATTER_NAME)
+                    if formatter_name.split(".")[0].upper() == name.upper():
+                        self.formatters[formatter_name] = formatter
+        return hooks
+
+    @staticmethod
+    def describe(handler: Callable) -> Dict[str, Any]:
+        docs = build_doc(handler)
+        return {
+            "description": docs.description,
+            "args": [
+                {
+                    "name": arg.name,
+                    "doc": arg.doc,
+                    "type": type_name(arg.type),
+                    "default": arg.default,
+                }
+                for arg in docs.args.values()
+            ],
+        }
+
+    def handle(self, kind: Kind, message_id: int, payload: Any):
+        if kind == Kind.CALL:
+            self.core.event_loop.create_task(self.call(message_id, *payload))
+        elif kind == Kind.EVENT:
+            event_type, content, context = payload
+            self.core.bus.deliver(message_id, Event(event_type, content, context))
+        elif kind == Kind.VALUE:
+            self.core.storage.deliver(message_id, payload)
+
+    async def call(self, call_id: int, kind: str, name: str, args):
+        try:
+            result = None
+            if kind == "output":
+                out, context, config = args
+                handler, schema = self.output_services[name]
+                if schema:
+                    schema(config)
+                await handler(out, context, **config)
+            elif kind == "formatter":
+                value, config = args
+                result = self.formatters[name](value, **config)
+                if asyncio.iscoroutine(result):
+                    result = await result
+            elif kind == "install":
+                callback_id, config = args
+                installer, schema = self.input_services[name]
+                if schema:
+                    schema(config)
+                self.installed[callback_id] = installer(
+                    self.trigger(callback_id), **config
+                )
+            elif kind == "uninstall":
+                remove = self.installed.pop(args, None)
+                if callable(remove):
+                    remove()
+        except Exception as err:
+            self.core.send(Kind.ERROR, call_id, f"{type(err).__name__}: {err}")
+            return
+
+        if not self.core.send(Kind.RESULT, call_id, result):
+            self.core.send(Kind.ERROR, call_id, "result can't be sent to the hub")
+
+    def trigger(self, callback_id: int) -> Callable:
+        """callback for input services, may be called from any thread"""
+
+        def callback(*args):
+            self.core.event_loop.call_soon_threadsafe(
+                self.core.send, Kind.TRIGGER, callback_id, args
+            )
+
+        return callback
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - [{sys.argv[1]}] %(name)s: %(levelname)s: %(message)s",
+        datefmt="%d-%b-%y %H:%M:%S",
+        stream=sys.stdout,
+    )
+    asyncio.run(Worker(sys.argv[1], sys.argv[2]).run())
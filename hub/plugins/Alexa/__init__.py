@@ -5,11 +5,9 @@ from aiohttp import web
 
 from api import RESTEndpoint
 from constants.entity_types import EntityType
-from constants.events import ENTITY_CREATED
 from objects.Context import Context
-from objects.Event import Event
 from objects.entity import Entity
-from plugin_api import plugin, on, rest_endpoint, Plugin
+from plugin_api import plugin, rest_endpoint, Plugin
 
 if TYPE_CHECKING:
     from core import Core
@@ -27,7 +25,6 @@ class Alexa(Plugin):
         self.core = core
         self.config = config
 
-        self._devices = {}
         self._controller: Dict[str, ActionController] = {
             "BrightnessController": self.brightness,
             "ColorController": self.color,
@@ -51,21 +48,23 @@ class Alexa(Plugin):
             EntityType.BLINDS: "INTERIOR_BLIND",
         }
 
-    @on(ENTITY_CREATED)
-    def register_device(self, event: Event):
-        entity: Entity = event.event_content
-
-        if entity.settings.get("alexa", False) is False:
-            return
-        if entity.settings.get("alexa") is None:
-            entity.settings["alexa"] = {}
-
+    @property
+    def devices(self) -> Dict[str, Dict]:
+        """devices of all entities with alexa settings, by their alexa name"""
+        devices = {}
+        for entity in self.core.registry.entities_with_setting("alexa").values():
+            conf = self.device_config(entity)
+            devices[conf["name"]] = conf
+        return devices
+
+    def device_config(self, entity: Entity) -> Dict:
+        settings = entity.settings["alexa"] or {}
         conf = {
             "capabilities": {},
-            "category": entity.settings["alexa"]
+            "category": settings
                 .get("category", self._type_map[entity.type])
                 .upper(),
-            "name": entity.settings["alexa"].get("name", entity.name),
+            "name": settings.get("name", entity.name),
         }
 
         # implicit mapping
@@ -75,11 +74,11 @@ class Alexa(Plugin):
             conf["capabilities"][self._mappings[component.type]] = component.dotted
 
         # explicit mapping
-        if controller := entity.settings["alexa"].get("controller", False):
+        if controller := settings.get("controller", False):
             for controller, mapping in controller.items():
                 conf["capabilities"].update({controller: f"{entity.name}.{mapping}"})
 
-        self._devices[conf["name"]] = conf
+        return conf
 
     @rest_endpoint
     def get_factory(alexa):
@@ -88,7 +87,7 @@ class Alexa(Plugin):
 
             async def get(self, _):
                 LOGGER.info("Alexa sync started!")
-                return self.json(alexa._devices)
+                return self.json(alexa.devices)
 
         return AlexaDevices
 
@@ -113,21 +112,21 @@ class Alexa(Plugin):
 
     async def switch(self, device: str, target: bool):
         await self.core.registry.async_call_method_d(
-            f'{self._devices[device]["capabilities"]["PowerController"]}.set',
+            f'{self.devices[device]["capabilities"]["PowerController"]}.set',
             target,
             self.get_context(device),
         )
 
     async def brightness(self, device: str, target: float):
         await self.core.registry.async_call_method_d(
-            f'{self._devices[device]["capabilities"]["BrightnessController"]}.set',
+            f'{self.devices[device]["capabilities"]["BrightnessController"]}.set',
             target,
             self.get_context(device),
         )
 
     async def color(self, device: str, target: Any):
         await self.core.registry.async_call_method_d(
-            f'{self._devices[device]["capabilities"]["ColorController"]}.hsv',
+            f'{self.devices[device]["capabilities"]["ColorController"]}.hsv',
             target,
             self.get_context(device),
         )
@@ -135,7 +134,7 @@ class Alexa(Plugin):
     async def blinds(self, device: str, target: Any):
         target = target["rangeValue"]
         await self.core.registry.async_call_method_d(
-            f'{self._devices[device]["capabilities"]["BlindsController"]}.set',
+            f'{self.devices[device]["capabilities"]["BlindsController"]}.set',
             target,
             self.get_context(device)
         )
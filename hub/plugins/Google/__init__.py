@@ -5,11 +5,9 @@ from aiohttp import web
 
 from api import RESTEndpoint
 from constants.entity_types import EntityType
-from constants.events import ENTITY_CREATED
 from core import Core
-from objects.Event import Event
 from objects.entity import Entity
-from plugin_api import plugin, rest_endpoint, on
+from plugin_api import plugin, rest_endpoint
 from plugins.Google.helper import discovery
 
 LOGGER = logging.getLogger("google-home")
@@ -48,22 +46,27 @@ class Google:
         if config is None:
             config = {}
         self.config = config
-        self.entities: Dict[str, DeviceConfig] = {}
-
-    @on(ENTITY_CREATED)
-    def on_created(self, event: Event[Entity]):
-        entity = event.event_content
-        if "google" not in entity.settings:
-            return
+        self.core = core
+
+    @property
+    def entities(self) -> Dict[str, DeviceConfig]:
+        """device configs of all entities with google settings"""
+        return {
+            name: self.device_config(entity)
+            for name, entity in self.core.registry.entities_with_setting(
+                "google"
+            ).items()
+        }
 
-        config: DeviceConfig = {
-            "name": entity.settings["google"].get("name", entity.name),
-            "type": entity.settings["google"].get("type", types[entity.type]),
+    @staticmethod
+    def device_config(entity: Entity) -> DeviceConfig:
+        settings = entity.settings["google"] or {}
+        return {
+            "name": settings.get("name", entity.name),
+            "type": settings.get("type", types[entity.type]),
             "traits": trait_factories[entity.type](),
         }
 
-        self.entities[entity.name] = config
-
     @rest_endpoint
     def discover(google):
         class Endpoint(RESTEndpoint):
@@ -30,7 +30,7 @@ class MediaManger:
     @run_after_init
     async def init(self):
         self.tcp_cec = self.core.plugins.get("tcp-cec")
-        self.spotify = self.core.plugins.get("spotify")
+        self.spotify = self.core.plugins.get("Spotify")
 
     @on(EVENT_PLAYBACK_DEVICE_CHANGE)
     async def turn_on(self, event: Event[Device]):
@@ -1,8 +1,13 @@
 import asyncio
 from enum import Enum
-from typing import Dict, TYPE_CHECKING, List, Optional
-
-from constants.events import ENTITY_CREATED, ENTITY_STATE_CHANGED
+from typing import Dict, TYPE_CHECKING, List, Mapping, Optional, Set
+
+from constants.events import (
+    ENTITY_CREATED,
+    ENTITY_STATE_CHANGED,
+    ENTITY_STATES_CHANGED,
+    SCENE_CHANGED,
+)
 from objects.Context import Context
 from objects.Event import Event
 from objects.entity import Entity
@@ -28,20 +33,23 @@ class PowerGrid:
 
         self.supplier: Optional[Entity] = None
 
-        self._consumer: List[Entity] = []
-        self._active_consumer: List[Entity] = []
-        self._retry = []
+        self._active_consumer: Set[str] = set()
+        self._retry: Set[str] = set()
 
         self._grid_state = GridState.unknown
 
+    @property
+    def consumer(self) -> Mapping[str, Entity]:
+        """entities with grid settings, from the registry index"""
+        return self.core.registry.entities_with_setting("grid")
+
     @on(ENTITY_CREATED)
     def on_created(self, event: Event[Entity]):
         entity = event.event_content
         if settings := entity.settings.get("grid", False):
-            self._consumer.append(entity)
             try:
                 if settings.get("retry"):
-                    self._retry.append(entity.name)
+                    self._retry.add(entity.name)
             except:
                 pass
         if entity.name == self.config["supplier"]:
@@ -49,9 +57,23 @@ class PowerGrid:
 
     @on(ENTITY_STATE_CHANGED)
     async def on_state(self, event):
-        entity: Entity = event.event_content["entity"]
-        component_type: str = event.event_content["component_type"]
-        new_state: bool = event.event_content["new_state"]
+        await self.state_changed(event.event_content)
+
+    @on(SCENE_CHANGED)
+    async def on_scene(self, event):
+        await self.batch_changed(event.event_content["changes"])
+
+    @on(ENTITY_STATES_CHANGED)
+    async def on_states(self, event):
+        await self.batch_changed(event.event_content["changes"])
+
+    async def batch_changed(self, changes: List[Dict]):
+        await asyncio.gather(*(self.state_changed(change) for change in changes))
+
+    async def state_changed(self, change: Dict):
+        entity: Entity = change["entity"]
+        component_type: str = change["component_type"]
+        new_state: bool = change["new_state"]
 
         if entity == self.supplier:
             if new_state:
@@ -60,15 +82,13 @@ class PowerGrid:
                 self._grid_state = GridState.off
             return
 
-        if entity not in self._consumer or component_type != "switch":
+        if component_type != "switch" or entity.name not in self.consumer:
             return
 
         if new_state:
-            if entity not in self._active_consumer:
-                self._active_consumer.append(entity)
+            self._active_consumer.add(entity.name)
         else:
-            if entity in self._active_consumer:
-                self._active_consumer.remove(entity)
+            self._active_consumer.discard(entity.name)
 
         if len(self._active_consumer) == 0 and self._grid_state in [
             GridState.on,
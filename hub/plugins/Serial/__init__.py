@@ -53,8 +53,8 @@ class Connection:
                 self.core.timer.scheduled_call(self.setup, delay=self.reconnect_time)
             return
 
-        self.__reader = self.core.add_job(self._reader)
-        self.__writer = self.core.add_job(self._writer)
+        self.__reader = self.core.add_job(self._reader, daemon=True)
+        self.__writer = self.core.add_job(self._writer, daemon=True)
 
         self.core.bus.dispatch(Event(constants.Events.port_connected, {'port': self.port, 'name': self.name}))
 
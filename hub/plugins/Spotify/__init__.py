@@ -8,7 +8,7 @@ from typing import Dict, TYPE_CHECKING, Optional, List, NewType, Any
 from asyncspotify import FullTrack
 
 from data_provider import Setter
-from objects.Event import Event
+from objects.Event import Event, Priority
 from plugin_api import plugin, run_after_init, poll_job, output_service, formatter
 from .auth import ServiceAuth
 from .collection import Show
@@ -102,6 +102,9 @@ class Spotify:
         )
         self.shows.value = {}
 
+        # playback telemetry must not delay control events
+        core.bus.set_priority("spotify.*", Priority.LOW)
+
         core.api.gql.add_mutation("spotifyNext: String", self.gql_next)
         core.api.gql.add_mutation("spotifyPrev: String", self.gql_prev)
         core.api.gql.add_mutation("spotifySeek(pos: Int): Boolean", self.gql_seek)
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from helper.json_encoder import ObjectEncoder
+from loader.util import ensure_path
+from objects.core_state import CoreState
+from objects.entity import Entity
+
+if TYPE_CHECKING:
+    from core import Core
+
+LOGGER = logging.getLogger("StateStore")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS component_state (
+    address TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+
+class StateStore:
+    """
+    Persists the component states of all entities in a sqlite database.
+    Changed entities are only marked in the event loop, their states are encoded and written
+    in batches by an executor thread. On boot the states are restored without calling any handler.
+    """
+
+    def __init__(self, core: "Core", path: str, flush_interval: float = 2):
+        self.core = core
+        self.path = path
+        self.flush_interval = flush_interval
+
+        ensure_path(os.path.dirname(path))
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+        self._dirty: Dict[str, Entity] = {}
+        self._flushing: Optional[asyncio.Future] = None
+        self._scheduled: Optional[asyncio.TimerHandle] = None
+        self.writes = 0
+
+        core.add_lifecycle_hook(CoreState.STOPPING, self.close)
+
+    def load(self) -> Dict[str, Tuple[str, Any]]:
+        """address -> (component type, state)"""
+        states = {}
+        for address, component_type, state in self._db.execute(
+            "SELECT address, type, state FROM component_state"
+        ):
+            try:
+                states[address] = (component_type, json.loads(state))
+            except ValueError:
+                LOGGER.warning(f"dropping unreadable state of {address}")
+        return states
+
+    def restore(self, entities: Dict[str, Entity]) -> int:
+        """
+        sets the persisted states on the components, before any plugin runs.
+        States of components whose type changed since they were stored are ignored.
+        :return: number of restored components
+        """
+        start = time.monotonic()
+        states = self.load()
+        restored = 0
+        for entity in entities.values():
+            for component in entity.components.values():
+                stored = states.get(component.dotted)
+                if stored is None or stored[0] != component.type:
+                    continue
+                try:
+                    component.load_state(stored[1])
+                    restored += 1
+                except Exception as err:
+                    LOGGER.warning(f"couldn't restore {component.dotted}: {err}")
+        LOGGER.info(
+            f"restored {restored} component states in {time.monotonic() - start:.3f}s"
+        )
+        return restored
+
+    def mark(self, entity: Entity):
+        """marks an entity as changed. must be run in the event loop, never touches the disk."""
+        self._dirty[entity.name] = entity
+        if self._scheduled is None and self._flushing is None:
+            self._scheduled = self.core.event_loop.call_later(
+                self.flush_interval, self._start_flush
+            )
+
+    def _rows(self) -> List[Tuple[str, str, str, float]]:
+        """encodes the states of all marked entities, the states are read in the event loop"""
+        rows = []
+        now = time.time()
+        for entity in self._dirty.values():
+            for component in entity.components.values():
+                try:
+                    state = json.dumps(component.dump_state(), cls=ObjectEncoder)
+                except (TypeError, ValueError) as err:
+                    LOGGER.warning(
+                        f"can't store the state of {component.dotted}: {err}"
+                    )
+                    continue
+                rows.append((component.dotted, component.type, state, now))
+        self._dirty.clear()
+        return rows
+
+    def _start_flush(self):
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        if not self._dirty or self._flushing is not None:
+            return
+        self._flushing = self.core.event_loop.run_in_executor(
+            None, self._write, self._rows()
+        )
+        self._flushing.add_done_callback(self._flushed)
+
+    def _flushed(self, future: asyncio.Future):
+        self._flushing = None
+        if future.exception():
+            LOGGER.error(f"couldn't write component states ({future.exception()})")
+        if self._dirty:
+            self._scheduled = self.core.event_loop.call_later(
+                self.flush_interval, self._start_flush
+            )
+
+    async def flush(self):
+        """writes the states of all marked entities"""
+        while self._dirty or self._flushing is not None:
+            if self._flushing is not None:
+                await asyncio.wait([self._flushing])
+            else:
+                self._start_flush()
+
+    def _write(self, rows: List[Tuple[str, str, str, float]]):
+        """runs in an executor thread, one transaction per batch"""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO component_state VALUES (?, ?, ?, ?)", rows
+            )
+        self.writes += 1
+
+    async def close(self):
+        await self.flush()
+        self._db.close()
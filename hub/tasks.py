@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+
+from constants.plugin_api import PLUGIN_NAME_ATTR
+
+if TYPE_CHECKING:
+    from core import Core
+
+LOGGER = logging.getLogger("Tasks")
+
+CORE = "core"
+
+
+def job_name(job: Callable) -> str:
+    module = getattr(job, "__module__", None)
+    return f"{module}.{getattr(job, '__qualname__', repr(job))}"
+
+
+def owner_of(job: Callable) -> str:
+    """
+    owner of a job, derived from the object a bound method belongs to.
+    Objects can name themselves as owner with a 'task_owner' attribute,
+    plugins are owned by 'plugin:<name>'.
+    """
+    instance = getattr(job, "__self__", None)
+    if instance is None:
+        return CORE
+    if owner := getattr(instance, "task_owner", None):
+        return owner
+    if plugin := getattr(type(instance), PLUGIN_NAME_ATTR, None):
+        return f"plugin:{plugin}"
+    return CORE
+
+
+class TaskState(Enum):
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class TaskInfo:
+    __slots__ = ("id", "name", "owner", "daemon", "started", "started_at", "future")
+
+    def __init__(
+        self, _id: int, name: str, owner: str, daemon: bool, future: asyncio.Future
+    ):
+        self.id = _id
+        self.name = name
+        self.owner = owner
+        self.daemon = daemon
+        self.started = time.monotonic()
+        self.started_at = time.time()
+        self.future = future
+
+    @property
+    def state(self) -> TaskState:
+        if not self.future.done():
+            return TaskState.RUNNING
+        if self.future.cancelled():
+            return TaskState.CANCELLED
+        if self.future.exception() is not None:
+            return TaskState.FAILED
+        return TaskState.DONE
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.started
+
+    def gql(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "owner": self.owner,
+            "daemon": self.daemon,
+            "state": self.state.value,
+            "startedAt": self.started_at,
+            "age": self.age,
+        }
+
+
+class TaskRegistry:
+    """
+    Keeps track of every job scheduled by the core until it finishes.
+    Daemon tasks are long living loops (servers, readers),
+    which are not waited for when draining.
+    """
+
+    def __init__(self, core: "Core"):
+        self.core = core
+        self._tasks: Dict[asyncio.Future, TaskInfo] = {}
+        self._owners: Dict[str, Set[asyncio.Future]] = {}
+        self._next_id = 0
+
+        core.api.gql.add_query(
+            "tasks(owner: String, minAge: Float): [TaskInfo]!", self.gql_tasks
+        )
+        core.api.gql.add_query("leakedTasks: [TaskInfo]!", self.gql_leaked)
+        core.api.gql.add_mutation("cancelTasks(owner: String!): Int!", self.gql_cancel)
+
+    def track(
+        self,
+        future: asyncio.Future,
+        name: str,
+        owner: Optional[str] = None,
+        daemon: bool = False,
+    ) -> asyncio.Future:
+        """registers a task or executor future. must be run in the event loop."""
+        if future.done():
+            return future
+        owner = owner or CORE
+        self._next_id += 1
+        self._tasks[future] = TaskInfo(self._next_id, name, owner, daemon, future)
+        try:
+            self._owners[owner].add(future)
+        except KeyError:
+            self._owners[owner] = {future}
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: asyncio.Future):
+        info = self._tasks.pop(future, None)
+        if info is None:
+            return
+        owned = self._owners.get(info.owner)
+        if owned is not None:
+            owned.discard(future)
+            if not owned:
+                del self._owners[info.owner]
+
+    def tasks(self, owner: Optional[str] = None, min_age: float = 0) -> List[TaskInfo]:
+        if owner is None:
+            infos = self._tasks.values()
+        else:
+            infos = [self._tasks[future] for future in self._owners.get(owner, ())]
+        if min_age:
+            return [info for info in infos if info.age >= min_age]
+        return list(infos)
+
+    def owners(self) -> List[str]:
+        return list(self._owners)
+
+    def cancel(self, owner: str) -> int:
+        """
+        cancels every running task of an owner, e.g. 'plugin:Spotify' or 'flow:lights'
+        :return: number of cancelled tasks
+        """
+        futures = list(self._owners.get(owner, ()))
+        for future in futures:
+            future.cancel()
+        if futures:
+            LOGGER.info(f"cancelled {len(futures)} tasks of {owner}")
+        return len(futures)
+
+    def leaked(self) -> List[asyncio.Task]:
+        """tasks alive on the event loop which weren't created through the core"""
+        current = asyncio.current_task()
+        return [
+            task
+            for task in asyncio.all_tasks(self.core.event_loop)
+            if task not in self._tasks and task is not current
+        ]
+
+    async def drain(self, deadline: float) -> List[TaskInfo]:
+        """
+        waits until every non daemon task has finished, at most deadline seconds.
+        :return: the tasks still running after the deadline
+        """
+        end = time.monotonic() + deadline
+        current = asyncio.current_task()
+        while True:
+            pending = [
+                info.future
+                for info in self._tasks.values()
+                if not info.daemon and info.future is not current
+            ]
+            remaining = end - time.monotonic()
+            if not pending or remaining <= 0:
+                break
+            # tasks started by the ones we wait on are picked up in the next round
+            await asyncio.wait(pending, timeout=remaining)
+
+        return [
+            info
+            for info in self._tasks.values()
+            if not info.daemon and info.future is not current
+        ]
+
+    async def gql_tasks(self, *_, owner=None, minAge=0):
+        return [info.gql() for info in self.tasks(owner, minAge or 0)]
+
+    async def gql_leaked(self, *_):
+        return [
+            {
+                "id": 0,
+                "name": task.get_name(),
+                "owner": "",
+                "daemon": False,
+                "state": TaskState.RUNNING.value,
+                "startedAt": None,
+                "age": None,
+            }
+            for task in self.leaked()
+        ]
+
+    async def gql_cancel(self, *_, owner):
+        return self.cancel(owner)
@@ -26,3 +26,15 @@ class TestUser(TestCase):
 
     def test_new_admin(self):
         admin = User.new_admin()
+
+    def test_authorize_cached(self):
+        user = self.create_test_user({"hub.bus": ["write"], "mqtt.*": ["*"]})
+        for _ in range(2):
+            self.assertTrue(user.authorize("hub.bus", "write"))
+            self.assertTrue(user.authorize("hub.bus.events", "write"))
+            self.assertFalse(user.authorize("hub.bus", "read"))
+            self.assertFalse(user.authorize("mqtt.publish", "read"))
+
+        user.scopes = {"hub.bus": ["read"]}
+        self.assertFalse(user.authorize("hub.bus", "write"))
+        self.assertTrue(user.authorize("hub.bus", "read"))
@@ -0,0 +1,52 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from helper.broadcast import BroadcastChannel, Policy
+
+
+async def collect(channel: BroadcastChannel, policy: Policy, items: list):
+    async for item in channel.subscribe(policy):
+        items.append(item)
+
+
+class TestBroadcastChannel(IsolatedAsyncioTestCase):
+    async def test_fan_out(self):
+        channel = BroadcastChannel(capacity=4)
+        first, second = [], []
+        tasks = [
+            asyncio.create_task(collect(channel, Policy.DROP_OLDEST, first)),
+            asyncio.create_task(collect(channel, Policy.DROP_OLDEST, second)),
+        ]
+        await asyncio.sleep(0)
+
+        for i in range(3):
+            channel.put_nowait(i)
+            await asyncio.sleep(0)
+
+        self.assertEqual(first, [0, 1, 2])
+        self.assertEqual(second, [0, 1, 2])
+        self.assertEqual(channel.subscribers, 2)
+        [task.cancel() for task in tasks]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(channel.subscribers, 0)
+
+    async def test_slow_subscriber_policies(self):
+        channel = BroadcastChannel(capacity=2)
+        results = {policy: [] for policy in Policy}
+        tasks = [
+            asyncio.create_task(collect(channel, policy, items))
+            for policy, items in results.items()
+        ]
+        await asyncio.sleep(0)
+
+        # published without yielding to the subscribers
+        for i in range(5):
+            channel.put_nowait(i)
+        await asyncio.sleep(0)
+
+        self.assertEqual(results[Policy.DROP_OLDEST], [3, 4])
+        self.assertEqual(results[Policy.CONFLATE], [4])
+        self.assertEqual(results[Policy.DISCONNECT], [])
+        self.assertTrue(tasks[2].done())
+        [task.cancel() for task in tasks]
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from helper.coalescer import Coalescer, CoalescingRule, content_key
+
+
+def event(event_type, **content):
+    return SimpleNamespace(event_type=event_type, event_content=content)
+
+
+class TestCoalescer(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.delivered = []
+        self.coalescer = Coalescer(asyncio.get_running_loop(), self.delivered.append)
+
+    async def test_no_rule(self):
+        self.assertFalse(self.coalescer.submit(event("registry.state_change")))
+
+    async def test_trailing(self):
+        self.coalescer.add_rule("spotify.*", CoalescingRule(window=0.02))
+        for i in range(5):
+            self.assertTrue(self.coalescer.submit(event("spotify.progress", value=i)))
+        self.assertEqual(self.delivered, [])
+
+        await asyncio.sleep(0.05)
+        self.assertEqual([e.event_content["value"] for e in self.delivered], [4])
+        self.assertEqual(self.coalescer.coalesced, 4)
+
+    async def test_leading_and_key(self):
+        self.coalescer.add_rule(
+            "registry.state_change",
+            CoalescingRule(window=0.02, key=content_key("entity"), leading=True),
+        )
+        for i in range(3):
+            self.coalescer.submit(event("registry.state_change", entity="a", value=i))
+        self.coalescer.submit(event("registry.state_change", entity="b", value=0))
+        self.assertEqual(len(self.delivered), 2)
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(
+            [
+                (e.event_content["entity"], e.event_content["value"])
+                for e in self.delivered
+            ],
+            [("a", 0), ("b", 0), ("a", 2)],
+        )
+
+    async def test_max_latency(self):
+        self.coalescer.add_rule("slider", CoalescingRule(window=0.05, max_latency=0.03))
+        for i in range(6):
+            self.coalescer.submit(event("slider", value=i))
+            await asyncio.sleep(0.01)
+        self.assertGreaterEqual(len(self.delivered), 1)
+
+    async def test_key_of_non_dict_content(self):
+        key = content_key("entity")
+        self.assertIsNone(key(SimpleNamespace(event_content="on")))
+        self.assertIsNone(key(SimpleNamespace(event_content=None)))
+        self.assertEqual(key(event("registry.state_change", entity="a")), ("a",))
+
+    async def test_remove_equal_rule(self):
+        first, second = CoalescingRule(window=0.02), CoalescingRule(window=0.02)
+        self.coalescer.add_rule("slider", first)
+        self.coalescer.add_rule("slider", second)
+        self.assertTrue(self.coalescer.remove_rule("slider", second))
+        self.assertFalse(self.coalescer.remove_rule("slider", second))
+        self.assertTrue(self.coalescer.submit(event("slider", value=1)))
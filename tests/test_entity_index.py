@@ -0,0 +1,67 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+
+from components.switch import Switch
+from constants.entity_types import EntityType
+from entity_registry import EntityRegistry
+from objects.entity import Entity
+
+
+def entity(name, entity_type=EntityType.SWITCH, **settings):
+    e = Entity(name, entity_type)
+    e.add_component("switch", Switch({}, None, e))
+    e.settings = settings
+    return e
+
+
+class TestEntityIndex(TestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        os.makedirs(f"{location}/config/entities")
+        os.makedirs(f"{location}/config/scenes")
+        core = SimpleNamespace(
+            location=location,
+            config=SimpleNamespace(state_store=False),
+            io=SimpleNamespace(add_output_service=lambda *_: None),
+            event_loop=None,
+            api=SimpleNamespace(
+                gql=SimpleNamespace(
+                    add_query=lambda *_: None, add_mutation=lambda *_: None
+                ),
+                register_rest_handler=lambda *_: None,
+                add_metrics_provider=lambda *_: None,
+            ),
+        )
+        self.registry = EntityRegistry(core)
+
+    def test_views(self):
+        grid = self.registry.entities_with_setting("grid")
+        self.registry.add_entity("a", entity("a", grid={}))
+        self.registry.add_entity("b", entity("b", EntityType.BLINDS, alexa=False))
+
+        self.assertEqual(list(grid), ["a"])
+        self.assertEqual(list(self.registry.entities_of_type(EntityType.BLINDS)), ["b"])
+        self.assertEqual(len(self.registry.entities_with_component("switch")), 2)
+        self.assertEqual(len(self.registry.entities_with_setting("alexa")), 0)
+
+        self.registry.remove_entity("a")
+        self.assertEqual(len(grid), 0)
+
+    def test_replace_and_find(self):
+        self.registry.add_entity("a", entity("a", grid={}))
+        self.registry.add_entity("a", entity("a", google={}))
+        self.registry.add_entity("b", entity("b", google={}))
+
+        self.assertEqual(len(self.registry.entities_with_setting("grid")), 0)
+        self.assertEqual(
+            [
+                e.name
+                for e in self.registry.find_entities(
+                    EntityType.SWITCH, "switch", "google"
+                )
+            ],
+            ["a", "b"],
+        )
+        self.assertEqual(self.registry.find_entities(setting="unknown"), [])
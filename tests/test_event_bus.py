@@ -0,0 +1,108 @@
+import asyncio
+import tempfile
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from event_bus import EventBus
+from objects.Context import Context
+from objects.Event import Event
+
+
+class TestEventBus(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        loop = asyncio.get_running_loop()
+        self.jobs = []
+
+        def add_job(job, *args, daemon=False):
+            self.jobs.append((job, daemon))
+            result = job(*args)
+            if asyncio.iscoroutine(result):
+                return loop.create_task(result)
+
+        ignore = lambda *_: None
+        core = SimpleNamespace(
+            location=tempfile.mkdtemp(),
+            config=SimpleNamespace(bus_metrics=False, event_log=""),
+            event_loop=loop,
+            io=SimpleNamespace(add_output_service=ignore, add_input_service=ignore),
+            api=SimpleNamespace(
+                gql=SimpleNamespace(add_query=ignore, add_mutation=ignore)
+            ),
+            add_job=add_job,
+            async_add_described_job=lambda job, *args, **_: add_job(job.target, *args),
+        )
+        self.bus = core.bus = EventBus(core)
+
+    def dispatch(self, event_type: str):
+        self.bus.dispatch(Event(event_type, context=Context.admin()))
+
+    async def settle(self):
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+    async def test_failing_listener(self):
+        calls = []
+
+        def broken():  # wrong arity, calling it raises a TypeError
+            pass
+
+        def listener(event):
+            calls.append(event.event_type)
+
+        self.bus.listen("light.on", broken)
+        self.bus.listen("light.on", listener)
+        with self.assertLogs("EventBus", "ERROR"):
+            self.dispatch("light.on")
+            self.dispatch("light.on")
+            await self.settle()
+        self.assertEqual(calls, ["light.on", "light.on"])
+
+    async def test_wait_for(self):
+        waiter = asyncio.ensure_future(self.bus.wait_for("light.on"))
+        await self.settle()
+        self.dispatch("light.on")
+        self.assertEqual((await asyncio.wait_for(waiter, 1)).event_type, "light.on")
+        self.assertEqual(self.bus._waiters, {})
+
+    async def test_wait_for_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.bus.wait_for("light.on", timeout=0.01)
+        self.assertEqual(self.bus._waiters, {})
+
+    async def test_wait_for_cancelled(self):
+        waiter = asyncio.ensure_future(self.bus.wait_for("light.on"))
+        await self.settle()
+        self.assertIn("light.on", self.bus._waiters)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        self.assertEqual(self.bus._waiters, {})
+
+    async def test_predicate_raises(self):
+        waiter = asyncio.ensure_future(
+            self.bus.wait_for("light.on", predicate=lambda event: 1 / 0)
+        )
+        other = asyncio.ensure_future(self.bus.wait_for("light.on"))
+        await self.settle()
+        self.dispatch("light.on")
+
+        with self.assertRaises(ZeroDivisionError):
+            await asyncio.wait_for(waiter, 1)
+        # the failing predicate doesn't affect other waiters
+        self.assertEqual((await asyncio.wait_for(other, 1)).event_type, "light.on")
+        self.assertEqual(self.bus._waiters, {})
+
+    async def test_listen_once(self):
+        calls = []
+
+        async def callback(event):
+            calls.append(event)
+
+        self.bus.listen_once("light.on", callback)
+        self.dispatch("light.on")
+        self.dispatch("light.on")
+        await self.settle()
+        self.assertEqual(len(calls), 1)
+
+    async def test_dispatcher_is_daemon(self):
+        self.assertIn((self.bus._lanes.run, True), self.jobs)
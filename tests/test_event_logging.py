@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import tempfile
+from unittest import TestCase
+
+from helper.event_logging import (
+    CONTENT_LIMIT,
+    CompactEventFormatter,
+    SamplingPolicy,
+    start_event_sink,
+)
+from objects.Context import Context
+from objects.Event import Event
+
+
+class TestSamplingPolicy(TestCase):
+    def test_rates(self):
+        policy = SamplingPolicy()
+        policy.set_rate("sensor.*", 0.25)
+        policy.set_rate("sensor.door", 1)
+        policy.set_rate("tick", 0)
+
+        sampled = [policy.sample("sensor.temperature") for _ in range(12)]
+        # the first event of a type is logged, then every fourth
+        self.assertEqual(
+            [i for i, logged in enumerate(sampled) if logged], [0, 3, 7, 11]
+        )
+        self.assertTrue(all(policy.sample("sensor.door") for _ in range(4)))
+        self.assertFalse(any(policy.sample("tick") for _ in range(4)))
+        self.assertTrue(policy.sample("light.on"))
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            SamplingPolicy().set_rate("tick", 2)
+
+
+class TestEventSink(TestCase):
+    def test_format_on_emit(self):
+        path = os.path.join(tempfile.mkdtemp(), "events.log")
+        logger = logging.getLogger("test.events")
+        logger.setLevel(logging.INFO)
+        listener = start_event_sink(logger, path)
+        try:
+            content = {"state": 1}
+            logger.info(
+                "light.on", extra={"event": Event("light.on", content, Context.admin())}
+            )
+            content["state"] = 2  # changed right after the record was emitted
+        finally:
+            listener.stop()
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            for handler in listener.handlers:
+                handler.close()
+
+        with open(path) as file:
+            record = json.loads(file.readline())
+        self.assertEqual(record["type"], "light.on")
+        self.assertEqual(record["content"], "{'state': 1}")
+
+    def test_content_limit(self):
+        content = {"items": list(range(10**5)), "text": "x" * 10**5}
+        record = logging.makeLogRecord(
+            {"event": Event("dump", content, Context.admin())}
+        )
+        formatted = json.loads(CompactEventFormatter().format(record))["content"]
+        self.assertLessEqual(len(formatted), CONTENT_LIMIT + len("..."))
+        self.assertTrue(formatted.startswith("{'items': [0, 1, 2,"))
@@ -0,0 +1,85 @@
+import asyncio
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from IO import IO, Formatter
+from decorators import executor
+from executors import PROCESS, ExecutorPool, Executors, PoolSaturated
+from helper.metrics import HandlerStats, timed_future
+
+
+@executor("process")
+def scale(value, factor=2):
+    return value * factor
+
+
+class TestExecutorPool(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = ExecutorPool("test", workers=1, max_queue=1)
+        self.release = threading.Event()
+
+    async def asyncTearDown(self):
+        self.release.set()
+        self.pool.executor.shutdown(wait=True)
+
+    async def test_run(self):
+        loop = asyncio.get_running_loop()
+        self.assertEqual(await self.pool.run(loop, lambda x: x * 2, 21), 42)
+        self.assertEqual(self.pool.pending, 0)
+        self.assertEqual(self.pool.completed, 1)
+
+    async def test_queue_limit(self):
+        loop = asyncio.get_running_loop()
+        running = self.pool.run(loop, self.release.wait)
+        queued = self.pool.run(loop, self.release.wait)
+        rejected = self.pool.run(loop, self.release.wait)
+
+        self.assertEqual(self.pool.queued, 1)
+        self.assertEqual(self.pool.saturated, 1)
+        with self.assertRaises(PoolSaturated):
+            await rejected
+        self.assertEqual(self.pool.rejected, 1)
+
+        self.release.set()
+        await asyncio.gather(running, queued)
+        self.assertEqual(self.pool.pending, 0)
+        self.assertEqual(self.pool.peak, 2)
+
+
+class TestProcessPool(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        ignore = lambda *_, **__: None
+        self.core = SimpleNamespace(
+            location=tempfile.mkdtemp(),
+            event_loop=asyncio.get_running_loop(),
+            api=SimpleNamespace(
+                gql=SimpleNamespace(add_query=ignore, add_mutation=ignore),
+                add_metrics_provider=ignore,
+            ),
+            add_lifecycle_hook=ignore,
+        )
+        self.core.executors = Executors(self.core)
+        self.core.executors.add_pool("process", PROCESS, workers=1)
+        self.pool = self.core.executors.pools["process"]
+
+    async def asyncTearDown(self):
+        self.core.executors.shutdown()
+
+    async def test_run(self):
+        stats = HandlerStats()
+        future = self.core.executors.run(scale, 21)
+        timed_future(stats, future)
+        self.assertEqual(await future, 42)
+        self.assertEqual(self.pool.completed, 1)
+        self.assertEqual((stats.execution.count, stats.errors), (1, 0))
+
+    async def test_formatter(self):
+        with patch.object(IO, "load_formatter"):  # no formatter modules in tests
+            io = IO(self.core)
+        io.add_formatter("test.scale", Formatter(scale, {}))
+        pipe = io.build_pipe(["test.scale", {"test.scale": {"factor": 3}}])
+        self.assertEqual(await pipe(1), 6)
+        self.assertEqual(self.pool.completed, 2)
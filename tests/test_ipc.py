@@ -0,0 +1,89 @@
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from helper.ipc import Connection, Kind, peer_pid
+from isolation import IsolatedPlugin
+from objects.Context import Context
+
+
+class TestConnection(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "ipc.sock")
+        accepted = asyncio.get_running_loop().create_future()
+
+        async def on_connect(reader, writer):
+            self.pid = peer_pid(writer)
+            accepted.set_result(Connection(reader, writer))
+
+        self.server = await asyncio.start_unix_server(on_connect, self.path)
+        self.client = Connection(*await asyncio.open_unix_connection(self.path))
+        self.remote = await accepted
+
+    async def asyncTearDown(self):
+        self.client.close()
+        self.remote.close()
+        self.server.close()
+        os.remove(self.path)
+
+    async def test_round_trip(self):
+        self.assertTrue(self.client.send(Kind.CALL, 3, ("output", "a.b", {"x": 1})))
+        self.assertEqual(
+            await self.remote.receive(), (Kind.CALL, 3, ["output", "a.b", {"x": 1}])
+        )
+
+    async def test_context(self):
+        self.client.send(Kind.DISPATCH, 0, ("test", None, Context.admin(True)))
+        _, _, (_, _, context) = await self.remote.receive()
+        self.assertTrue(context.user.admin)
+        self.assertTrue(context.remote)
+        self.assertTrue(context.authorize("bus", "dispatch"))
+
+    async def test_max_buffer(self):
+        self.client.max_buffer = 1024
+        self.assertTrue(self.client.send(Kind.RESULT, 1, "x" * 2**22))
+        self.assertFalse(self.client.send(Kind.RESULT, 2, "ok"))
+
+        self.assertEqual(len((await self.remote.receive())[2]), 2**22)
+        await self.client.drain()
+        self.assertTrue(self.client.send(Kind.RESULT, 3, "ok"))
+        self.assertEqual(await self.remote.receive(), (Kind.RESULT, 3, "ok"))
+
+    async def test_untrusted_context(self):
+        bound = Context()
+        remote = Connection(self.remote.reader, self.remote.writer, context=bound)
+        self.client.send(Kind.TRIGGER, 1, [{"value": 1}, Context.admin()])
+        self.assertEqual(
+            await remote.receive(), (Kind.TRIGGER, 1, [{"value": 1}, bound])
+        )
+
+    async def test_peer_pid(self):
+        self.assertEqual(self.pid, os.getpid())
+
+    async def test_unencodable_payload(self):
+        self.assertFalse(self.client.send(Kind.RESULT, 1, lambda: None))
+        self.client.send(Kind.RESULT, 2, "ok")
+        self.assertEqual(await self.remote.receive(), (Kind.RESULT, 2, "ok"))
+
+    async def test_closed(self):
+        self.client.close()
+        with self.assertRaises(asyncio.IncompleteReadError):
+            await self.remote.receive()
+
+
+class TestIsolatedPlugin(IsolatedAsyncioTestCase):
+    async def test_dispatch_context(self):
+        events = []
+        core = SimpleNamespace(
+            add_lifecycle_hook=lambda *_: None,
+            bus=SimpleNamespace(dispatch=events.append),
+        )
+        plugin = IsolatedPlugin(core, "plugins.Test", "Test")
+        plugin._handle(Kind.DISPATCH, 0, ["light.on", 1, Context.admin()])
+
+        self.assertIs(events[0].context, plugin.context)
+        self.assertFalse(events[0].context.user.admin)
+        self.assertTrue(events[0].context.authorize("hub.bus", "write"))
+        self.assertFalse(events[0].context.authorize("mqtt.publish", "*"))
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from journal import EventJournal
+from objects.Event import Event
+
+
+class TestEventJournal(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        ignore = lambda *_: None
+        self.core = SimpleNamespace(
+            event_loop=asyncio.get_running_loop(),
+            api=SimpleNamespace(
+                gql=SimpleNamespace(add_query=ignore, add_subscription=ignore)
+            ),
+            add_lifecycle_hook=ignore,
+        )
+        self.path = tempfile.mkdtemp()
+
+    def journal(self, **kwargs) -> EventJournal:
+        return EventJournal(self.core, self.path, flush_interval=0.01, **kwargs)
+
+    async def test_append(self):
+        journal = self.journal()
+        content = {"state": 1}
+        journal.append(Event("light.on", content))
+        content["state"] = 2  # changed after the dispatch
+        await journal.flush()
+
+        records = list(journal.read())
+        self.assertEqual([r.offset for r in records], [0])
+        self.assertEqual(records[0].event_type, "light.on")
+        self.assertEqual(records[0].event_content, {"state": 1})
+        self.assertEqual(journal.next_offset, 1)
+
+    async def test_read(self):
+        journal = self.journal()
+        for index in range(10):
+            journal.append(Event("tick", index))
+        await journal.flush()
+
+        self.assertEqual([r.offset for r in journal.read(4, limit=3)], [4, 5, 6])
+        records = await journal.replay()
+        since = records[7].time
+        self.assertEqual([r.offset for r in journal.read(since=since)], [7, 8, 9])
+
+    async def test_rotation(self):
+        journal = self.journal(segment_size=200, max_segments=2)
+        for index in range(20):
+            journal.append(Event("tick", index))
+        await journal.flush()
+
+        segments = journal.segments()
+        self.assertEqual(len(segments), 2)
+        offsets = [r.offset for r in journal.read()]
+        self.assertEqual(offsets, list(range(segments[0], 20)))
+
+    async def test_recover_truncated(self):
+        journal = self.journal()
+        for index in range(5):
+            journal.append(Event("tick", index))
+        await journal.flush()
+        journal._segment_file.close()
+
+        segment = journal._segment_path(journal.segments()[-1])
+        with open(segment, "r+b") as file:
+            file.truncate(os.path.getsize(segment) - 3)
+
+        recovered = self.journal()
+        self.assertEqual(recovered.next_offset, 4)
+        recovered.append(Event("tick", "new"))
+        await recovered.flush()
+        records = list(recovered.read())
+        self.assertEqual([r.offset for r in records], [0, 1, 2, 3, 4])
+        self.assertEqual(records[-1].event_content, "new")
+
+    async def test_follow(self):
+        journal = self.journal()
+        journal.append(Event("tick", 0))
+        follower = journal.follow(0)
+
+        self.assertEqual((await follower.__anext__()).event_content, 0)
+        waiting = asyncio.ensure_future(follower.__anext__())
+        await asyncio.sleep(0)
+        journal.append(Event("tick", 1))
+        self.assertEqual((await asyncio.wait_for(waiting, 1)).event_content, 1)
+        await follower.aclose()
@@ -0,0 +1,86 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from helper.lanes import PriorityLanes
+from objects.Event import Priority
+
+
+class TestPriorityLanes(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.delivered = []
+
+    async def drain(self, lanes: PriorityLanes, count: int):
+        """runs the dispatcher until count items are delivered"""
+        task = asyncio.get_running_loop().create_task(lanes.run())
+        try:
+            for _ in range(count * 2):
+                if len(self.delivered) >= count:
+                    break
+                await asyncio.sleep(0)
+            self.assertEqual(len(self.delivered), count)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def test_priority_order(self):
+        lanes = PriorityLanes(Priority, self.delivered.append)
+        lanes.put("low", Priority.LOW)
+        lanes.put("normal", Priority.NORMAL)
+        lanes.put("high", Priority.HIGH)
+        lanes.put("normal 2", Priority.NORMAL)
+
+        await self.drain(lanes, 4)
+        self.assertEqual(self.delivered, ["high", "normal", "normal 2", "low"])
+
+    async def test_starvation_limit(self):
+        lanes = PriorityLanes(Priority, self.delivered.append, starvation_limit=2)
+        lanes.put("low", Priority.LOW)
+        for index in range(5):
+            lanes.put(index, Priority.HIGH)
+
+        await self.drain(lanes, 6)
+        self.assertEqual(self.delivered, [0, 1, "low", 2, 3, 4])
+
+    async def test_depth(self):
+        lanes = PriorityLanes(Priority, self.delivered.append)
+        for index in range(3):
+            lanes.put(index, Priority.NORMAL)
+        lanes.put("high", Priority.HIGH)
+        self.assertEqual(lanes.depth, {"high": 1, "normal": 3, "low": 0})
+
+        await self.drain(lanes, 4)
+        lanes.put(3, Priority.NORMAL)
+        self.assertEqual(lanes.depth, {"high": 0, "normal": 1, "low": 0})
+        self.assertEqual(lanes.max_depth[Priority.NORMAL], 3)
+        self.assertEqual(lanes.max_depth[Priority.LOW], 0)
+        self.assertEqual(lanes.processed[Priority.NORMAL], 3)
+        self.assertEqual(lanes.processed[Priority.HIGH], 1)
+
+    async def test_high_flood(self):
+        lanes = PriorityLanes(Priority, self.delivered.append)
+        for index in range(1000):
+            lanes.put(index, Priority.HIGH)
+        for index in range(5):
+            lanes.put(f"low {index}", Priority.LOW)
+
+        await self.drain(lanes, 1005)
+        low = [
+            i for i, item in enumerate(self.delivered) if str(item).startswith("low")
+        ]
+        # every 17th item is a low one while the high lane is flooded
+        self.assertEqual(low, [16, 33, 50, 67, 84])
+        self.assertEqual(lanes.processed[Priority.HIGH], 1000)
+
+    async def test_failing_delivery(self):
+        def deliver(item):
+            if item == "bad":
+                raise ValueError(item)
+            self.delivered.append(item)
+
+        lanes = PriorityLanes(Priority, deliver)
+        lanes.put("bad", Priority.NORMAL)
+        lanes.put("good", Priority.NORMAL)
+        with self.assertLogs("PriorityLanes", "ERROR"):
+            await self.drain(lanes, 1)
+        self.assertEqual(self.delivered, ["good"])
+        self.assertEqual(lanes.processed[Priority.NORMAL], 2)
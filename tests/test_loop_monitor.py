@@ -0,0 +1,45 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from loop_monitor import LoopMonitor
+
+
+class TestLoopMonitor(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stored = {}
+        core = SimpleNamespace(
+            event_loop=asyncio.get_running_loop(),
+            add_lifecycle_hook=lambda *_: None,
+            storage=SimpleNamespace(store_dict=self.stored.__setitem__),
+        )
+        self.monitor = LoopMonitor(core, interval=0.02, threshold=0.05)
+        self.monitor.start()
+
+    async def asyncTearDown(self):
+        await self.monitor.stop()
+
+    async def test_watchdog_idle(self):
+        start = time.process_time()
+        await asyncio.sleep(0.5)
+        # a spinning watchdog burns about one cpu second per second
+        self.assertLess(time.process_time() - start, 0.2)
+
+    async def test_stops_promptly(self):
+        await self.monitor.stop()
+        self.monitor._thread.join(timeout=0.05)
+        self.assertFalse(self.monitor._thread.is_alive())
+
+    async def test_detects_blocking(self):
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+        # a loaded machine can add lag samples of its own, only the block is certain
+        self.assertGreaterEqual(self.monitor.blocked, 1)
+        self.assertTrue(
+            any(
+                "test_detects_blocking" in sample.location
+                for sample in self.monitor.slow_callbacks
+            )
+        )
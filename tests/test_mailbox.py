@@ -0,0 +1,48 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from components.brightness import Brightness
+from constants.entity_types import EntityType
+from helper.mailbox import COALESCED, CommandMailbox
+from objects.entity import Entity
+
+
+class TestCommandMailbox(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sent = []
+
+        async def handler(state, _):
+            await asyncio.sleep(0.01)
+            self.sent.append(state)
+
+        entity = Entity("lamp", EntityType.LAMP_BRIGHTNESS)
+        self.brightness = Brightness({}, handler, entity)
+        self.mailbox = CommandMailbox(asyncio.get_running_loop())
+
+    def submit(self, method, target):
+        job = getattr(self.brightness, method)
+        return self.mailbox.submit(self.brightness, method, lambda: job(target, None))
+
+    async def test_last_write_wins(self):
+        first = self.submit("set", 0)
+        await asyncio.sleep(0)  # in flight
+        results = await asyncio.gather(
+            first, *(self.submit("set", v) for v in range(1, 5))
+        )
+
+        self.assertEqual(self.sent, [0, 4])
+        self.assertEqual(results, [0, COALESCED, COALESCED, COALESCED, 4])
+        stats = self.mailbox.stats["brightness"]
+        self.assertEqual((stats.submitted, stats.executed, stats.coalesced), (5, 2, 3))
+
+    async def test_not_coalescible(self):
+        await asyncio.gather(*(self.submit("increase", 10) for _ in range(3)))
+        self.assertEqual(self.sent, [10, 20, 30])
+
+    async def test_min_interval(self):
+        self.mailbox.set_min_interval("brightness", 0.05)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(self.submit("set", 1), self.submit("increase", 1))
+        self.assertGreaterEqual(loop.time() - start, 0.05)
+        self.assertEqual(self.sent, [1, 2])
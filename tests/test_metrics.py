@@ -0,0 +1,71 @@
+from unittest import TestCase
+
+from helper.metrics import BUCKETS, BusMetrics, Histogram
+
+
+class TestHistogram(TestCase):
+    def test_observe(self):
+        histogram = Histogram()
+        for value in (0.00005, 0.003, 0.003, 100):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 100.00605)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[BUCKETS.index(0.005)], 2)
+        self.assertEqual(histogram.counts[-1], 1)
+
+    def test_render(self):
+        histogram = Histogram()
+        histogram.observe(0.003)
+        histogram.observe(2)
+        lines = histogram.render("latency", 'handler="a"')
+
+        self.assertEqual(len(lines), len(BUCKETS) + 3)
+        self.assertIn('latency_bucket{handler="a",le="0.001"} 0', lines)
+        self.assertIn('latency_bucket{handler="a",le="0.005"} 1', lines)
+        self.assertIn('latency_bucket{handler="a",le="+Inf"} 2', lines)
+        self.assertEqual(lines[-1], 'latency_count{handler="a"} 2')
+
+
+class TestBusMetrics(TestCase):
+    def test_render(self):
+        metrics = BusMetrics()
+        metrics.record_dispatch("light.on", 2)
+        metrics.record_dispatch("light.on", 3)
+        metrics.handler("plugin:Lamp", "lamp.on_light").execution.observe(0.01)
+        metrics.handler("plugin:Lamp", "lamp.on_light").errors += 1
+        lines = metrics.render().splitlines()
+
+        self.assertIn("# TYPE hub_bus_events_total counter", lines)
+        self.assertIn('hub_bus_events_total{event_type="light.on"} 2', lines)
+        self.assertIn('hub_bus_fanout_total{event_type="light.on"} 5', lines)
+        labels = 'handler="lamp.on_light",owner="plugin:Lamp"'
+        self.assertIn(f"hub_bus_handler_errors_total{{{labels}}} 1", lines)
+        self.assertIn(f"hub_bus_handler_execution_seconds_count{{{labels}}} 1", lines)
+        self.assertIn(f"hub_bus_handler_queue_delay_seconds_count{{{labels}}} 0", lines)
+
+    def test_escape_labels(self):
+        metrics = BusMetrics()
+        metrics.record_dispatch('say "hi"\\now\n', 1)
+        lines = metrics.render().splitlines()
+        self.assertIn(
+            'hub_bus_events_total{event_type="say \\"hi\\"\\\\now\\n"} 1', lines
+        )
+
+    def test_handlers_per_owner(self):
+        metrics = BusMetrics()
+        metrics.handler("plugin:A", "handlers.on_event").errors += 1
+        metrics.handler("plugin:B", "handlers.on_event").errors += 2
+        self.assertEqual(
+            [(h["owner"], h["errors"]) for h in metrics.gql()["handlers"]],
+            [("plugin:A", 1), ("plugin:B", 2)],
+        )
+
+    def test_gql(self):
+        metrics = BusMetrics()
+        metrics.record_dispatch("light.on", 1)
+        self.assertEqual(
+            metrics.gql()["eventTypes"],
+            [{"eventType": "light.on", "dispatched": 1, "fanout": 1}],
+        )
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from loader.plugin_graph import PluginInitializer, dependency_waves
+from loader.plugin_loader import dependencies_of
+
+
+class TestDependencyWaves(TestCase):
+    def test_waves(self):
+        waves, failed = dependency_waves(
+            {
+                "MEDIAMANAGER": ["TCP-CEC", "SPOTIFY"],
+                "SPOTIFY": [],
+                "TCP-CEC": [],
+                "WEATHER": [],
+            }
+        )
+        self.assertEqual(waves, [["SPOTIFY", "TCP-CEC", "WEATHER"], ["MEDIAMANAGER"]])
+        self.assertEqual(failed, set())
+
+    def test_missing_dependency(self):
+        waves, failed = dependency_waves(
+            {"MEDIAMANAGER": ["SPOTIFY"], "CHILD": ["MEDIAMANAGER"], "WEATHER": []}
+        )
+        self.assertEqual(waves, [["WEATHER"]])
+        self.assertEqual(failed, {"MEDIAMANAGER", "CHILD"})
+
+    def test_cycle(self):
+        waves, failed = dependency_waves({"A": ["B"], "B": ["A"], "C": []})
+        self.assertEqual(waves, [["C"]])
+        self.assertEqual(failed, {"A", "B"})
+
+    def test_optional_dependency(self):
+        manifest = {"dependencies": ["tcp-cec"], "optional_dependencies": ["Spotify"]}
+        self.assertEqual(dependencies_of(manifest), ["TCP-CEC"])
+        self.assertEqual(
+            dependencies_of(manifest, {"TCP-CEC", "SPOTIFY"}), ["TCP-CEC", "SPOTIFY"]
+        )
+
+
+class TestPluginInitializer(IsolatedAsyncioTestCase):
+    async def test_start_per_plugin(self):
+        loop = asyncio.get_running_loop()
+        core = SimpleNamespace(async_add_job=lambda hook: loop.create_task(hook()))
+        initializer = PluginInitializer(core)
+        started = {}
+
+        def hook(plugin, duration):
+            async def init():
+                started[plugin] = time.monotonic()
+                await asyncio.sleep(duration)
+
+            initializer.add_hook(plugin, init, timeout=1)
+
+        initializer.add_plugin("FAST", [])
+        initializer.add_plugin("SLOW", [])
+        initializer.add_plugin("CHILD", ["FAST", "MISSING"])
+        hook("FAST", 0.01)
+        hook("SLOW", 0.2)
+        hook("CHILD", 0)
+
+        start = time.monotonic()
+        await initializer.run()
+        # the child only waits for its own dependency, not for the slow plugin
+        self.assertLess(started["CHILD"] - start, 0.1)
+        self.assertGreaterEqual(started["CHILD"], started["FAST"] + 0.01)
+        self.assertEqual(set(initializer.durations), {"FAST", "SLOW", "CHILD"})
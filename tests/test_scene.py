@@ -0,0 +1,118 @@
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from components.switch import Switch
+from constants.entity_types import EntityType
+from constants.events import SCENE_CHANGED
+from entity_registry import EntityRegistry
+from objects.Scene import Scene
+from objects.entity import Entity
+
+
+class TestScene(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        location = tempfile.mkdtemp()
+        os.makedirs(f"{location}/config/entities")
+        os.makedirs(f"{location}/config/scenes")
+        self.events = []
+        self.running = 0
+        self.peak = 0
+        self.core = SimpleNamespace(
+            location=location,
+            config=SimpleNamespace(
+                state_store=False, scene_concurrency=8, state_change_events=False
+            ),
+            io=SimpleNamespace(add_output_service=lambda *_: None),
+            event_loop=asyncio.get_running_loop(),
+            api=SimpleNamespace(
+                gql=SimpleNamespace(
+                    add_query=lambda *_: None, add_mutation=lambda *_: None
+                ),
+                register_rest_handler=lambda *_: None,
+                add_metrics_provider=lambda *_: None,
+            ),
+            bus=SimpleNamespace(dispatch=self.events.append),
+        )
+        self.core.registry = EntityRegistry(self.core)
+
+        async def handler(*_):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+
+        for index in range(6):
+            entity = Entity(f"lamp{index}", EntityType.SWITCH)
+            entity.add_component("switch", Switch({}, handler, entity))
+            self.core.registry.add_entity(entity.name, entity)
+
+    async def test_activate(self):
+        scene = Scene(self.core, "evening", max_concurrency=2)
+        scene.states = {f"lamp{index}.switch": True for index in range(6)}
+        scene.states["missing.switch"] = True
+        scene.compile(self.core.registry)
+
+        result = await scene.async_activate()
+
+        self.assertEqual(len(result.changes), 6)
+        self.assertEqual(self.peak, 2)
+        self.assertTrue(self.core.registry.get_entity("lamp3").state["switch"])
+        self.assertEqual([event.event_type for event in self.events], [SCENE_CHANGED])
+        self.assertEqual(self.events[0].event_content["scene"], "evening")
+
+    async def test_bulk(self):
+        result = await self.core.registry.call_methods_bulk(
+            [
+                {"entity": "lamp0", "component": "switch", "target": True},
+                {"entity": "lamp0", "component": "switch", "method": "turn_off"},
+                {"entity": "lamp1", "component": "switch", "method": "turn_on"},
+                {"entity": "lamp1", "component": "color", "target": "#fff"},
+            ]
+        )
+
+        self.assertEqual(
+            result.failed, {"lamp1.color": "component or method not found"}
+        )
+        self.assertEqual([e.name for e in result.entities], ["lamp0", "lamp1"])
+        self.assertFalse(self.core.registry.get_entity("lamp0").state["switch"])
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(len(result.gql()["changes"]), 3)
+
+    async def test_bulk_without_changes(self):
+        result = await self.core.registry.call_methods_bulk(
+            [{"entity": "lamp0", "component": "color", "target": "#fff"}]
+        )
+
+        self.assertEqual(len(result.failed), 1)
+        self.assertEqual(self.events, [])
+
+    async def test_bulk_uses_mailbox(self):
+        await self.core.registry.call_methods_bulk(
+            [
+                {"entity": f"lamp{index}", "component": "switch", "target": True}
+                for index in range(3)
+            ]
+        )
+        scene = Scene(self.core, "evening")
+        scene.states = {"lamp4.switch": True}
+        scene.compile(self.core.registry)
+        await scene.async_activate()
+
+        self.assertEqual(self.core.registry.mailbox.stats["switch"].submitted, 4)
+
+    async def test_state_change_events(self):
+        self.core.config.state_change_events = True
+        self.core.registry.dispatch_state_change_event = (
+            lambda *args, **kwargs: self.events.append(args[0].name)
+        )
+        await self.core.registry.call_methods_bulk(
+            [
+                {"entity": f"lamp{index}", "component": "switch", "target": True}
+                for index in range(2)
+            ]
+        )
+
+        self.assertEqual(sorted(self.events[1:]), ["lamp0", "lamp1"])
@@ -0,0 +1,60 @@
+import os
+import tempfile
+from typing import List
+from unittest import TestCase
+
+from helper import service_docs
+from helper.service_docs import DocCache, lazy_doc
+
+
+async def set_volume(
+    self, target: int, context, step: int = 5, devices: List[str] = None
+):
+    """Sets the volume
+    :param target: volume in percent
+    :param step: step size
+    :param devices: devices to update
+    """
+
+
+class TestServiceDocs(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.previous = service_docs.CACHE
+        self.path = os.path.join(self.dir.name, "service_docs.json")
+        service_docs.CACHE = DocCache(self.path)
+
+    def tearDown(self):
+        service_docs.CACHE = self.previous
+        self.dir.cleanup()
+
+    def test_lazy(self):
+        docs = lazy_doc(set_volume)
+        self.assertEqual(docs.description, "Sets the volume")
+        self.assertEqual(list(docs.args), ["target", "step", "devices"])
+        self.assertFalse(os.path.exists(self.path))
+
+        service_docs.CACHE.save()
+        service_docs.CACHE.save()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(service_docs.CACHE.writes, 1)
+
+    def test_cached(self):
+        built = lazy_doc(set_volume).resolve()
+        service_docs.CACHE.save()
+        cached = DocCache(self.path).get(set_volume)
+        self.assertEqual(cached.description, built.description)
+        self.assertEqual(
+            [arg.gql for arg in cached.args.values()],
+            [arg.gql for arg in built.args.values()],
+        )
+
+    def test_stamp(self):
+        service_docs.CACHE.get(set_volume)
+        service_docs.CACHE.entries[f"{__name__}.set_volume"]["description"] = "cached"
+        self.assertEqual(service_docs.CACHE.get(set_volume).description, "cached")
+
+        service_docs.CACHE.save()
+        stale = DocCache(self.path)
+        stale._stamps[__file__] = [0, 0]
+        self.assertEqual(stale.get(set_volume).description, "Sets the volume")
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from components.brightness import Brightness
+from components.color import Color
+from components.switch import Switch
+from constants.entity_types import EntityType
+from objects.entity import Entity
+from state_store import StateStore
+
+
+async def handler(*_):
+    raise AssertionError("handlers must not be called on restore")
+
+
+def lamp(name="lamp"):
+    entity = Entity(name, EntityType.LAMP_RGB)
+    entity.add_component("switch", Switch({}, handler, entity))
+    entity.add_component("brightness", Brightness({}, handler, entity))
+    entity.add_component("color", Color({}, handler, entity))
+    return entity
+
+
+class TestStateStore(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "entities.db")
+        self.core = SimpleNamespace(
+            event_loop=asyncio.get_running_loop(),
+            add_lifecycle_hook=lambda *_: None,
+        )
+
+    async def test_restore(self):
+        store = StateStore(self.core, self.path, flush_interval=0.01)
+        entity = lamp()
+        entity.components["switch"].state = True
+        entity.components["brightness"].state = 42
+        entity.components["color"].state.rgb = [0, 0, 255]
+        store.mark(entity)
+        store.mark(entity)
+        await store.flush()
+        self.assertEqual(store.writes, 1)
+        await store.close()
+
+        restored = lamp()
+        self.assertEqual(
+            StateStore(self.core, self.path).restore({"lamp": restored}), 3
+        )
+        self.assertEqual(restored.state["switch"], True)
+        self.assertEqual(restored.state["brightness"], 42)
+        self.assertEqual(restored.components["color"].state.rgb, [0, 0, 255])
+
+    async def test_changed_type(self):
+        store = StateStore(self.core, self.path)
+        entity = Entity("lamp", EntityType.LAMP)
+        entity.add_component("color", Switch({}, handler, entity, "color"))
+        entity.components["color"].state = True
+        store.mark(entity)
+        await store.close()
+
+        self.assertEqual(StateStore(self.core, self.path).restore({"lamp": lamp()}), 0)
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from helper.subscription_index import SubscriptionIndex
+
+
+class TestSubscriptionIndex(TestCase):
+    def setUp(self):
+        self.index = SubscriptionIndex(match_all="hub.match_all")
+
+    def test_resolve_prefix_and_wildcard(self):
+        self.index.add("spotify", "a")
+        self.index.add("spotify.*", "b")
+        self.index.add("spotify.track", "c")
+        self.index.add("spotify.track.change", "d")
+        self.index.add("registry", "e")
+        self.index.add("hub.match_all", "f")
+
+        self.assertEqual(
+            self.index.resolve("spotify.track.change"), ("a", "b", "c", "d", "f")
+        )
+        self.assertEqual(self.index.resolve("spotify.volume"), ("a", "b", "f"))
+        self.assertEqual(self.index.resolve("weather"), ("f",))
+
+    def test_cache_invalidation(self):
+        self.index.add("registry.state_change", "a")
+        self.assertEqual(self.index.resolve("registry.state_change"), ("a",))
+
+        self.index.add("registry.*", "b")
+        self.assertEqual(self.index.resolve("registry.state_change"), ("b", "a"))
+
+        self.assertTrue(self.index.remove("registry.state_change", "a"))
+        self.assertEqual(self.index.resolve("registry.state_change"), ("b",))
+
+    def test_remove_unknown(self):
+        self.assertFalse(self.index.remove("registry.state_change", "a"))
+        self.index.add("registry", "a")
+        self.assertFalse(self.index.remove("registry", "b"))
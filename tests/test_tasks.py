@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from tasks import TaskRegistry, TaskState, owner_of
+
+
+class TestTaskRegistry(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        gql = SimpleNamespace(add_query=lambda *_: None, add_mutation=lambda *_: None)
+        core = SimpleNamespace(
+            api=SimpleNamespace(gql=gql), event_loop=asyncio.get_running_loop()
+        )
+        self.registry = TaskRegistry(core)
+
+    def track(self, coroutine, owner=None, daemon=False):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        return self.registry.track(task, "job", owner, daemon)
+
+    async def test_owner_of(self):
+        class Owned:
+            task_owner = "flow:test"
+
+            def run(self):
+                pass
+
+        self.assertEqual(owner_of(Owned().run), "flow:test")
+        self.assertEqual(owner_of(print), "core")
+
+    async def test_cancel_owner(self):
+        first = self.track(asyncio.sleep(10), "plugin:a")
+        other = self.track(asyncio.sleep(10), "plugin:b")
+
+        self.assertEqual(self.registry.cancel("plugin:a"), 1)
+        await asyncio.gather(first, return_exceptions=True)
+        self.assertTrue(first.cancelled())
+        self.assertEqual(self.registry.owners(), ["plugin:b"])
+        self.assertEqual(self.registry.tasks("plugin:b")[0].state, TaskState.RUNNING)
+        other.cancel()
+
+    async def test_drain(self):
+        self.track(asyncio.sleep(0.01))
+        daemon = self.track(asyncio.sleep(10), daemon=True)
+
+        self.assertEqual(await self.registry.drain(1), [])
+        self.assertEqual(len(self.registry.tasks()), 1)
+
+        stuck = self.track(asyncio.sleep(10))
+        remaining = await self.registry.drain(0.01)
+        self.assertEqual([info.future for info in remaining], [stuck])
+        stuck.cancel()
+        daemon.cancel()
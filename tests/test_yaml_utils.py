@@ -0,0 +1,40 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from helper import yaml_utils
+
+
+class TestConfigCache(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.previous = yaml_utils.CACHE
+        self.cache = yaml_utils.CACHE = yaml_utils.ConfigCache(
+            os.path.join(self.dir.name, "cache")
+        )
+        self.file = os.path.join(self.dir.name, "entity.yaml")
+        self.write("name: lamp\n")
+
+    def tearDown(self):
+        yaml_utils.CACHE = self.previous
+        self.dir.cleanup()
+
+    def write(self, content):
+        with open(self.file, "w") as file:
+            file.write(content)
+
+    def test_cached(self):
+        self.assertEqual(yaml_utils.load_yaml(self.file), {"name": "lamp"})
+        self.assertEqual(yaml_utils.load_yaml(self.file), {"name": "lamp"})
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_changed(self):
+        yaml_utils.load_yaml(self.file)
+        self.write("name: lamp_2\n")
+        self.assertEqual(yaml_utils.load_yaml(self.file), {"name": "lamp_2"})
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_missing(self):
+        self.assertIsNone(
+            yaml_utils.load_yaml(os.path.join(self.dir.name, "none.yaml"))
+        )